@@ -0,0 +1,86 @@
+"""
+Parity check + speed benchmark: native BLEU engine vs NLTK.
+
+Run from the repo root:
+    python -m evals.generation.bleu.benchmark --num-pairs 100000
+"""
+import argparse
+import random
+import time
+from typing import List, Tuple
+
+from nltk.translate.bleu_score import corpus_bleu, SmoothingFunction
+
+from evals.generation.bleu.bleu import bleu_score, native_bleu_score
+
+VOCAB = (
+    "the a of to in is for on with as retrieval context answer model query document "
+    "vector index latency token claim grounded evidence score metric embedding"
+).split()
+
+
+def make_pairs(num_pairs: int, seed: int = 0) -> Tuple[List[str], List[str]]:
+    """Random reference / candidate pairs with partial overlap, including empty and tiny ones."""
+    rng = random.Random(seed)
+    references, candidates = [], []
+    for _ in range(num_pairs):
+        ref = [rng.choice(VOCAB) for _ in range(rng.randint(0, 30))]
+        cand = [w if rng.random() < 0.6 else rng.choice(VOCAB) for w in ref]
+        cand = cand[: rng.randint(0, len(cand))] + [rng.choice(VOCAB) for _ in range(rng.randint(0, 5))]
+        references.append(" ".join(ref))
+        candidates.append(" ".join(cand))
+    return references, candidates
+
+
+def check_parity(references: List[str], candidates: List[str], tol: float = 1e-12) -> None:
+    nltk_result = bleu_score(references, candidates, engine="nltk")
+    native_result = native_bleu_score(references, candidates)
+
+    worst = max(
+        (abs(a - b) for a, b in zip(nltk_result["per_sample"], native_result["per_sample"])),
+        default=0.0,
+    )
+    nltk_corpus = corpus_bleu(
+        [[r.split()] for r in references],
+        [c.split() for c in candidates],
+        smoothing_function=SmoothingFunction().method1,
+    )
+    corpus_diff = abs(nltk_corpus - native_result["corpus_bleu"])
+
+    print(f"max per-sample |diff| : {worst:.3e}")
+    print(f"mean |diff|           : {abs(nltk_result['mean_bleu'] - native_result['mean_bleu']):.3e}")
+    print(f"corpus |diff|         : {corpus_diff:.3e}")
+    if worst > tol or corpus_diff > tol:
+        raise AssertionError("native BLEU engine diverges from NLTK")
+
+
+def time_engine(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-pairs", type=int, default=100_000)
+    parser.add_argument("--parity-pairs", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print("Parity vs NLTK")
+    print("=" * 40)
+    check_parity(*make_pairs(args.parity_pairs, args.seed))
+
+    references, candidates = make_pairs(args.num_pairs, args.seed + 1)
+    nltk_s = time_engine(bleu_score, references, candidates)
+    native_s = time_engine(native_bleu_score, references, candidates)
+
+    print(f"\nSpeed on {args.num_pairs} pairs")
+    print("=" * 40)
+    print(f"nltk   : {nltk_s:.2f} s")
+    print(f"native : {native_s:.2f} s")
+    print(f"speedup: {nltk_s / max(native_s, 1e-9):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
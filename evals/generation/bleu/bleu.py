@@ -1,24 +1,166 @@
-from typing import List,Dict
+from typing import List,Dict,Optional,Tuple
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from nltk.translate.bleu_score import sentence_bleu,SmoothingFunction
+import math
+import os
 import statistics
 
-def bleu_score(references:List[str],candidates:List[str])->str:
+from evals.utils.text.text import TokenCache, get_default_token_cache
+
+# Below this many samples the pool start-up costs more than it saves
+MIN_PARALLEL_SIZE = 2000
+
+# One smoothing function per worker process, built once by the pool initializer
+_worker_smooth = None
+
+def _init_worker():
+    global _worker_smooth
+    _worker_smooth = SmoothingFunction().method1
+
+def _score_pairs(smooth,pairs:List[Tuple[str,str]],token_cache:Optional[TokenCache]=None)->List[float]:
+    cache = token_cache or get_default_token_cache()
+    scores = []
+    for ref,can in pairs:
+        score = sentence_bleu([list(cache.split_tokens(ref))],list(cache.split_tokens(can)),
+            smoothing_function=smooth)
+        scores.append(score)
+    return scores
+
+def _score_shard(pairs:List[Tuple[str,str]])->List[float]:
+    return _score_pairs(_worker_smooth,pairs)
+
+def _parallel_scores(pairs:List[Tuple[str,str]],n_jobs:int)->List[float]:
+    """Scores contiguous shards in a process pool; shard results are concatenated in order."""
+    shard_size = max(1,-(-len(pairs)//(n_jobs*4)))
+    shards = [pairs[i:i+shard_size] for i in range(0,len(pairs),shard_size)]
+    scores = []
+    with ProcessPoolExecutor(max_workers=n_jobs,initializer=_init_worker) as pool:
+        for shard_scores in pool.map(_score_shard,shards):
+            scores.extend(shard_scores)
+    return scores
+
+# Native engine
+# Same maths as NLTK sentence_bleu / corpus_bleu with weights (0.25,0.25,0.25,0.25) and
+# SmoothingFunction().method1, but each string is split once and n-grams are counted with
+# Counters instead of NLTK's generic multi-reference machinery.
+
+MAX_N = 4
+EPSILON = 0.1   # method1 epsilon
+
+def _ngram_stats(ref_tokens:List[str],cand_tokens:List[str],max_n:int=MAX_N)->Tuple[List[int],List[int]]:
+    """Clipped n-gram matches and candidate n-gram totals for n = 1..max_n"""
+    matches = []
+    totals = []
+    for n in range(1,max_n+1):
+        num_cand = len(cand_tokens)-n+1
+        # NLTK uses max(1, count) as the denominator
+        totals.append(max(1,num_cand))
+        if num_cand <= 0 or len(ref_tokens) < n:
+            matches.append(0)
+            continue
+        if n == 1:
+            cand_counts = Counter(cand_tokens)
+            ref_counts = Counter(ref_tokens)
+        else:
+            cand_counts = Counter(zip(*[cand_tokens[i:] for i in range(n)]))
+            ref_counts = Counter(zip(*[ref_tokens[i:] for i in range(n)]))
+        matched = 0
+        for gram,count in cand_counts.items():
+            ref_count = ref_counts.get(gram)
+            if ref_count:
+                matched += count if count < ref_count else ref_count
+        matches.append(matched)
+        if matched == 0:
+            # no n-gram match means no (n+1)-gram match either
+            matches.extend([0]*(max_n-n))
+            totals.extend(max(1,len(cand_tokens)-m+1) for m in range(n+1,max_n+1))
+            break
+    return matches,totals
+
+def _bleu_from_stats(matches:List[int],totals:List[int],hyp_len:int,ref_len:int)->float:
+    if matches[0] == 0:
+        return 0.0
+    if hyp_len > ref_len:
+        bp = 1.0
+    elif hyp_len == 0:
+        bp = 0.0
+    else:
+        bp = math.exp(1-ref_len/hyp_len)
+    weight = 1.0/len(matches)
+    log_sum = math.fsum(
+        weight*math.log((m if m else EPSILON)/t)
+        for m,t in zip(matches,totals)
+    )
+    return bp*math.exp(log_sum)
+
+def native_bleu_score(references:List[str],candidates:List[str],token_cache:Optional[TokenCache]=None)->Dict:
+    """
+    Fast built-in BLEU. Per-sample scores match NLTK sentence_bleu (method1 smoothing) and
+    corpus_bleu matches NLTK corpus_bleu, i.e. n-gram matches/totals and lengths are summed
+    over the corpus before dividing (micro average) instead of averaging sentence scores.
+    Returns:
+        {
+            "mean_bleu":float,
+            "corpus_bleu":float,
+            "per_sample":List[float]
+        }
+    """
+    assert len(references) == len(candidates),"Mismatched lengths"
+    cache = token_cache or get_default_token_cache()
+    scores = []
+    corpus_matches = [0]*MAX_N
+    corpus_totals = [0]*MAX_N
+    hyp_total = 0
+    ref_total = 0
+    for ref,can in zip(references,candidates):
+        ref_tokens = cache.split_tokens(ref)
+        cand_tokens = cache.split_tokens(can)
+        matches,totals = _ngram_stats(ref_tokens,cand_tokens)
+        scores.append(_bleu_from_stats(matches,totals,len(cand_tokens),len(ref_tokens)))
+        for n in range(MAX_N):
+            corpus_matches[n] += matches[n]
+            corpus_totals[n] += totals[n]
+        hyp_total += len(cand_tokens)
+        ref_total += len(ref_tokens)
+    return {
+        "mean_bleu" : statistics.mean(scores) if scores else 0.0,
+        "corpus_bleu" : _bleu_from_stats(corpus_matches,corpus_totals,hyp_total,ref_total) if scores else 0.0,
+        "per_sample" : scores
+    }
+
+def corpus_bleu_score(references:List[str],candidates:List[str])->float:
+    """True corpus level BLEU (Papineni et al. 2002) over all pairs"""
+    return native_bleu_score(references,candidates)["corpus_bleu"]
+
+def bleu_score(references:List[str],candidates:List[str],n_jobs:int=1,
+    min_parallel_size:int=MIN_PARALLEL_SIZE,engine:str="nltk",token_cache:Optional[TokenCache]=None)->Dict:
     """
     Computes sentence level Bleau scores for multiple samples
     Args: references -> List of ground truth answers
           candidates -> List of model generated answers
+          n_jobs -> worker processes (-1 = all cores), used only for >= min_parallel_size samples.
+                    Results are identical to the serial path
+          engine -> "nltk" or "native" (same scores, much faster, also returns "corpus_bleu";
+                    n_jobs is ignored)
+          token_cache -> tokenize-once cache (default: the process-wide one from evals.utils.text)
     Returns :
         {
             "mean_bleu":float,
             "per_sample":List[float]
         }
     """
+    if engine == "native":
+        return native_bleu_score(references,candidates,token_cache)
+    if engine != "nltk":
+        raise ValueError(f"Unknown BLEU engine: {engine}")
     assert len(references) == len(candidates),"Mismatched lengths"
-    smooth = SmoothingFunction().method1
-    scores = []
-    for ref,can in zip(references,candidates):
-        score = sentence_bleu([ref.split()],can.split(),smoothing_function=smooth)
-        scores.append(score)
+    pairs = list(zip(references,candidates))
+    n_jobs = (os.cpu_count() or 1) if n_jobs == -1 else n_jobs
+    if n_jobs > 1 and len(pairs) >= min_parallel_size:
+        scores = _parallel_scores(pairs,n_jobs)
+    else:
+        scores = _score_pairs(SmoothingFunction().method1,pairs,token_cache)
     return {
         "mean_bleu" : statistics.mean(scores) if scores else 0.0,
         'per_sample' : scores
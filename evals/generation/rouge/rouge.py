@@ -1,15 +1,73 @@
-from typing import List, Dict
-from rouge_score import rouge_scorer
+from typing import List, Dict, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import os
 import statistics
 
+from evals.utils.text.text import TokenCache, make_rouge_scorer
+
+ROUGE_TYPES = ["rouge1", "rouge2", "rougeL"]
+
+# Below this many samples the pool start-up costs more than it saves
+MIN_PARALLEL_SIZE = 2000
+
+# One scorer per worker process, built once by the pool initializer
+_worker_scorer = None
+
+
+def _make_scorer(token_cache: Optional[TokenCache] = None):
+    # stemmed tokens come from the shared tokenize-once cache
+    return make_rouge_scorer(ROUGE_TYPES, token_cache)
+
+
+def _init_worker():
+    global _worker_scorer
+    _worker_scorer = _make_scorer()
+
+
+def _score_pairs(scorer, pairs: List[Tuple[str, str]]) -> List[Dict]:
+    per_sample = []
+    for ref, cand in pairs:
+        scores = scorer.score(ref, cand)
+
+        per_sample.append({
+            "rouge1": scores["rouge1"].fmeasure,
+            "rouge2": scores["rouge2"].fmeasure,
+            "rougeL": scores["rougeL"].fmeasure,
+        })
+    return per_sample
+
+
+def _score_shard(pairs: List[Tuple[str, str]]) -> List[Dict]:
+    return _score_pairs(_worker_scorer, pairs)
+
+
+def _parallel_per_sample(pairs: List[Tuple[str, str]], n_jobs: int) -> List[Dict]:
+    """Scores contiguous shards in a process pool; shard results are concatenated in order."""
+    # a few shards per worker keeps the pool balanced when sample lengths vary
+    shard_size = max(1, -(-len(pairs) // (n_jobs * 4)))
+    shards = [pairs[i:i + shard_size] for i in range(0, len(pairs), shard_size)]
+    per_sample = []
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker) as pool:
+        for shard_scores in pool.map(_score_shard, shards):
+            per_sample.extend(shard_scores)
+    return per_sample
+
 
 def rouge_batch(
     references: List[str],
-    candidates: List[str]
+    candidates: List[str],
+    n_jobs: int = 1,
+    min_parallel_size: int = MIN_PARALLEL_SIZE,
+    token_cache: Optional[TokenCache] = None,
 ) -> Dict:
     """
     Computes ROUGE-1, ROUGE-2, ROUGE-L F1 scores for multiple samples.
 
+    n_jobs: worker processes (-1 = all cores). Parallel scoring only kicks in for
+            at least min_parallel_size samples; results are identical to the serial path.
+    token_cache: tokenize-once cache (default: the process-wide one from evals.utils.text);
+            worker processes use their own.
+
     Returns:
         {
             "mean": {
@@ -22,21 +80,13 @@ def rouge_batch(
     """
     assert len(references) == len(candidates), "Mismatched input lengths"
 
-    scorer = rouge_scorer.RougeScorer(
-        ["rouge1", "rouge2", "rougeL"],
-        use_stemmer=True
-    )
-
-    per_sample = []
-
-    for ref, cand in zip(references, candidates):
-        scores = scorer.score(ref, cand)
+    pairs = list(zip(references, candidates))
+    n_jobs = (os.cpu_count() or 1) if n_jobs == -1 else n_jobs
 
-        per_sample.append({
-            "rouge1": scores["rouge1"].fmeasure,
-            "rouge2": scores["rouge2"].fmeasure,
-            "rougeL": scores["rougeL"].fmeasure,
-        })
+    if n_jobs > 1 and len(pairs) >= min_parallel_size:
+        per_sample = _parallel_per_sample(pairs, n_jobs)
+    else:
+        per_sample = _score_pairs(_make_scorer(token_cache), pairs)
 
     mean_scores = {
         "rouge1": statistics.mean(s["rouge1"] for s in per_sample),
@@ -0,0 +1,167 @@
+"""
+Concurrent executor for LLM judge calls.
+
+Judge helpers (faithfulness, correctness, ...) are plain blocking functions around
+client.chat.completions.create. This module runs many of them at once on a thread pool with:
+1) a concurrency cap (max_workers)
+2) token-bucket rate limiting (requests per second + burst)
+3) retry with exponential backoff and jitter, by default only on transient errors
+   (TRANSIENT_ERRORS); a bad request or a bug in a judge helper is raised at once
+
+Results always come back in submission order, so callers stay deterministic.
+Each call runs in a copy of the submitting context, so tracing spans opened around
+a run() nest the calls made on the pool.
+"""
+import contextvars
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple, Type
+
+# connection drops and timeouts are worth another attempt; anything else will fail again
+TRANSIENT_ERRORS: Tuple[Type[BaseException], ...] = (ConnectionError, TimeoutError)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+    rate     : tokens added per second
+    capacity : max burst size
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Blocks until `tokens` are available."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def call_with_retry(
+    fn: Callable[..., Any],
+    *args,
+    max_retries: int = 3,
+    backoff_base: float = 0.5,
+    backoff_max: float = 8.0,
+    retry_on: Tuple[Type[BaseException], ...] = TRANSIENT_ERRORS,
+    rate_limiter: Optional[TokenBucket] = None,
+    **kwargs,
+) -> Any:
+    """
+    Calls fn(*args, **kwargs), retrying on `retry_on` exceptions.
+    Sleep before attempt i is min(backoff_max, backoff_base * 2**i) with full jitter.
+    Every attempt (including retries) takes a token from the rate limiter.
+    """
+    attempt = 0
+    while True:
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        try:
+            return fn(*args, **kwargs)
+        except retry_on:
+            if attempt >= max_retries:
+                raise
+            delay = min(backoff_max, backoff_base * (2 ** attempt))
+            time.sleep(random.uniform(0, delay))
+            attempt += 1
+
+
+class JudgeExecutor:
+    """
+    Runs judge calls concurrently with a concurrency cap, rate limit and retries.
+
+    Example:
+        executor = JudgeExecutor(max_workers=8, requests_per_second=5)
+        verdicts = executor.map(lambda c: verify_claim(c, context, client), claims)
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        requests_per_second: Optional[float] = None,
+        burst: Optional[float] = None,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        retry_on: Tuple[Type[BaseException], ...] = TRANSIENT_ERRORS,
+    ):
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1")
+        self.max_workers = max_workers
+        self.rate_limiter = (
+            TokenBucket(requests_per_second, burst) if requests_per_second else None
+        )
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_on = retry_on
+
+    def _call(self, fn: Callable[..., Any], *args) -> Any:
+        return call_with_retry(
+            fn,
+            *args,
+            max_retries=self.max_retries,
+            backoff_base=self.backoff_base,
+            backoff_max=self.backoff_max,
+            retry_on=self.retry_on,
+            rate_limiter=self.rate_limiter,
+        )
+
+    def _submit(self, pool: ThreadPoolExecutor, fn: Callable[..., Any], args: tuple):
+        return pool.submit(contextvars.copy_context().run, self._call, fn, *args)
+
+    def run(self, calls: Sequence[Tuple[Callable[..., Any], tuple]]) -> List[Any]:
+        """
+        Executes (fn, args) pairs concurrently.
+        Returns results in the same order as `calls`; the first exception is re-raised.
+        """
+        if not calls:
+            return []
+        workers = min(self.max_workers, len(calls))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [self._submit(pool, fn, args) for fn, args in calls]
+            return [f.result() for f in futures]
+
+    def map(self, fn: Callable[[Any], Any], items: Sequence[Any]) -> List[Any]:
+        """Ordered, concurrent map of a single-argument function."""
+        return self.run([(fn, (item,)) for item in items])
+
+    def imap(
+        self,
+        calls: Iterable[Tuple[Callable[..., Any], tuple]],
+        max_in_flight: Optional[int] = None,
+    ) -> Iterator[Any]:
+        """
+        Streaming version of run(): yields results in input order as soon as each one
+        (and everything before it) is done. At most max_in_flight calls (default
+        2 x max_workers) are submitted at once, so `calls` can be a lazy generator.
+        """
+        max_in_flight = max_in_flight or 2 * self.max_workers
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for fn, args in calls:
+                if len(pending) >= max_in_flight:
+                    yield pending.popleft().result()
+                pending.append(self._submit(pool, fn, args))
+            while pending:
+                yield pending.popleft().result()
@@ -1,6 +1,5 @@
-import statistics
-from collections import defaultdict
-from pipeline import handle_request
+from evals.latency.pipeline import handle_request
+from evals.latency.sketch import LatencyRecorder
 from typing import List
 
 def percentile(values,p):
@@ -13,26 +12,28 @@ def percentile(values,p):
     if f==c: return values[f]
     return values[f] + (values[c]-values[f])*(k-f)
 
-def benchmark(queries:List[str],runs_per_query:int=10,warmup:int=5):
-    latency_store = defaultdict(list)
+def benchmark(queries:List[str],runs_per_query:int=10,warmup:int=5,relative_accuracy:float=0.01):
+    """
+    Per-stage latency report. Samples stream into a LatencyRecorder (constant memory,
+    percentiles within relative_accuracy) instead of being kept and re-sorted.
+    """
     for _ in range(warmup):
         for q in queries:
             handle_request(q)
+    recorder = LatencyRecorder(relative_accuracy)
     for _ in range(runs_per_query):
         for q in queries:
-            result = handle_request(q)
-            latencies = result['latency_ms']
-            for stage,value in latencies.items():
-                latency_store[stage].append(value)
+            handle_request(q, recorder=recorder)
     report = {}
-    for stage,values in latency_store.items():
+    for stage,row in recorder.report().items():
         report[stage] = {
-            "mean_ms": round(statistics.mean(values), 2),
-            "p50_ms": round(percentile(values, 50), 2),
-            "p95_ms": round(percentile(values, 95), 2),
-            "p99_ms": round(percentile(values, 99), 2),
-            "min_ms": round(min(values), 2),
-            "max_ms": round(max(values), 2),
+            "mean_ms": row["mean_ms"],
+            "p50_ms": row["p50_ms"],
+            "p95_ms": row["p95_ms"],
+            "p99_ms": row["p99_ms"],
+            "p999_ms": row["p999_ms"],
+            "min_ms": row["min_ms"],
+            "max_ms": row["max_ms"],
         }
     
     return report
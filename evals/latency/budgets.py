@@ -1,4 +1,9 @@
-from typing import Dict, Tuple
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple
+
+from evals.latency.sketch import QuantileSketch
 
 
 class LatencyBudgetViolation(Exception):
@@ -43,8 +48,131 @@ class LatencyBudgets:
                 f"Latency budget violations: {violations}"
             )
         return len(violations) == 0, violations
-            
-            
-        
 
 
+class _WindowBucket:
+    """One slice of the sliding window: per stage a sketch, a request count and an over-budget count."""
+    __slots__ = ("bucket_id", "stages")
+
+    def __init__(self, bucket_id: int):
+        self.bucket_id = bucket_id
+        self.stages: Dict[str, list] = {}
+
+
+class SLOMonitor:
+    """
+    Windowed SLO tracking on top of LatencyBudgets.
+
+    The SLO per stage is "the p-th percentile over the last window_s seconds stays within
+    the stage budget", i.e. at most (1 - p/100) of requests may exceed it: that fraction is
+    the error budget, and burn_rate = observed over-budget fraction / error budget
+    (1.0 = burning exactly as fast as allowed).
+
+    The window is split into num_buckets time slices, each holding a QuantileSketch per
+    stage, so observe() is a few counter updates per stage. The window percentile is only
+    computed every check_interval_s; a stage is reported (and, with strict budgets,
+    LatencyBudgetViolation is raised) only when that windowed percentile exceeds the budget,
+    never for a single outlier.
+    """
+
+    def __init__(
+        self,
+        budgets: LatencyBudgets,
+        percentile: float = 95,
+        window_s: float = 300.0,
+        num_buckets: int = 10,
+        check_interval_s: float = 1.0,
+        min_samples: int = 20,
+        relative_accuracy: float = 0.01,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not 0 < percentile < 100:
+            raise ValueError("percentile must be in (0, 100)")
+        self.budgets = budgets
+        self.percentile = percentile
+        self.error_budget = 1 - percentile / 100
+        self.window_s = window_s
+        self.num_buckets = num_buckets
+        self.bucket_s = window_s / num_buckets
+        self.check_interval_s = check_interval_s
+        self.min_samples = min_samples
+        self.relative_accuracy = relative_accuracy
+        self.clock = clock
+        self._buckets: deque = deque()
+        self._last_check: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _rotate(self, now: float) -> _WindowBucket:
+        bucket_id = int(now // self.bucket_s)
+        buckets = self._buckets
+        if not buckets or buckets[-1].bucket_id != bucket_id:
+            buckets.append(_WindowBucket(bucket_id))
+        while buckets[0].bucket_id <= bucket_id - self.num_buckets:
+            buckets.popleft()
+        return buckets[-1]
+
+    def observe(self, latency_ms: Dict[str, float], now: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Records one request's stage latencies (e.g. handle_request()["latency_ms"]).
+        Returns the windowed violations when a check ran this call, else {}.
+        """
+        now = self.clock() if now is None else now
+        with self._lock:
+            bucket = self._rotate(now)
+            for stage, measured in latency_ms.items():
+                budget = self.budgets.budgets_ms.get(stage)
+                if budget is None:
+                    continue
+                entry = bucket.stages.get(stage)
+                if entry is None:
+                    entry = bucket.stages[stage] = [QuantileSketch(self.relative_accuracy), 0]
+                entry[0].add(measured)
+                if measured > budget:
+                    entry[1] += 1
+            if self._last_check is not None and now - self._last_check < self.check_interval_s:
+                return {}
+            self._last_check = now
+        return self.check(now)
+
+    def status(self, now: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """Per-stage window percentile, budget, sample count, over-budget fraction and burn rate."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            self._rotate(now)
+            merged: Dict[str, list] = {}
+            for bucket in self._buckets:
+                for stage, (sketch, bad) in bucket.stages.items():
+                    entry = merged.get(stage)
+                    if entry is None:
+                        entry = merged[stage] = [QuantileSketch(self.relative_accuracy), 0]
+                    entry[0].merge(sketch)
+                    entry[1] += bad
+
+        key = f"p{self.percentile:g}_ms".replace(".", "")
+        status = {}
+        for stage, (sketch, bad) in merged.items():
+            bad_fraction = bad / sketch.count if sketch.count else 0.0
+            status[stage] = {
+                key: round(sketch.percentile(self.percentile), 2),
+                "budget_ms": self.budgets.budgets_ms[stage],
+                "samples": sketch.count,
+                "over_budget_fraction": round(bad_fraction, 4),
+                "burn_rate": round(bad_fraction / self.error_budget, 3),
+                "enough_samples": sketch.count >= self.min_samples,
+            }
+        return status
+
+    def check(self, now: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Windowed budget check: LatencyBudgets.check on the window percentiles of stages with
+        at least min_samples requests. Returns {stage: {..., "exceeded_by_ms"}} for breaches;
+        raises LatencyBudgetViolation if the budgets are strict.
+        """
+        status = self.status(now)
+        key = f"p{self.percentile:g}_ms".replace(".", "")
+        window = {stage: row[key] for stage, row in status.items() if row["enough_samples"]}
+        _, exceeded = self.budgets.check(window)
+        return {
+            stage: {**status[stage], "exceeded_by_ms": by}
+            for stage, by in exceeded.items()
+        }
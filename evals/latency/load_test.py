@@ -0,0 +1,283 @@
+"""
+Open-loop load generator for the latency pipeline.
+
+benchmark() calls handle_request serially, so it only measures single-request latency.
+Here requests arrive on a schedule whether or not earlier ones have finished (open loop),
+which is how real users behave:
+
+1) a schedule of stages (start_rps -> end_rps over duration_s) is turned into arrival
+   offsets, evenly spaced or Poisson, from a seeded generator
+2) a dispatcher releases each request at its arrival time, in "thread" mode (dispatcher
+   thread + thread pool) or "asyncio" mode (event loop + semaphore + executor)
+3) at most `concurrency` requests run at once; the rest wait, and that wait is recorded as
+   queueing delay (start - scheduled)
+
+The report has offered vs achieved throughput, per-stage p50/p95/p99 under load, queueing
+delay and end-to-end (queue + service) latency. saturation_sweep() steps through RPS levels
+and reports the first one the pipeline can no longer keep up with.
+
+Run from the repo root (uses the simulated stages, no network):
+    python -m evals.latency.load_test --rps 20 --duration 10 --concurrency 50
+    python -m evals.latency.load_test --sweep 5 10 20 40 80 --duration 5 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from evals.latency.benchmark import percentile
+from evals.latency.pipeline import handle_request
+
+# (start_rps, end_rps, duration_s); start == end is a constant-rate stage
+LoadStage = Tuple[float, float, float]
+
+DEFAULT_QUERIES = [
+    "What is latency in LLM systems?",
+    "How does retrieval augmented generation work?",
+    "Explain p95 latency",
+    "Why do long prompts increase inference time?",
+]
+
+
+def constant_load(rps: float, duration_s: float) -> List[LoadStage]:
+    return [(rps, rps, duration_s)]
+
+
+def ramp_load(start_rps: float, end_rps: float, duration_s: float, hold_s: float = 0.0) -> List[LoadStage]:
+    """Linear ramp from start_rps to end_rps, then optionally hold end_rps for hold_s."""
+    stages = [(start_rps, end_rps, duration_s)]
+    if hold_s > 0:
+        stages.append((end_rps, end_rps, hold_s))
+    return stages
+
+
+def step_load(rps_levels: Sequence[float], step_s: float) -> List[LoadStage]:
+    return [(rps, rps, step_s) for rps in rps_levels]
+
+
+def arrival_times(stages: Sequence[LoadStage], seed: int = 0, poisson: bool = False) -> List[float]:
+    """
+    Arrival offsets (seconds from start). The rate inside a stage is linear in time, so the
+    expected arrivals by time t are L(t) = start * t + (end - start) * t^2 / (2 * duration);
+    the n-th arrival is where L(t) reaches n (evenly spaced) or a sum of Exp(1) steps (Poisson,
+    seeded).
+    """
+    rng = random.Random(seed)
+    times: List[float] = []
+    offset = 0.0
+    for start_rps, end_rps, duration_s in stages:
+        if duration_s <= 0:
+            continue
+        a = (end_rps - start_rps) / (2 * duration_s)
+        target = 0.0
+        while True:
+            target += rng.expovariate(1.0) if poisson else 1.0
+            if abs(a) < 1e-12:
+                t = target / start_rps if start_rps > 0 else math.inf
+            else:
+                disc = start_rps * start_rps + 4 * a * target
+                t = (-start_rps + math.sqrt(disc)) / (2 * a) if disc >= 0 else math.inf
+            if t >= duration_s:
+                break
+            times.append(offset + t)
+        offset += duration_s
+    return times
+
+
+# -----------------------------
+# Dispatchers
+# -----------------------------
+
+def _timed_call(handler: Callable[[str], Dict], query: str, scheduled: float, t0: float) -> Dict:
+    started = time.perf_counter()
+    record = {"scheduled_s": scheduled, "queue_ms": max(0.0, (started - t0 - scheduled) * 1000)}
+    try:
+        record["latency_ms"] = handler(query)["latency_ms"]
+        record["ok"] = True
+    except Exception as e:
+        record["latency_ms"] = {}
+        record["ok"] = False
+        record["error"] = f"{type(e).__name__}: {e}"
+    finished = time.perf_counter()
+    record["service_ms"] = (finished - started) * 1000
+    record["finished_s"] = finished - t0
+    return record
+
+
+def _run_threads(handler, queries, arrivals, concurrency) -> List[Dict]:
+    t0 = time.perf_counter()
+    futures = []
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for query, scheduled in zip(queries, arrivals):
+            delay = t0 + scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            # the pool queue holds requests beyond the concurrency cap
+            futures.append(pool.submit(_timed_call, handler, query, scheduled, t0))
+    return [f.result() for f in futures]
+
+
+def _run_asyncio(handler, queries, arrivals, concurrency) -> List[Dict]:
+    async def main() -> List[Dict]:
+        loop = asyncio.get_running_loop()
+        # handle_request blocks, so calls run on a pool sized to the concurrency cap
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=concurrency))
+        semaphore = asyncio.Semaphore(concurrency)
+        t0 = time.perf_counter()
+
+        async def one(query: str, scheduled: float) -> Dict:
+            delay = t0 + scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            async with semaphore:
+                return await loop.run_in_executor(None, _timed_call, handler, query, scheduled, t0)
+
+        return await asyncio.gather(*(one(q, s) for q, s in zip(queries, arrivals)))
+
+    return asyncio.run(main())
+
+
+DISPATCHERS = {
+    "thread": _run_threads,
+    "asyncio": _run_asyncio,
+}
+
+
+# -----------------------------
+# Reporting
+# -----------------------------
+
+def _distribution(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    return {
+        "p50_ms": round(percentile(values, 50), 2),
+        "p95_ms": round(percentile(values, 95), 2),
+        "p99_ms": round(percentile(values, 99), 2),
+        "max_ms": round(max(values), 2),
+    }
+
+
+def summarize_load(records: List[Dict], stages: Sequence[LoadStage], concurrency: int) -> Dict:
+    duration_s = sum(stage[2] for stage in stages)
+    ok = [r for r in records if r["ok"]]
+    wall_s = max((r["finished_s"] for r in records), default=0.0)
+    # completions per second between the first and last completion, so the drain of the
+    # last in-flight requests does not read as lost throughput
+    finished = sorted(r["finished_s"] for r in ok)
+    span_s = finished[-1] - finished[0] if len(finished) > 1 else 0.0
+
+    latency_store: Dict[str, List[float]] = defaultdict(list)
+    for r in ok:
+        for stage, value in r["latency_ms"].items():
+            latency_store[stage].append(value)
+
+    return {
+        "num_requests": len(records),
+        "num_errors": len(records) - len(ok),
+        "concurrency": concurrency,
+        "offered_rps": round(len(records) / duration_s, 2) if duration_s else 0.0,
+        "throughput_rps": round((len(ok) - 1) / span_s, 2) if span_s else 0.0,
+        "wall_s": round(wall_s, 2),
+        "queue_delay": _distribution([r["queue_ms"] for r in records]),
+        "end_to_end": _distribution([r["queue_ms"] + r["service_ms"] for r in records]),
+        "stages": {stage: _distribution(values) for stage, values in latency_store.items()},
+    }
+
+
+def run_load_test(
+    stages: Sequence[LoadStage],
+    queries: Optional[Sequence[str]] = None,
+    concurrency: int = 50,
+    mode: str = "thread",
+    handler: Callable[[str], Dict] = handle_request,
+    seed: int = 0,
+    poisson: bool = True,
+) -> Dict:
+    """
+    stages      : load schedule, e.g. constant_load(20, 10) or ramp_load(1, 50, 30)
+    queries     : query pool, sampled with the seeded generator
+    concurrency : max requests in flight; arrivals beyond it queue
+    mode        : "thread" | "asyncio"
+    handler     : query -> {"answer", "latency_ms"} (defaults to the simulated pipeline)
+    """
+    if mode not in DISPATCHERS:
+        raise ValueError(f"Unknown mode: {mode}. Available: {list(DISPATCHERS)}")
+    arrivals = arrival_times(stages, seed=seed, poisson=poisson)
+    rng = random.Random(seed)
+    pool = list(queries or DEFAULT_QUERIES)
+    chosen = [rng.choice(pool) for _ in arrivals]
+
+    records = DISPATCHERS[mode](handler, chosen, arrivals, concurrency)
+    return summarize_load(records, stages, concurrency)
+
+
+def saturation_sweep(
+    rps_levels: Sequence[float],
+    duration_s: float = 10.0,
+    queries: Optional[Sequence[str]] = None,
+    concurrency: int = 50,
+    mode: str = "thread",
+    handler: Callable[[str], Dict] = handle_request,
+    seed: int = 0,
+    min_throughput_ratio: float = 0.9,
+    max_queue_p95_ms: float = 100.0,
+) -> Dict:
+    """
+    Runs one constant-load test per RPS level (ascending). A level is saturated when the
+    achieved throughput drops below min_throughput_ratio * offered or the p95 queueing delay
+    exceeds max_queue_p95_ms. Stops at the first saturated level.
+    """
+    levels = []
+    saturation_rps = None
+    max_sustainable_rps = None
+    for rps in sorted(rps_levels):
+        report = run_load_test(constant_load(rps, duration_s), queries, concurrency, mode, handler, seed)
+        saturated = (
+            report["throughput_rps"] < min_throughput_ratio * report["offered_rps"]
+            or report["queue_delay"]["p95_ms"] > max_queue_p95_ms
+        )
+        report["target_rps"] = rps
+        report["saturated"] = saturated
+        levels.append(report)
+        if saturated:
+            saturation_rps = rps
+            break
+        max_sustainable_rps = rps
+    return {
+        "saturation_rps": saturation_rps,
+        "max_sustainable_rps": max_sustainable_rps,
+        "levels": levels,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=sorted(DISPATCHERS), default="thread")
+    parser.add_argument("--rps", type=float, default=10.0)
+    parser.add_argument("--ramp-from", type=float, default=None, help="ramp from this RPS up to --rps")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--sweep", type=float, nargs="+", default=None, help="RPS levels for a saturation sweep")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.sweep:
+        result = saturation_sweep(args.sweep, args.duration, concurrency=args.concurrency,
+                                  mode=args.mode, seed=args.seed)
+    elif args.ramp_from is not None:
+        result = run_load_test(ramp_load(args.ramp_from, args.rps, args.duration),
+                               concurrency=args.concurrency, mode=args.mode, seed=args.seed)
+    else:
+        result = run_load_test(constant_load(args.rps, args.duration),
+                               concurrency=args.concurrency, mode=args.mode, seed=args.seed)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
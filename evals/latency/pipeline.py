@@ -1,8 +1,11 @@
 # pipeline.py
 import time
 import random
-from typing import Dict, List
-from latency.timers import latency_timer
+from typing import Dict, List, Optional
+from evals.latency.sketch import LatencyRecorder
+from evals.latency.timers import latency_timer
+from src.logging.traces import get_tracer
+from src.rag.pipeline import PipelinedExecutor, rag_stages
 
 
 # ----------------------------
@@ -96,27 +99,51 @@ def call_llm(prompt: str) -> str:
 # Main request handler
 # ----------------------------
 
-def handle_request(query: str) -> Dict:
+def handle_request(query: str, recorder: Optional[LatencyRecorder] = None) -> Dict:
     """
     End-to-end RAG request with stage-level latency tracking.
+    recorder: optional LatencyRecorder that every stage (and the total) is streamed into.
+    Each stage is also a span under a "handle_request" span of the installed tracer.
     """
     metrics: Dict[str, float] = {}
+    tracer = get_tracer()
 
-    with latency_timer("preprocessing", metrics):
-        clean_query = preprocess(query)
+    with tracer.span("handle_request", query_chars=len(query)) as request_span:
+        with tracer.span("preprocessing"), latency_timer("preprocessing", metrics, recorder):
+            clean_query = preprocess(query)
 
-    with latency_timer("retrieval", metrics):
-        docs = retrieve_documents(clean_query)
+        with tracer.span("retrieval") as span, latency_timer("retrieval", metrics, recorder):
+            docs = retrieve_documents(clean_query)
+            span.set_attribute("num_chunks", len(docs))
 
-    with latency_timer("prompt_build", metrics):
-        prompt = build_prompt(clean_query, docs)
+        with tracer.span("prompt_build") as span, latency_timer("prompt_build", metrics, recorder):
+            prompt = build_prompt(clean_query, docs)
+            span.set_attribute("prompt_chars", len(prompt))
 
-    with latency_timer("llm_inference", metrics):
-        answer = call_llm(prompt)
+        with tracer.span("llm_inference"), latency_timer("llm_inference", metrics, recorder):
+            answer = call_llm(prompt)
 
-    metrics["total"] = round(sum(metrics.values()), 2)
+        metrics["total"] = round(sum(metrics.values()), 2)
+        request_span.set_attribute("total_ms", metrics["total"])
+    if recorder is not None:
+        recorder.record("total", metrics["total"])
 
     return {
         "answer": answer,
         "latency_ms": metrics
     }
+
+
+def handle_requests_pipelined(
+    queries: List[str],
+    workers: Optional[Dict[str, int]] = None,
+    queue_size: int = 64,
+    recorder: Optional[LatencyRecorder] = None,
+) -> List[Dict]:
+    """
+    Batch version of handle_request: the stages run on their own worker pools with
+    bounded queues, so requests overlap. Each result has handle_request's "answer" and
+    "latency_ms" plus per-stage "queue_wait_ms" and "end_to_end_ms".
+    """
+    stages = rag_stages(preprocess, retrieve_documents, build_prompt, call_llm, workers, queue_size)
+    return PipelinedExecutor(stages, recorder=recorder).map(queries)
@@ -0,0 +1,260 @@
+"""
+Streaming, mergeable quantile sketch for latency aggregation.
+
+benchmark.percentile sorts every raw sample for every percentile of every stage, and the
+raw samples grow without bound in long soak tests. QuantileSketch is a log-bucketed
+histogram (DDSketch / HDR-histogram style):
+
+    bucket(v) = ceil(log(v) / log(gamma)),   gamma = (1 + a) / (1 - a)
+
+Every value in a bucket is within relative error a of the bucket's representative value, so
+any quantile is answered with relative error <= a (1% by default). Memory is one counter per
+occupied bucket -- about 1,400 buckets span 1 microsecond to 1 hour at 1% -- and is capped
+by max_buckets (the lowest buckets are collapsed first, keeping the tail accurate).
+Two sketches with the same accuracy merge by adding counters, so worker processes can ship
+to_dict() snapshots to a parent and merge them.
+
+LatencyRecorder keeps one sketch per stage; latency_timer(..., recorder=...) records into it.
+
+Accuracy check against the exact percentile function:
+    python -m evals.latency.sketch --num-values 1000000
+"""
+import argparse
+import math
+import random
+import threading
+from typing import Dict, Iterable, Optional, Sequence
+
+DEFAULT_PERCENTILES = (50, 95, 99, 99.9)
+
+
+def _percentile_key(p: float) -> str:
+    return "p" + f"{p:g}".replace(".", "") + "_ms"
+
+
+class QuantileSketch:
+    """
+    relative_accuracy : max relative error of any quantile
+    min_value         : values at or below this land in the zero bucket
+    max_buckets       : memory cap; the lowest buckets are collapsed beyond it
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-6, max_buckets: int = 2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.counts: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, value: float, count: int = 1) -> None:
+        if value <= self.min_value:
+            self.zero_count += count
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.counts[key] = self.counts.get(key, 0) + count
+            if len(self.counts) > self.max_buckets:
+                self._collapse()
+        self.count += count
+        self.total += value * count
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def _collapse(self) -> None:
+        keys = sorted(self.counts)
+        excess = len(keys) - self.max_buckets
+        target = keys[excess]
+        for key in keys[:excess]:
+            self.counts[target] += self.counts.pop(key)
+
+    def _value(self, key: int) -> float:
+        return 2 * self._gamma ** key / (self._gamma + 1)
+
+    def quantile(self, q: float) -> float:
+        """q in [0, 1]; same rank convention as benchmark.percentile."""
+        if self.count == 0:
+            return 0.0
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return max(self.min, 0.0)
+        seen = self.zero_count
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen > rank:
+                return min(max(self._value(key), self.min), self.max)
+        return self.max
+
+    def percentile(self, p: float) -> float:
+        """p between 0-100, like benchmark.percentile."""
+        return self.quantile(p / 100)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("can only merge sketches with the same relative_accuracy")
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        if len(self.counts) > self.max_buckets:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def to_dict(self) -> Dict:
+        """JSON/pickle friendly snapshot, e.g. to send from a worker process."""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "min_value": self.min_value,
+            "max_buckets": self.max_buckets,
+            "counts": {str(k): v for k, v in self.counts.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"], data["min_value"], data["max_buckets"])
+        sketch.counts = {int(k): v for k, v in data["counts"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.total = data["total"]
+        if data["count"]:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        return sketch
+
+
+class LatencyRecorder:
+    """Thread-safe stage -> QuantileSketch map; constant memory per stage."""
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.sketches: Dict[str, QuantileSketch] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, latency_ms: float) -> None:
+        with self._lock:
+            sketch = self.sketches.get(stage)
+            if sketch is None:
+                sketch = self.sketches[stage] = QuantileSketch(self.relative_accuracy)
+            sketch.add(latency_ms)
+
+    def record_all(self, latency_ms: Dict[str, float]) -> None:
+        for stage, value in latency_ms.items():
+            self.record(stage, value)
+
+    def merge(self, other: "LatencyRecorder") -> "LatencyRecorder":
+        with self._lock:
+            for stage, sketch in other.sketches.items():
+                if stage in self.sketches:
+                    self.sketches[stage].merge(sketch)
+                else:
+                    self.sketches[stage] = QuantileSketch.from_dict(sketch.to_dict())
+        return self
+
+    def report(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            report = {}
+            for stage, sketch in self.sketches.items():
+                row = {"count": sketch.count, "mean_ms": round(sketch.mean, 2)}
+                for p in percentiles:
+                    row[_percentile_key(p)] = round(sketch.percentile(p), 2)
+                row["min_ms"] = round(sketch.min, 2)
+                row["max_ms"] = round(sketch.max, 2)
+                report[stage] = row
+            return report
+
+    def to_dict(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                "relative_accuracy": self.relative_accuracy,
+                "sketches": {stage: s.to_dict() for stage, s in self.sketches.items()},
+            }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LatencyRecorder":
+        recorder = cls(data["relative_accuracy"])
+        recorder.sketches = {stage: QuantileSketch.from_dict(s) for stage, s in data["sketches"].items()}
+        return recorder
+
+
+def merge_recorders(recorders: Iterable[LatencyRecorder], relative_accuracy: Optional[float] = None) -> LatencyRecorder:
+    recorders = list(recorders)
+    merged = LatencyRecorder(relative_accuracy or (recorders[0].relative_accuracy if recorders else 0.01))
+    for recorder in recorders:
+        merged.merge(recorder)
+    return merged
+
+
+# -----------------------------
+# Accuracy check
+# -----------------------------
+
+def check_accuracy(num_values: int = 1_000_000, relative_accuracy: float = 0.01, seed: int = 0) -> None:
+    from evals.latency.benchmark import percentile
+
+    rng = random.Random(seed)
+    distributions = {
+        "lognormal": lambda: rng.lognormvariate(5.5, 0.4),
+        "bimodal": lambda: rng.gauss(250, 20) if rng.random() < 0.9 else rng.gauss(1200, 150),
+        "heavy_tail": lambda: 100 * rng.paretovariate(1.5),
+    }
+    worst = 0.0
+    for name, draw in distributions.items():
+        values = [max(0.0, draw()) for _ in range(num_values)]
+        # four "workers", merged like a parent process would
+        parts = [QuantileSketch(relative_accuracy) for _ in range(4)]
+        for i, v in enumerate(values):
+            parts[i % 4].add(v)
+        sketch = QuantileSketch.from_dict(parts[0].to_dict())
+        for part in parts[1:]:
+            sketch.merge(part)
+
+        print(f"{name} ({len(sketch.counts)} buckets)")
+        for p in DEFAULT_PERCENTILES:
+            exact = percentile(values, p)
+            approx = sketch.percentile(p)
+            err = abs(approx - exact) / exact if exact else 0.0
+            worst = max(worst, err)
+            print(f"  p{p:<5g} exact {exact:10.2f}  sketch {approx:10.2f}  rel err {err:.4%}")
+    # the sketch bound holds for rank quantiles; percentile() interpolates between ranks
+    if worst > 2 * relative_accuracy:
+        raise AssertionError(f"sketch error {worst:.4%} exceeds the {relative_accuracy:.2%} target")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--num-values", type=int, default=1_000_000)
+    parser.add_argument("--relative-accuracy", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    check_accuracy(args.num_values, args.relative_accuracy, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,22 @@
 import time
 from contextlib import contextmanager
-from typing import Dict
+from typing import Dict, Optional
+
+from evals.latency.sketch import LatencyRecorder
 
 @contextmanager
-def latency_timer(stage:str,metrics:Dict[str,float]):
+def latency_timer(stage:str,metrics:Dict[str,float],recorder:Optional[LatencyRecorder]=None):
     """
     Context manager to measure latency(in ms) for the 
+    stage. If a LatencyRecorder is given,
+    the measurement is also added to its streaming sketch for the stage.
     """
     start = time.perf_counter()
     try:
         yield
     finally:
         end = time.perf_counter()
-        metrics[stage] = round((end-start)*1000,2)
\ No newline at end of file
+        elapsed_ms = (end-start)*1000
+        metrics[stage] = round(elapsed_ms,2)
+        if recorder is not None:
+            recorder.record(stage, elapsed_ms)
\ No newline at end of file
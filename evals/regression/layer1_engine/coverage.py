@@ -1,6 +1,7 @@
-from rogue_score import rogue_scorer
 from typing import List, Tuple
-scorer = rouge_scorer.RougeScorer(["rougeL"], use_stemmer=True)
+from evals.utils.text.text import make_rouge_scorer
+# stemmed ROUGE-L scorer reading tokens from the shared tokenize-once cache
+scorer = make_rouge_scorer(["rougeL"])
 
 def batch_coverage_score(baseline_answers: List[str],new_answers: List[str]) -> List[float]:
     """Pairwise coverage recall for multiple answers."""
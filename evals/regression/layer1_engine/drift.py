@@ -1,6 +1,7 @@
-from rogue_score import rogue_scorer
-from typing import List,Tuple
-scorer = rouge_scorer.RougeScorer(["rougeL"], use_stemmer=True)
+from typing import Dict, List, Optional, Tuple
+from evals.utils.text.text import make_rouge_scorer
+# stemmed ROUGE-L scorer reading tokens from the shared tokenize-once cache
+scorer = make_rouge_scorer(["rougeL"])
 
 def coverage_score(pairs:List[Tuple[str, str]])->List[float]:
     """
@@ -17,3 +18,19 @@ def coverage_score(pairs:List[Tuple[str, str]])->List[float]:
 def coverage_drift( pairs: List[Tuple[str, str]])->List[float]:
     """Drift = 1 - coverage recall, per example."""
     return [1.0 - s for s in coverage_score(pairs)]
+
+DEFAULT_THRESHOLDS: Dict[str, float] = {
+    "semantic": 0.25,
+    "coverage": 0.30,
+    "grounding": 0.20,
+}
+
+def detect_regression(semantic_drift: float, coverage_drift: float, grounding_drift: float,
+    thresholds: Optional[Dict[str, float]] = None) -> bool:
+    """A sample regresses if any drift exceeds its threshold."""
+    thresholds = thresholds or DEFAULT_THRESHOLDS
+    return (
+        semantic_drift > thresholds["semantic"]
+        or coverage_drift > thresholds["coverage"]
+        or grounding_drift > thresholds["grounding"]
+    )
@@ -0,0 +1,160 @@
+"""
+Tiered regression gate with early exit.
+
+run_batch_regression_eval computes all three drifts for every sample. For a pass/fail gate
+much of that work can be skipped once the verdict is known:
+
+Tier 1 (vectors, cheap)  : semantic + grounding drift for all samples in one vectorized pass.
+                           A sample over either threshold has already regressed. A low vector
+                           drift says nothing about coverage, so tier 1 only decides failures.
+Tier 2 (lexical)         : ROUGE-L coverage drift for every sample tier 1 did not fail.
+Tier 3 (judge, optional) : judge_fn(baseline, new, context) -> bool for samples whose
+                           coverage drift lands within the margin band around its threshold,
+                           (1 - margin) * threshold < drift <= (1 + margin) * threshold;
+                           the judge has the final say for those.
+
+Tier 2/3 run in batches; as soon as the failures exceed what min_pass_rate allows the gate
+stops, because the verdict can no longer change. Samples left unchecked are reported as
+undecided, and the gate only passes when no sample is undecided. The summary reports how
+much work ran and how much was skipped.
+"""
+import math
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from evals.regression.layer1_engine.coverage import batch_coverage_drift
+from evals.regression.layer1_engine.drift import DEFAULT_THRESHOLDS
+from evals.regression.layer1_engine.grounding import batch_grounding_drift
+from evals.regression.layer1_engine.similiarity import (
+    DEFAULT_CHUNK_SIZE,
+    EmbeddingInput,
+    align_embeddings,
+    batch_semantic_drift,
+)
+
+
+def run_tiered_regression_gate(
+    baseline_answers: List[str],
+    new_answers: List[str],
+    contexts: List[str],
+    baseline_answer_embs: EmbeddingInput,
+    new_answer_embs: EmbeddingInput,
+    context_embs: EmbeddingInput,
+    thresholds: Optional[Dict[str, float]] = None,
+    min_pass_rate: float = 0.95,
+    margin: float = 0.5,
+    judge_fn: Optional[Callable[[str, str, str], bool]] = None,
+    batch_size: int = 256,
+    early_exit: bool = True,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    sample_ids: Optional[List[str]] = None,
+) -> Dict:
+    """
+    Returns:
+        {
+            "summary": {
+                "gate_passed": bool (False while any sample is undecided), "early_stopped": bool,
+                "num_samples", "num_failures", "num_undecided", "pass_rate" (upper bound if stopped: undecided samples count as passing),
+                "mean_semantic_drift", "mean_grounding_drift",
+                "mean_coverage_drift" (over lexically checked samples, None if none),
+                "work": {"vector_checked", "lexical_checked", "lexical_skipped",
+                         "judge_checked", "skipped_fraction"}
+            },
+            "samples": [{"semantic_drift", "coverage_drift" (None if skipped),
+                         "grounding_drift", "regression" (None if undecided),
+                         "tier": "vector" | "lexical" | "judge" | "skipped"}]
+        }
+    sample_ids lines up EmbeddingStore inputs by id, as in run_batch_regression_eval.
+    """
+    n = len(baseline_answers)
+    if not (len(new_answers) == len(contexts) == n):
+        raise ValueError("All input lists must have same length")
+    if not 0.0 <= margin < 1.0:
+        raise ValueError("margin must be in [0, 1)")
+    if thresholds is None:
+        thresholds = dict(DEFAULT_THRESHOLDS)
+
+    allowed_failures = math.floor(n * (1 - min_pass_rate) + 1e-9)
+    baseline_answer_embs, new_answer_embs, context_embs = align_embeddings(
+        (baseline_answer_embs, new_answer_embs, context_embs), sample_ids
+    )
+
+    # Tier 1: vectors for everyone; they can only fail a sample
+    sem = np.asarray(batch_semantic_drift(baseline_answer_embs, new_answer_embs, chunk_size))
+    grd = np.asarray(batch_grounding_drift(baseline_answer_embs, new_answer_embs, context_embs, chunk_size))
+
+    regression: List[Optional[bool]] = [None] * n
+    tier = ["vector"] * n
+    cov: List[Optional[float]] = [None] * n
+
+    vector_fail = (sem > thresholds["semantic"]) | (grd > thresholds["grounding"])
+    for i in np.flatnonzero(vector_fail):
+        regression[i] = True
+    failures = int(vector_fail.sum())
+
+    # Tier 2 / 3: coverage for every sample still open, the judge for borderline coverage
+    remaining = np.flatnonzero(~vector_fail).tolist()
+    lexical_checked = 0
+    judge_checked = 0
+    early_stopped = False
+    cov_lo = (1 - margin) * thresholds["coverage"]
+    cov_hi = (1 + margin) * thresholds["coverage"]
+
+    for start in range(0, len(remaining), batch_size):
+        if early_exit and failures > allowed_failures:
+            early_stopped = True
+            break
+        idx = remaining[start:start + batch_size]
+        drifts = batch_coverage_drift([baseline_answers[i] for i in idx], [new_answers[i] for i in idx])
+        lexical_checked += len(idx)
+        for i, c in zip(idx, drifts):
+            cov[i] = c
+            tier[i] = "lexical"
+            verdict = c > thresholds["coverage"]
+            if judge_fn is not None and cov_lo < c <= cov_hi:
+                verdict = bool(judge_fn(baseline_answers[i], new_answers[i], contexts[i]))
+                tier[i] = "judge"
+                judge_checked += 1
+            regression[i] = verdict
+            failures += int(verdict)
+
+    for i in range(n):
+        if regression[i] is None:
+            tier[i] = "skipped"
+    undecided = sum(r is None for r in regression)
+    checked_cov = [c for c in cov if c is not None]
+    skipped = n - lexical_checked
+
+    summary = {
+        "gate_passed": failures <= allowed_failures and undecided == 0,
+        "early_stopped": early_stopped,
+        "num_samples": n,
+        "num_failures": failures,
+        "num_undecided": undecided,
+        "pass_rate": round(1 - failures / max(1, n), 3),
+        "mean_semantic_drift": round(float(np.mean(sem)), 3) if n else 0.0,
+        "mean_grounding_drift": round(float(np.mean(grd)), 3) if n else 0.0,
+        "mean_coverage_drift": round(float(np.mean(checked_cov)), 3) if checked_cov else None,
+        "work": {
+            "vector_checked": n,
+            "lexical_checked": lexical_checked,
+            "lexical_skipped": skipped,
+            "judge_checked": judge_checked,
+            "skipped_fraction": round(skipped / max(1, n), 3),
+        },
+    }
+    samples = [
+        {
+            "semantic_drift": round(float(sem[i]), 3),
+            "coverage_drift": None if cov[i] is None else round(cov[i], 3),
+            "grounding_drift": round(float(grd[i]), 3),
+            "regression": regression[i],
+            "tier": tier[i],
+        }
+        for i in range(n)
+    ]
+    return {
+        "summary": summary,
+        "samples": samples,
+    }
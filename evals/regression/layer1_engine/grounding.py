@@ -1,34 +1,42 @@
 import numpy as np
 from typing import List
-from sklearn.metrics.pairwise import cosine_similarity
-
-def batch_grounding_score(answer_embs: List[List[float]],context_embs: List[List[float]],) -> List[float]:
-    if len(answer_embs) != len(context_embs):
+from evals.regression.layer1_engine.similiarity import (
+    DEFAULT_CHUNK_SIZE,
+    EmbeddingInput,
+    load_embeddings,
+    paired_cosine_similarity,
+)
+
+def batch_grounding_score(answer_embs: EmbeddingInput,context_embs: EmbeddingInput,
+    chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[float]:
+    A = load_embeddings(answer_embs)
+    C = load_embeddings(context_embs)
+    if len(A) != len(C):
         raise ValueError("answer_embs and context_embs must have same length")
-    
-    A = np.array(answer_embs, dtype=np.float32)   
-    C = np.array(context_embs, dtype=np.float32)
 
-    sims = cosine_similarity(A, C)  
-    return np.diag(sims).tolist()
+    # row-wise cosine, answer[i] vs context[i] only
+    return paired_cosine_similarity(A, C, chunk_size).tolist()
 
-def batch_grounding_drift(baseline_answer_embs: List[List[float]],new_answer_embs: List[List[float]],
-    context_embs: List[List[float]]) -> List[float]:
-    #Drift = max(0, baseline_grounding - new_grounding) per sample.Penalizes only degradation in grounding.
-    if not (len(baseline_answer_embs)== len(new_answer_embs)== len(context_embs)):
+def _grounding_scores(baseline_answer_embs: EmbeddingInput,new_answer_embs: EmbeddingInput,
+    context_embs: EmbeddingInput, chunk_size: int):
+    B = load_embeddings(baseline_answer_embs)
+    N = load_embeddings(new_answer_embs)
+    C = load_embeddings(context_embs)
+    if not (len(B) == len(N) == len(C)):
         raise ValueError("All input lists must have same length")
 
-    base_scores = batch_grounding_score(baseline_answer_embs, context_embs)
-    new_scores = batch_grounding_score(new_answer_embs, context_embs)
-
-    drifts = [max(0.0, b - n) for b, n in zip(base_scores, new_scores)]
-    return drifts
-
-def batch_grounding_metrics(baseline_answer_embs: List[List[float]],new_answer_embs: List[List[float]],
-    context_embs: List[List[float]]):
-    base = batch_grounding_score(baseline_answer_embs, context_embs)
-    new = batch_grounding_score(new_answer_embs, context_embs)
-    drift = [max(0.0, b - n) for b, n in zip(base, new)]
-    return base, new, drift
-
+    base = paired_cosine_similarity(B, C, chunk_size)
+    new = paired_cosine_similarity(N, C, chunk_size)
+    return base, new
 
+def batch_grounding_drift(baseline_answer_embs: EmbeddingInput,new_answer_embs: EmbeddingInput,
+    context_embs: EmbeddingInput, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[float]:
+    #Drift = max(0, baseline_grounding - new_grounding) per sample.Penalizes only degradation in grounding.
+    base, new = _grounding_scores(baseline_answer_embs, new_answer_embs, context_embs, chunk_size)
+    return np.maximum(0.0, base - new).tolist()
+
+def batch_grounding_metrics(baseline_answer_embs: EmbeddingInput,new_answer_embs: EmbeddingInput,
+    context_embs: EmbeddingInput, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    base, new = _grounding_scores(baseline_answer_embs, new_answer_embs, context_embs, chunk_size)
+    drift = np.maximum(0.0, base - new)
+    return base.tolist(), new.tolist(), drift.tolist()
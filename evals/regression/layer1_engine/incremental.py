@@ -0,0 +1,194 @@
+"""
+Incremental regression evaluation against a stored baseline.
+
+run_batch_regression_eval recomputes every drift on every call. Between two release
+candidates usually only a handful of answers change, so this module keeps a state file with,
+per sample id:
+    - hashes of the baseline answer, new answer and context
+    - the unrounded semantic / coverage / grounding drifts and the regression flag
+plus running totals of the drifts and the failure count.
+
+A run hashes its inputs, recomputes drift only for samples whose texts changed (or are new),
+adjusts the running totals by the difference and rebuilds the summary from them. Unchanged
+samples never touch their embeddings, so with memory-mapped inputs (.npy paths or
+EmbeddingStores) a nightly run over a large golden set only reads the changed rows.
+
+Note: only texts are hashed. If the embedding model changes, start from a fresh state file.
+"""
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+from evals.regression.layer1_engine.coverage import batch_coverage_drift
+from evals.regression.layer1_engine.drift import DEFAULT_THRESHOLDS, detect_regression
+from evals.regression.layer1_engine.grounding import batch_grounding_drift
+from evals.regression.layer1_engine.similiarity import (
+    DEFAULT_CHUNK_SIZE,
+    EmbeddingInput,
+    batch_semantic_drift,
+    take_rows,
+)
+from src.core.embeddings.store import EmbeddingStore
+
+STATE_VERSION = 1
+DRIFTS = ("semantic_drift", "coverage_drift", "grounding_drift")
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def _empty_state(thresholds: Dict[str, float]) -> Dict:
+    return {
+        "version": STATE_VERSION,
+        "thresholds": thresholds,
+        "totals": {"num_failures": 0, **{d: 0.0 for d in DRIFTS}},
+        "samples": {},
+    }
+
+
+def load_state(path: str, thresholds: Dict[str, float]) -> Dict:
+    if not os.path.exists(path):
+        return _empty_state(thresholds)
+    with open(path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    if state.get("version") != STATE_VERSION:
+        return _empty_state(thresholds)
+    return state
+
+
+def save_state(path: str, state: Dict) -> None:
+    """Write to a temp file and rename, so a crash never leaves a half-written state."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def _add(totals: Dict, entry: Dict, sign: int) -> None:
+    for d in DRIFTS:
+        totals[d] += sign * entry[d]
+    totals["num_failures"] += sign * int(entry["regression"])
+
+
+def run_incremental_regression_eval(
+    sample_ids: List[str],
+    baseline_answers: List[str],
+    new_answers: List[str],
+    contexts: List[str],
+    baseline_answer_embs: EmbeddingInput,
+    new_answer_embs: EmbeddingInput,
+    context_embs: EmbeddingInput,
+    state_path: str,
+    thresholds: Optional[Dict[str, float]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Dict:
+    """
+    Same output as run_batch_regression_eval (plus "sample_id" per sample and
+    "num_recomputed" in the summary), but drift is only recomputed for samples whose
+    baseline answer, new answer or context changed since the last run with this state_path.
+    Samples missing from this run are dropped from the state and the totals.
+    """
+    n = len(sample_ids)
+    if not (len(baseline_answers) == len(new_answers) == len(contexts) == n):
+        raise ValueError("All input lists must have same length")
+    if len(set(sample_ids)) != n:
+        raise ValueError("sample_ids must be unique")
+    if thresholds is None:
+        thresholds = dict(DEFAULT_THRESHOLDS)
+
+    # stores are keyed by sample id; everything else is positional
+    baseline_answer_embs, new_answer_embs, context_embs = (
+        embs.select(sample_ids) if isinstance(embs, EmbeddingStore) else embs
+        for embs in (baseline_answer_embs, new_answer_embs, context_embs)
+    )
+
+    state = load_state(state_path, thresholds)
+    samples: Dict[str, Dict] = state["samples"]
+    totals = state["totals"]
+
+    # threshold change: flags are re-derived from the stored drifts, no embeddings needed
+    if state["thresholds"] != thresholds:
+        totals["num_failures"] = 0
+        for entry in samples.values():
+            entry["regression"] = detect_regression(
+                entry["semantic_drift"], entry["coverage_drift"], entry["grounding_drift"],
+                thresholds=thresholds,
+            )
+            totals["num_failures"] += int(entry["regression"])
+        state["thresholds"] = thresholds
+
+    # drop samples that are no longer in the golden set
+    keep = set(sample_ids)
+    for sid in [s for s in samples if s not in keep]:
+        _add(totals, samples.pop(sid), -1)
+
+    hashes = [
+        {
+            "baseline_hash": text_hash(b),
+            "answer_hash": text_hash(a),
+            "context_hash": text_hash(c),
+        }
+        for b, a, c in zip(baseline_answers, new_answers, contexts)
+    ]
+    changed = [
+        i for i, sid in enumerate(sample_ids)
+        if sid not in samples
+        or any(samples[sid][k] != v for k, v in hashes[i].items())
+    ]
+
+    if changed:
+        sem = batch_semantic_drift(
+            take_rows(baseline_answer_embs, changed), take_rows(new_answer_embs, changed), chunk_size
+        )
+        cov = batch_coverage_drift(
+            [baseline_answers[i] for i in changed], [new_answers[i] for i in changed]
+        )
+        grd = batch_grounding_drift(
+            take_rows(baseline_answer_embs, changed),
+            take_rows(new_answer_embs, changed),
+            take_rows(context_embs, changed),
+            chunk_size,
+        )
+        for j, i in enumerate(changed):
+            sid = sample_ids[i]
+            if sid in samples:
+                _add(totals, samples[sid], -1)
+            entry = {
+                **hashes[i],
+                "semantic_drift": float(sem[j]),
+                "coverage_drift": float(cov[j]),
+                "grounding_drift": float(grd[j]),
+                "regression": detect_regression(sem[j], cov[j], grd[j], thresholds=thresholds),
+            }
+            samples[sid] = entry
+            _add(totals, entry, +1)
+
+    save_state(state_path, state)
+
+    results = [
+        {
+            "sample_id": sid,
+            "semantic_drift": round(samples[sid]["semantic_drift"], 3),
+            "coverage_drift": round(samples[sid]["coverage_drift"], 3),
+            "grounding_drift": round(samples[sid]["grounding_drift"], 3),
+            "regression": samples[sid]["regression"],
+        }
+        for sid in sample_ids
+    ]
+    denom = max(1, n)
+    summary = {
+        "num_samples": n,
+        "num_failures": totals["num_failures"],
+        "num_recomputed": len(changed),
+        "pass_rate": round(1 - totals["num_failures"] / denom, 3),
+        "mean_semantic_drift": round(totals["semantic_drift"] / denom, 3),
+        "mean_coverage_drift": round(totals["coverage_drift"] / denom, 3),
+        "mean_grounding_drift": round(totals["grounding_drift"] / denom, 3),
+    }
+    return {
+        "summary": summary,
+        "samples": results,
+    }
@@ -1,31 +1,41 @@
 # evals/regression/run.py
-from evals.regression.layer1_engine.similiarity import batch_semantic_drift
+from evals.regression.layer1_engine.similiarity import (
+    DEFAULT_CHUNK_SIZE,
+    EmbeddingInput,
+    align_embeddings,
+    batch_semantic_drift,
+)
 from evals.regression.layer1_engine.coverage import batch_coverage_drift
 from evals.regression.layer1_engine.grounding import batch_grounding_drift
-from evals.regression.layer1_engine.drift import detect_regression
-from typing import List, Dict
+from evals.regression.layer1_engine.drift import DEFAULT_THRESHOLDS, detect_regression
+from typing import List, Dict, Optional
 import numpy as np
 
 def run_batch_regression_eval(
     baseline_answers: List[str],
     new_answers: List[str],
     contexts: List[str],  # not used directly, but kept for future judge evals
-    baseline_answer_embs: List[List[float]],
-    new_answer_embs: List[List[float]],
-    context_embs: List[List[float]],
+    baseline_answer_embs: EmbeddingInput,
+    new_answer_embs: EmbeddingInput,
+    context_embs: EmbeddingInput,
     thresholds: Dict[str, float] | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    sample_ids: Optional[List[str]] = None,
 ):
+    # Embeddings may be lists, arrays, .npy paths or EmbeddingStores (memory-mapped); drift
+    # kernels are row-wise paired cosines, so cost and memory grow linearly with the number
+    # of samples. With sample_ids, store inputs are narrowed to those ids (in that order)
+    # without loading them; stores whose ids are not in the same order need sample_ids.
+    baseline_answer_embs, new_answer_embs, context_embs = align_embeddings(
+        (baseline_answer_embs, new_answer_embs, context_embs), sample_ids
+    )
     if thresholds is None:
-        thresholds = {
-            "semantic": 0.25,
-            "coverage": 0.30,
-            "grounding": 0.20,
-        }
+        thresholds = dict(DEFAULT_THRESHOLDS)
 
-    sem_drifts = batch_semantic_drift(baseline_answer_embs, new_answer_embs)
+    sem_drifts = batch_semantic_drift(baseline_answer_embs, new_answer_embs, chunk_size)
     cov_drifts = batch_coverage_drift(baseline_answers, new_answers)
     grd_drifts = batch_grounding_drift(
-        baseline_answer_embs, new_answer_embs, context_embs
+        baseline_answer_embs, new_answer_embs, context_embs, chunk_size
     )
 
     results = []
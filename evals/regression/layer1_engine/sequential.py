@@ -0,0 +1,189 @@
+"""
+Sequential testing for regression pass/fail.
+
+Running the whole golden set through the new model just to compare pass_rate with a target
+is expensive (every sample needs a new LLM answer). Instead, samples are evaluated in a random
+order, a few at a time, and a Wald SPRT on the per-sample regression flag stops as soon as the
+verdict is settled at the configured confidence:
+
+    target failure rate  p* = 1 - min_pass_rate
+    H0 (pass): p = p* - delta        H1 (fail): p = p* + delta
+    alpha = beta = 1 - confidence
+
+If the golden set runs out first, the verdict is the exact one on the full set.
+The result carries the verdict, a Wilson confidence interval on the pass rate, normal
+intervals on the mean drifts, and how many samples were actually evaluated.
+
+evaluate_batch(indices) does the expensive work for the requested samples only and returns
+run_batch_regression_eval style sample dicts ("regression" plus drift fields). For inputs
+that are already computed, make_precomputed_evaluator builds one.
+"""
+import math
+import random
+from statistics import NormalDist
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from evals.regression.layer1_engine.drift import DEFAULT_THRESHOLDS
+from evals.regression.layer1_engine.similiarity import (
+    DEFAULT_CHUNK_SIZE,
+    EmbeddingInput,
+    align_embeddings,
+    take_rows,
+)
+
+DRIFTS = ("semantic_drift", "coverage_drift", "grounding_drift")
+
+EvaluateBatch = Callable[[List[int]], List[Dict]]
+
+
+def wilson_interval(successes: int, n: int, confidence: float) -> Tuple[float, float]:
+    if n == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = successes / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def mean_interval(values: Sequence[float], confidence: float) -> Dict[str, float]:
+    n = len(values)
+    if n == 0:
+        return {"mean": 0.0, "lower": 0.0, "upper": 0.0}
+    mean = math.fsum(values) / n
+    if n == 1:
+        return {"mean": mean, "lower": mean, "upper": mean}
+    var = math.fsum((v - mean) ** 2 for v in values) / (n - 1)
+    half = NormalDist().inv_cdf(0.5 + confidence / 2) * math.sqrt(var / n)
+    return {"mean": mean, "lower": mean - half, "upper": mean + half}
+
+
+def sequential_regression_test(
+    num_samples: int,
+    evaluate_batch: EvaluateBatch,
+    min_pass_rate: float = 0.95,
+    confidence: float = 0.95,
+    delta: float = 0.02,
+    batch_size: int = 16,
+    min_samples: int = 20,
+    seed: Optional[int] = 0,
+) -> Dict:
+    """
+    Returns:
+        {
+            "verdict": "pass" | "fail",
+            "decided_by": "sprt" | "exhausted",
+            "num_evaluated": int,      # samples whose evaluation was paid for
+            "num_samples": int,        # size of the golden set
+            "pass_rate": float,        # observed on the evaluated samples
+            "pass_rate_ci": [lower, upper],
+            "drift_ci": {"semantic_drift": {"mean", "lower", "upper"}, ...},
+            "log_likelihood_ratio": float,
+            "evaluated_indices": List[int],
+        }
+    """
+    if not 0.5 < confidence < 1.0:
+        raise ValueError("confidence must be in (0.5, 1)")
+    target = 1.0 - min_pass_rate
+    p0 = min(max(target - delta, 1e-6), 1 - 1e-6)
+    p1 = min(max(target + delta, 1e-6), 1 - 1e-6)
+    if p1 <= p0:
+        raise ValueError("delta too small for this min_pass_rate")
+    alpha = beta = 1.0 - confidence
+    upper = math.log((1 - beta) / alpha)   # cross -> accept H1 (regression)
+    lower = math.log(beta / (1 - alpha))   # cross -> accept H0 (pass)
+    step_fail = math.log(p1 / p0)
+    step_pass = math.log((1 - p1) / (1 - p0))
+
+    order = list(range(num_samples))
+    random.Random(seed).shuffle(order)
+
+    llr = 0.0
+    failures = 0
+    evaluated: List[int] = []
+    drift_values: Dict[str, List[float]] = {d: [] for d in DRIFTS}
+    verdict = None
+
+    for start in range(0, num_samples, batch_size):
+        idx = order[start:start + batch_size]
+        results = evaluate_batch(idx)
+        if len(results) != len(idx):
+            raise ValueError("evaluate_batch must return one result per index")
+        for i, res in zip(idx, results):
+            evaluated.append(i)
+            failed = bool(res["regression"])
+            failures += int(failed)
+            for d in DRIFTS:
+                if res.get(d) is not None:
+                    drift_values[d].append(float(res[d]))
+            llr += step_fail if failed else step_pass
+        if len(evaluated) >= min_samples:
+            if llr >= upper:
+                verdict = "fail"
+            elif llr <= lower:
+                verdict = "pass"
+        if verdict is not None:
+            break
+
+    decided_by = "sprt"
+    n = len(evaluated)
+    pass_rate = 1 - failures / max(1, n)
+    if verdict is None:
+        decided_by = "exhausted"
+        verdict = "pass" if pass_rate >= min_pass_rate else "fail"
+
+    lo, hi = wilson_interval(n - failures, n, confidence)
+    return {
+        "verdict": verdict,
+        "decided_by": decided_by,
+        "num_evaluated": n,
+        "num_samples": num_samples,
+        "pass_rate": round(pass_rate, 4),
+        "pass_rate_ci": [round(lo, 4), round(hi, 4)],
+        "drift_ci": {
+            d: {k: round(v, 4) for k, v in mean_interval(vals, confidence).items()}
+            for d, vals in drift_values.items()
+            if vals
+        },
+        "log_likelihood_ratio": round(llr, 4),
+        "evaluated_indices": evaluated,
+    }
+
+
+def make_precomputed_evaluator(
+    baseline_answers: List[str],
+    new_answers: List[str],
+    contexts: List[str],
+    baseline_answer_embs: EmbeddingInput,
+    new_answer_embs: EmbeddingInput,
+    context_embs: EmbeddingInput,
+    thresholds: Optional[Dict[str, float]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    sample_ids: Optional[List[str]] = None,
+) -> EvaluateBatch:
+    """
+    evaluate_batch that runs run_batch_regression_eval on just the requested rows.
+    sample_ids lines up EmbeddingStore inputs by id (once, up front), as in
+    run_batch_regression_eval; stores in different id orders without it raise ValueError.
+    """
+    from evals.regression.layer1_engine.run import run_batch_regression_eval
+
+    thresholds = thresholds or dict(DEFAULT_THRESHOLDS)
+    baseline_answer_embs, new_answer_embs, context_embs = align_embeddings(
+        (baseline_answer_embs, new_answer_embs, context_embs), sample_ids
+    )
+
+    def evaluate_batch(indices: List[int]) -> List[Dict]:
+        return run_batch_regression_eval(
+            [baseline_answers[i] for i in indices],
+            [new_answers[i] for i in indices],
+            [contexts[i] for i in indices],
+            take_rows(baseline_answer_embs, indices),
+            take_rows(new_answer_embs, indices),
+            take_rows(context_embs, indices),
+            thresholds=thresholds,
+            chunk_size=chunk_size,
+        )["samples"]
+
+    return evaluate_batch
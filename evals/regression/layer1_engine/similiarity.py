@@ -1,25 +1,113 @@
-from typing import List
+from typing import List, Optional, Sequence, Union
+import os
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+from src.core.embeddings.store import EmbeddingStore, RowSelection
 
+# Embeddings can be given as nested lists, arrays, a path to a .npy file (memory-mapped),
+# an EmbeddingStore or rows selected from one (EmbeddingStore.select)
+EmbeddingInput = Union[
+    Sequence[Sequence[float]], np.ndarray, str, os.PathLike, EmbeddingStore, RowSelection
+]
 
-def batch_semantic_similarity(baseline_embs: List[List[float]],new_embs: List[List[float]]) -> List[float]:
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def load_embeddings(embs: EmbeddingInput) -> np.ndarray:
+    """
+    Returns a 2-D array(-like) view; .npy paths and stores are memory-mapped and
+    RowSelections gather lazily, so nothing is read up front.
+    """
+    if isinstance(embs, (str, os.PathLike)):
+        arr = np.load(embs, mmap_mode="r")
+    elif isinstance(embs, EmbeddingStore):
+        arr = embs.vectors
+    elif isinstance(embs, (np.ndarray, RowSelection)):
+        arr = embs
+    else:
+        arr = np.asarray(embs, dtype=np.float32)
+    if arr.ndim != 2:
+        raise ValueError("embeddings must be 2-D (n, d)")
+    return arr
+
+
+def align_embeddings(inputs: Sequence[EmbeddingInput],
+                     sample_ids: Optional[Sequence[str]] = None) -> List[EmbeddingInput]:
+    """
+    Lines up paired embedding inputs row by row.
+    With sample_ids, every EmbeddingStore is narrowed to those ids (in that order) without
+    loading them. Without sample_ids, stores are compared by position, which is only correct
+    when they hold the same ids in the same order; anything else raises ValueError instead
+    of silently pairing unrelated rows.
+    """
+    if sample_ids is not None:
+        return [embs.select(sample_ids) if isinstance(embs, EmbeddingStore) else embs for embs in inputs]
+    stores = [embs for embs in inputs if isinstance(embs, EmbeddingStore)]
+    if any(store.ids != stores[0].ids for store in stores[1:]):
+        raise ValueError(
+            "EmbeddingStore inputs hold different ids (or the same ids in a different order); "
+            "pass sample_ids to line them up by id"
+        )
+    return list(inputs)
+
+
+def take_rows(embs: EmbeddingInput, indices: Sequence[int]) -> EmbeddingInput:
+    """
+    Rows `indices` of any EmbeddingInput, without reading the other rows.
+    Lists stay lists; store-backed inputs stay lazy RowSelections.
+    """
+    if isinstance(embs, list):
+        return [embs[i] for i in indices]
+    arr = load_embeddings(embs)
+    indices = np.asarray(indices, dtype=np.int64)
+    if isinstance(arr, RowSelection):
+        return RowSelection(arr.vectors, arr.rows[indices])
+    if isinstance(arr, np.memmap):
+        return RowSelection(arr, indices)
+    return arr[indices]
+
+
+def paired_cosine_similarity(a_embs: EmbeddingInput, b_embs: EmbeddingInput,
+                             chunk_size: int = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+    """
+    Row-wise cosine: out[i] = cos(a[i], b[i]), in float32.
+    Only the paired rows are compared (O(N*d), not the N x N matrix), and rows are processed
+    in chunks of chunk_size so memory stays O(chunk_size * d) even for memory-mapped inputs.
+    Zero vectors give similarity 0, same as sklearn's cosine_similarity.
+    """
+    A = load_embeddings(a_embs)
+    B = load_embeddings(b_embs)
+    if A.shape != B.shape:
+        raise ValueError(f"embedding shapes differ: {A.shape} vs {B.shape}")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+
+    n = A.shape[0]
+    out = np.empty(n, dtype=np.float32)
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        a = np.asarray(A[start:stop], dtype=np.float32)
+        b = np.asarray(B[start:stop], dtype=np.float32)
+        dots = np.einsum("ij,ij->i", a, b)
+        norms = np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1)
+        out[start:stop] = np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+    return out
+
+
+def batch_semantic_similarity(baseline_embs: EmbeddingInput, new_embs: EmbeddingInput,
+                              chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[float]:
     """
     Computes cosine similarity for multiple embedding pairs.[i] is compared with 
     new_embs[i].Returns list of similarities.
     """
-    if len(baseline_embs) != len(new_embs):
+    A = load_embeddings(baseline_embs)
+    B = load_embeddings(new_embs)
+    if len(A) != len(B):
         raise ValueError("baseline_embs and new_embs must have same length")
 
-    A = np.array(baseline_embs, dtype=np.float32)  
-    B = np.array(new_embs, dtype=np.float32)       
-    sim_matrix = cosine_similarity(A, B)
-    return np.diag(sim_matrix).tolist()
+    return paired_cosine_similarity(A, B, chunk_size).tolist()
 
-def batch_semantic_drift(baseline_embs: List[List[float]],new_embs: List[List[float]])->float:
+def batch_semantic_drift(baseline_embs: EmbeddingInput, new_embs: EmbeddingInput,
+                         chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[float]:
     """Drift = 1 - similarity, per pair."""
-    sims = batch_semantic_similarity(baseline_embs, new_embs)
+    sims = batch_semantic_similarity(baseline_embs, new_embs, chunk_size)
     return [1.0 - s for s in sims]
-
-
-
@@ -0,0 +1,97 @@
+"""
+Parity check + speed benchmark: vectorized retrieval engine vs the per-metric functions.
+
+Run from the repo root:
+    python -m evals.retrieval.engine.benchmark --num-queries 20000
+"""
+import argparse
+import random
+import time
+from typing import Dict, List, Set, Tuple
+
+from evals.retrieval.engine.engine import compute_retrieval_metrics
+from evals.retrieval.mrr.mrr import mean_reciprocal_rank
+from evals.retrieval.ndcg.ndcg import mean_ndcg_at_k
+from evals.retrieval.precision_at_k.precision_at_k import mean_precision_at_k
+from evals.retrieval.recall_at_k.recall_at_k import mean_recall_at_k
+
+KS = (0, 1, 3, 5, 10, 20)
+
+
+def make_runs(
+    num_queries: int, corpus_size: int = 5000, depth: int = 20, seed: int = 0
+) -> Tuple[List[List[str]], List[Set[str]], List[Dict[str, int]]]:
+    """Ranked lists (some short or empty) with binary and graded qrels (some empty)."""
+    rng = random.Random(seed)
+    all_retrieved, all_relevant, all_maps = [], [], []
+    for _ in range(num_queries):
+        relevance_map = {
+            f"D{rng.randrange(corpus_size)}": rng.randint(0, 3)
+            for _ in range(rng.randint(0, 8))
+        }
+        pool = list(relevance_map) + [f"D{rng.randrange(corpus_size)}" for _ in range(depth)]
+        rng.shuffle(pool)
+        all_retrieved.append(pool[: rng.randint(0, depth)])
+        all_relevant.append(set(relevance_map))
+        all_maps.append(relevance_map)
+    return all_retrieved, all_relevant, all_maps
+
+
+def reference_metrics(all_retrieved, all_relevant, all_maps) -> Dict[str, float]:
+    result = {}
+    for k in KS:
+        result[f"precision@{k}"] = mean_precision_at_k(all_retrieved, all_relevant, k)
+        result[f"recall@{k}"] = mean_recall_at_k(all_retrieved, all_relevant, k)
+        if k > 0:
+            result[f"ndcg@{k}"] = mean_ndcg_at_k(all_retrieved, all_maps, k)
+    result["mrr"] = mean_reciprocal_rank(all_retrieved, all_relevant)
+    return result
+
+
+def engine_metrics(all_retrieved, all_relevant, all_maps) -> Dict[str, float]:
+    result = compute_retrieval_metrics(all_retrieved, all_relevant, KS, ("precision", "recall"))
+    graded = compute_retrieval_metrics(all_retrieved, all_maps, [k for k in KS if k > 0], ("ndcg",))
+    result.update({key: value for key, value in graded.items() if key.startswith("ndcg")})
+    return result
+
+
+def check_parity(all_retrieved, all_relevant, all_maps, tol: float = 1e-9) -> None:
+    expected = reference_metrics(all_retrieved, all_relevant, all_maps)
+    actual = engine_metrics(all_retrieved, all_relevant, all_maps)
+    worst = 0.0
+    for key, value in expected.items():
+        diff = abs(value - actual[key])
+        worst = max(worst, diff)
+        print(f"{key:<14}: {value:.6f}  |diff| {diff:.2e}")
+    if worst > tol:
+        raise AssertionError("retrieval engine diverges from the per-metric functions")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-queries", type=int, default=20_000)
+    parser.add_argument("--parity-queries", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print("Parity vs per-metric functions")
+    print("=" * 40)
+    check_parity(*make_runs(args.parity_queries, seed=args.seed))
+
+    runs = make_runs(args.num_queries, seed=args.seed + 1)
+    start = time.perf_counter()
+    reference_metrics(*runs)
+    loop_s = time.perf_counter() - start
+    start = time.perf_counter()
+    engine_metrics(*runs)
+    engine_s = time.perf_counter() - start
+
+    print(f"\nSpeed on {args.num_queries} queries, k in {KS}")
+    print("=" * 40)
+    print(f"per-metric : {loop_s:.2f} s")
+    print(f"engine     : {engine_s:.2f} s")
+    print(f"speedup    : {loop_s / max(engine_s, 1e-9):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Vectorized retrieval-metrics engine.
+
+The per-metric functions (mean_precision_at_k, mean_recall_at_k, mean_reciprocal_rank,
+mean_ndcg_at_k) each walk every ranked list in Python and test membership against lists.
+Here the runs are encoded once:
+
+1) qrels are encoded once (EncodedQrels): judged doc ids map to integers and become sorted
+   (query, doc) integer keys; ideal DCG prefixes are cached per depth
+2) ranked lists become a padded (queries x K) int matrix (-1 = padding, -2 = unjudged)
+3) all lookups are one np.searchsorted against the qrel keys
+4) the result is a (queries x K) grade matrix; every metric for every cutoff is read off
+   cumulative sums of it
+
+Relevance per query is either a collection of relevant ids (binary, grade 1) or a
+{doc_id: grade} map (graded, as used by nDCG). A doc counts as relevant for
+precision / recall / MRR / MAP / hit-rate when its grade is > 0.
+
+Usage:
+    qrels = EncodedQrels(all_relevance)
+    runs = encode_runs(all_retrieved, qrels, max_k=10)
+    retrieval_metrics(runs, ks=(1, 3, 5, 10))
+"""
+import math
+from typing import Dict, Iterable, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+Relevance = Union[Mapping[str, float], Iterable[str]]
+
+METRICS = ("precision", "recall", "ndcg", "map", "hit_rate")
+
+
+def _grades(relevance: Relevance) -> Dict[str, float]:
+    if isinstance(relevance, Mapping):
+        return dict(relevance)
+    return {doc_id: 1 for doc_id in relevance}
+
+
+class EncodedQrels:
+    """
+    Qrels encoded once, reusable across runs (e.g. every retriever in a sweep).
+
+    vocab        : doc id -> int, only docs that appear in the qrels
+    keys         : sorted query * len(vocab) + doc keys, with key_grades aligned to them
+    ideal        : (q, R) float64 grades sorted descending, R = largest qrel set
+    num_relevant : (q,) int64, number of docs with grade > 0 (for recall: len of the given
+                   collection when relevance is binary)
+    """
+
+    def __init__(self, all_relevance: Sequence[Relevance]):
+        graded = [_grades(r) for r in all_relevance]
+        n = len(graded)
+        width = max((len(g) for g in graded), default=0)
+
+        self.vocab: Dict[str, int] = {}
+        qrel_q, qrel_doc, qrel_grade = [], [], []
+        self.ideal = np.zeros((n, width), dtype=np.float64)
+        self.num_relevant = np.zeros(n, dtype=np.int64)
+        for q, (relevance, grades) in enumerate(zip(all_relevance, graded)):
+            for doc_id, grade in grades.items():
+                qrel_q.append(q)
+                qrel_doc.append(self.vocab.setdefault(doc_id, len(self.vocab)))
+                qrel_grade.append(grade)
+            top = sorted(grades.values(), reverse=True)
+            self.ideal[q, :len(top)] = top
+            if isinstance(relevance, Mapping):
+                self.num_relevant[q] = sum(1 for g in grades.values() if g > 0)
+            else:
+                self.num_relevant[q] = len(relevance)
+
+        self.stride = max(len(self.vocab), 1)
+        keys = np.asarray(qrel_q, dtype=np.int64) * self.stride + np.asarray(qrel_doc, dtype=np.int64)
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.key_grades = np.asarray(qrel_grade, dtype=np.float64)[order]
+        self._idcg: Dict[int, np.ndarray] = {}
+
+    @property
+    def num_queries(self) -> int:
+        return len(self.num_relevant)
+
+    def cumulative_idcg(self, depth: int) -> np.ndarray:
+        """(q, depth) ideal DCG prefixes; computed once per depth and cached."""
+        cached = self._idcg.get(depth)
+        if cached is None:
+            ideal = np.zeros((self.num_queries, depth), dtype=np.float64)
+            width = min(depth, self.ideal.shape[1])
+            ideal[:, :width] = self.ideal[:, :width]
+            discount = np.log2(np.arange(2, depth + 2, dtype=np.float64))
+            cached = self._idcg[depth] = np.cumsum((2 ** ideal - 1) / discount, axis=1)
+        return cached
+
+    def lookup(self, doc_ids: np.ndarray) -> np.ndarray:
+        """Grades for a (q, K) matrix of encoded doc ids (negative = padding / unjudged)."""
+        if not len(self.keys):
+            return np.zeros(doc_ids.shape, dtype=np.float64)
+        run_keys = np.arange(doc_ids.shape[0], dtype=np.int64)[:, None] * self.stride + doc_ids
+        pos = np.minimum(np.searchsorted(self.keys, run_keys), len(self.keys) - 1)
+        found = (self.keys[pos] == run_keys) & (doc_ids >= 0)
+        return np.where(found, self.key_grades[pos], 0.0)
+
+
+class EncodedRuns:
+    """
+    doc_ids : (q, K) int64 qrels vocab ids; -1 = padding, -2 = doc not in the qrels
+    grades  : (q, K) float64 grade of each retrieved doc (0 = not relevant / padding)
+    qrels   : the EncodedQrels the run was joined against
+    """
+
+    def __init__(self, doc_ids: np.ndarray, grades: np.ndarray, qrels: EncodedQrels):
+        self.doc_ids = doc_ids
+        self.grades = grades
+        self.qrels = qrels
+
+    @property
+    def num_queries(self) -> int:
+        return self.doc_ids.shape[0]
+
+    @property
+    def depth(self) -> int:
+        return self.doc_ids.shape[1]
+
+    @property
+    def num_relevant(self) -> np.ndarray:
+        return self.qrels.num_relevant
+
+
+def encode_runs(
+    all_retrieved: Sequence[Sequence[str]],
+    all_relevance: Union[Sequence[Relevance], EncodedQrels],
+    max_k: Optional[int] = None,
+) -> EncodedRuns:
+    """
+    all_relevance: per-query relevance, or an EncodedQrels to reuse across runs.
+    max_k: depth of the padded matrix; defaults to the longest ranked list. MRR only sees
+    the first max_k ranks.
+    """
+    qrels = all_relevance if isinstance(all_relevance, EncodedQrels) else EncodedQrels(all_relevance)
+    assert len(all_retrieved) == qrels.num_queries, "Query count mismatch"
+    n = len(all_retrieved)
+    depth = max((len(r) for r in all_retrieved), default=0)
+    if max_k is not None:
+        depth = max_k
+    depth = max(depth, 1)
+
+    vocab = qrels.vocab
+    doc_ids = np.full((n, depth), -1, dtype=np.int64)
+    for q, retrieved in enumerate(all_retrieved):
+        row = [vocab.get(d, -2) for d in retrieved[:depth]]
+        doc_ids[q, :len(row)] = row
+
+    return EncodedRuns(doc_ids, qrels.lookup(doc_ids), qrels)
+
+
+def per_query_metrics(
+    runs: EncodedRuns,
+    ks: Sequence[int] = (1, 3, 5, 10),
+    metrics: Sequence[str] = METRICS,
+) -> Dict[str, Dict]:
+    """
+    Per-query arrays: {"precision": {k: (q,) array}, ..., "mrr": (q,) array}.
+
+    precision@k : hits in top k / k (0 when k == 0)
+    recall@k    : hits in top k / num_relevant (0 when nothing is relevant)
+    ndcg@k      : DCG@k / IDCG@k with gain 2^rel - 1 and discount log2(rank + 1)
+    map@k       : sum of precision@i over relevant ranks i <= k, / min(k, num_relevant)
+    hit_rate@k  : 1 if any relevant doc in top k
+    mrr         : 1 / rank of the first relevant doc within the matrix depth
+    """
+    unknown = set(metrics) - set(METRICS)
+    if unknown:
+        raise ValueError(f"Unknown metrics: {sorted(unknown)}. Available: {list(METRICS)}")
+    if ks and max(ks) > runs.depth:
+        raise ValueError(f"k={max(ks)} exceeds the encoded depth {runs.depth}; re-encode with max_k")
+
+    hits = runs.grades > 0
+    cum_hits = np.cumsum(hits, axis=1)
+    num_rel = runs.num_relevant.astype(np.float64)
+    ranks = np.arange(1, runs.depth + 1, dtype=np.float64)
+
+    def at(cum: np.ndarray, k: int) -> np.ndarray:
+        return cum[:, k - 1] if k > 0 else np.zeros(runs.num_queries)
+
+    out: Dict[str, Dict] = {}
+    if "precision" in metrics:
+        out["precision"] = {k: at(cum_hits, k) / k if k > 0 else at(cum_hits, k) for k in ks}
+    if "recall" in metrics:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out["recall"] = {
+                k: np.where(num_rel > 0, at(cum_hits, k) / num_rel, 0.0) for k in ks
+            }
+    if "ndcg" in metrics:
+        cum_dcg = np.cumsum((2 ** runs.grades - 1) / np.log2(ranks + 1), axis=1)
+        cum_idcg = runs.qrels.cumulative_idcg(runs.depth)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out["ndcg"] = {
+                k: np.where(at(cum_idcg, k) > 0, at(cum_dcg, k) / at(cum_idcg, k), 0.0)
+                for k in ks
+            }
+    if "map" in metrics:
+        cum_ap = np.cumsum(np.where(hits, cum_hits / ranks, 0.0), axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out["map"] = {}
+            for k in ks:
+                denom = np.minimum(num_rel, k)
+                out["map"][k] = np.where(denom > 0, at(cum_ap, k) / denom, 0.0)
+    if "hit_rate" in metrics:
+        out["hit_rate"] = {k: (at(cum_hits, k) > 0).astype(np.float64) for k in ks}
+
+    first = np.argmax(hits, axis=1)
+    out["mrr"] = np.where(hits.any(axis=1), 1.0 / (first + 1), 0.0)
+    return out
+
+
+def retrieval_metrics(
+    runs: EncodedRuns,
+    ks: Sequence[int] = (1, 3, 5, 10),
+    metrics: Sequence[str] = METRICS,
+) -> Dict[str, float]:
+    """Mean over queries, flattened: {"precision@1": ..., "ndcg@10": ..., "mrr": ...}."""
+    per_query = per_query_metrics(runs, ks, metrics)
+    n = max(1, runs.num_queries)
+    result: Dict[str, float] = {}
+    for name in METRICS:
+        if name in per_query:
+            for k, values in per_query[name].items():
+                result[f"{name}@{k}"] = math.fsum(values) / n
+    result["mrr"] = math.fsum(per_query["mrr"]) / n
+    return result
+
+
+def compute_retrieval_metrics(
+    all_retrieved: Sequence[Sequence[str]],
+    all_relevance: Sequence[Relevance],
+    ks: Sequence[int] = (1, 3, 5, 10),
+    metrics: Sequence[str] = METRICS,
+) -> Dict[str, float]:
+    """encode_runs + retrieval_metrics; MRR covers the full ranked lists."""
+    depth = max([len(r) for r in all_retrieved] + list(ks) + [1])
+    return retrieval_metrics(encode_runs(all_retrieved, all_relevance, max_k=depth), ks, metrics)
@@ -0,0 +1,257 @@
+"""
+Streaming retrieval metrics over TREC-style run files.
+
+Production run files are too large to load as all_retrieved lists. Every metric here only
+depends on the rank of each judged doc, not on the order rows arrive in, so a query's state
+is a handful of counters per cutoff:
+
+    hits[k]  relevant docs with rank <= k        -> precision@k, recall@k, hit_rate@k
+    dcg[k]   sum of (2^grade - 1) / log2(rank + 1) -> ndcg@k
+    best     smallest rank of a relevant doc     -> mrr
+
+A doc listed more than once for the same query counts once, at its best rank, so only the
+relevant docs seen so far are remembered per open query.
+
+The qrels are loaded once into an index. Rows are (query_id, doc_id, rank) with 1-based
+ranks. When the run is grouped by query (the TREC convention) a query is finished as soon
+as the next one starts: its per-query record is written out and only running totals stay
+in memory. With grouped=False every query is kept open until finish().
+
+Means cover the queries that appear in the run, as trec_eval does by default. To get the
+numbers compute_retrieval_metrics gives for one entry per qrels query (with an empty list
+for queries the retriever returned nothing for), pass include_missing=True.
+
+File formats:
+    run   : query_id Q0 doc_id rank score tag
+    qrels : query_id 0 doc_id grade
+(.gz files are read transparently.)
+
+Usage:
+    qrels = load_qrels("data/qrels.txt")
+    with StreamingRetrievalMetrics(qrels, ks=(1, 5, 10), per_query_path="per_query.jsonl") as acc:
+        acc.add_rows(read_trec_run("data/run.txt"))
+    acc.summary()
+"""
+import gzip
+import json
+import math
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+Qrels = Dict[str, Dict[str, int]]
+Row = Tuple[str, str, int]
+
+
+def _open_text(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def load_qrels(path: str) -> Qrels:
+    """{query_id: {doc_id: grade}} from a TREC qrels file."""
+    qrels: Qrels = {}
+    with _open_text(path) as f:
+        for line_no, line in enumerate(f, start=1):
+            parts = line.split()
+            if not parts:
+                continue
+            if len(parts) != 4:
+                raise ValueError(f"{path}:{line_no}: expected 'query_id 0 doc_id grade'")
+            query_id, _, doc_id, grade = parts
+            qrels.setdefault(query_id, {})[doc_id] = int(grade)
+    return qrels
+
+
+def read_trec_run(path: str) -> Iterator[Row]:
+    """Lazily yields (query_id, doc_id, rank) from a TREC run file."""
+    with _open_text(path) as f:
+        for line_no, line in enumerate(f, start=1):
+            parts = line.split()
+            if not parts:
+                continue
+            if len(parts) < 4:
+                raise ValueError(f"{path}:{line_no}: expected 'query_id Q0 doc_id rank ...'")
+            yield parts[0], parts[2], int(parts[3])
+
+
+class _QueryState:
+    __slots__ = ("hits", "dcg", "ranks", "rows")
+
+    def __init__(self, num_ks: int):
+        self.hits = [0] * num_ks
+        self.dcg = [0.0] * num_ks
+        self.ranks: Dict[str, int] = {}  # relevant doc -> best rank seen
+        self.rows = 0
+
+
+class StreamingRetrievalMetrics:
+    """
+    qrels           : {query_id: {doc_id: grade}}; grade > 0 counts as relevant
+    ks              : cutoffs for precision / recall / ndcg / hit_rate
+    per_query_path  : optional JSONL file, one record per finished query
+    grouped         : rows of a query are contiguous (finish queries eagerly)
+    include_missing : on finish(), queries in the qrels that never appeared in the run
+                      count as all-zero queries (like trec_eval -c). Off by default, so
+                      the means cover only the run's queries; turn it on to match
+                      compute_retrieval_metrics over every qrels query
+    """
+
+    def __init__(
+        self,
+        qrels: Qrels,
+        ks: Sequence[int] = (1, 5, 10),
+        per_query_path: Optional[str] = None,
+        grouped: bool = True,
+        include_missing: bool = False,
+    ):
+        if not ks or min(ks) < 1:
+            raise ValueError("ks must be positive")
+        self.qrels = qrels
+        self.ks = tuple(sorted(set(ks)))
+        self.grouped = grouped
+        self.include_missing = include_missing
+        self._open: Dict[str, _QueryState] = {}
+        self._finished: set = set()
+        self._current: Optional[str] = None
+        self._idcg: Dict[str, List[float]] = {}
+        self._totals: Dict[str, float] = {name: 0.0 for name in self._metric_names()}
+        self.num_queries = 0
+        self.num_rows = 0
+        self._writer = None
+        if per_query_path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(per_query_path)), exist_ok=True)
+            self._writer = open(per_query_path, "w", encoding="utf-8")
+
+    def _metric_names(self) -> List[str]:
+        names = [f"{m}@{k}" for m in ("precision", "recall", "ndcg", "hit_rate") for k in self.ks]
+        return names + ["mrr"]
+
+    def _ideal(self, query_id: str) -> List[float]:
+        """IDCG at every cutoff, computed once per query."""
+        cached = self._idcg.get(query_id)
+        if cached is None:
+            grades = sorted(self.qrels.get(query_id, {}).values(), reverse=True)
+            cached, total, i = [], 0.0, 0
+            for k in self.ks:
+                while i < min(k, len(grades)):
+                    total += (2 ** grades[i] - 1) / math.log2(i + 2)
+                    i += 1
+                cached.append(total)
+            self._idcg[query_id] = cached
+        return cached
+
+    # -----------------------------
+    # consuming rows
+    # -----------------------------
+
+    def add(self, query_id: str, doc_id: str, rank: int) -> None:
+        if query_id != self._current:
+            if self.grouped and self._current is not None:
+                self._finish_query(self._current)
+            if query_id in self._finished:
+                raise ValueError(
+                    f"query {query_id!r} reappeared after it was finished; "
+                    "the run is not grouped by query, use grouped=False"
+                )
+            self._current = query_id
+        state = self._open.get(query_id)
+        if state is None:
+            state = self._open[query_id] = _QueryState(len(self.ks))
+        state.rows += 1
+        self.num_rows += 1
+
+        grade = self.qrels.get(query_id, {}).get(doc_id, 0)
+        if grade <= 0 or rank < 1:
+            return
+        previous = state.ranks.get(doc_id)
+        if previous is not None:
+            if rank >= previous:
+                return
+            # a repeated doc only counts at its best rank
+            self._count(state, grade, previous, -1)
+        state.ranks[doc_id] = rank
+        self._count(state, grade, rank, 1)
+
+    def _count(self, state: _QueryState, grade: int, rank: int, sign: int) -> None:
+        gain = (2 ** grade - 1) / math.log2(rank + 1)
+        for j, k in enumerate(self.ks):
+            if rank <= k:
+                state.hits[j] += sign
+                state.dcg[j] += sign * gain
+
+    def add_rows(self, rows: Iterable[Row]) -> "StreamingRetrievalMetrics":
+        for query_id, doc_id, rank in rows:
+            self.add(query_id, doc_id, rank)
+        return self
+
+    def _finish_query(self, query_id: str) -> None:
+        state = self._open.pop(query_id, None) or _QueryState(len(self.ks))
+        self._finished.add(query_id)
+        num_relevant = sum(1 for g in self.qrels.get(query_id, {}).values() if g > 0)
+        idcg = self._ideal(query_id)
+
+        record = {"query_id": query_id, "num_retrieved": state.rows, "num_relevant": num_relevant}
+        for j, k in enumerate(self.ks):
+            record[f"precision@{k}"] = state.hits[j] / k
+            record[f"recall@{k}"] = state.hits[j] / num_relevant if num_relevant else 0.0
+            record[f"ndcg@{k}"] = state.dcg[j] / idcg[j] if idcg[j] > 0 else 0.0
+            record[f"hit_rate@{k}"] = 1.0 if state.hits[j] else 0.0
+        record["mrr"] = 1.0 / min(state.ranks.values()) if state.ranks else 0.0
+        self._idcg.pop(query_id, None)
+
+        for name in self._totals:
+            self._totals[name] += record[name]
+        self.num_queries += 1
+        if self._writer is not None:
+            self._writer.write(json.dumps(record) + "\n")
+
+    def finish(self) -> Dict[str, float]:
+        """Closes every open query (and missing ones if include_missing) and returns summary()."""
+        for query_id in list(self._open):
+            self._finish_query(query_id)
+        self._current = None
+        if self.include_missing:
+            for query_id in self.qrels:
+                if query_id not in self._finished:
+                    self._finish_query(query_id)
+        if self._writer is not None:
+            self._writer.flush()
+        return self.summary()
+
+    def summary(self) -> Dict[str, float]:
+        """Means over finished queries."""
+        n = max(1, self.num_queries)
+        return {
+            "num_queries": self.num_queries,
+            "num_rows": self.num_rows,
+            **{name: total / n for name, total in self._totals.items()},
+        }
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.finish()
+        self.close()
+
+
+def evaluate_run_file(
+    run_path: str,
+    qrels_path: str,
+    ks: Sequence[int] = (1, 5, 10),
+    per_query_path: Optional[str] = None,
+    grouped: bool = True,
+    include_missing: bool = False,
+) -> Dict[str, float]:
+    """Streams run_path against qrels_path; see StreamingRetrievalMetrics for the arguments."""
+    qrels = load_qrels(qrels_path)
+    with StreamingRetrievalMetrics(qrels, ks, per_query_path, grouped, include_missing) as acc:
+        acc.add_rows(read_trec_run(run_path))
+    return acc.summary()
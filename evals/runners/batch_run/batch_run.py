@@ -0,0 +1,401 @@
+"""
+Streaming batch runner for the eval suite.
+
+Reads an evaluation set from JSONL one record at a time, fans fixed size batches out to the
+metric modules and appends normalized records to an output JSONL file as each batch finishes.
+Only the current batch and running means are kept in memory, so memory stays flat no matter
+how large the dataset is.
+
+Input record (one JSON object per line, only the fields used by the selected metrics are needed):
+{
+    "id": "q-001",                      # optional, defaults to the line index
+    "question": str,
+    "reference": str,                   # rouge / bleu
+    "answer": str,                      # rouge / bleu / faithfulness / regression
+    "context": str,                     # faithfulness / regression
+    "retrieved_ids": [str, ...],        # ndcg
+    "relevance": {doc_id: int},         # ndcg
+    "baseline_answer": str,             # regression
+    "baseline_answer_emb": [float],     # regression
+    "answer_emb": [float],              # regression
+    "context_emb": [float]              # regression
+}
+
+Output record (same schema as normalize_rouge_results / normalize_bleu_results):
+{"sample_id": ..., "metric": str, "score": float, "group": "per_sample" | "mean"}
+"""
+import json
+import os
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+
+# -----------------------------
+# IO helpers
+# -----------------------------
+
+def read_jsonl(path: str) -> Iterator[Dict]:
+    """Yields one record per non-empty line; records without an "id" get their line index."""
+    with open(path, "r", encoding="utf-8") as f:
+        idx = 0
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            record.setdefault("id", idx)
+            idx += 1
+            yield record
+
+
+def batched(records: Iterable[Dict], batch_size: int) -> Iterator[List[Dict]]:
+    if batch_size < 1:
+        raise ValueError("batch_size must be >= 1")
+    it = iter(records)
+    while True:
+        batch = list(islice(it, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+class JsonlRecordWriter:
+    """Appends records to a JSONL file and flushes after every batch."""
+
+    def __init__(self, path: str, mode: str = "w"):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._f = open(path, mode, encoding="utf-8")
+
+    def write(self, records: Iterable[Dict]) -> None:
+        for r in records:
+            self._f.write(json.dumps(r) + "\n")
+        self._f.flush()
+
+    def close(self) -> None:
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# -----------------------------
+# Metric adapters
+# -----------------------------
+# Each adapter takes one batch of records and returns normalized per-sample records.
+# Imports are local so that only the selected metrics' dependencies are needed.
+
+def _relabel(records: List[Dict], batch: List[Dict]) -> List[Dict]:
+    """normalize_* functions number samples 0..n-1 within the batch; map back to record ids."""
+    return [
+        {**r, "sample_id": batch[r["sample_id"]]["id"]}
+        for r in records
+        if r["group"] == "per_sample"
+    ]
+
+
+def per_sample_records(metric: str, batch: List[Dict], scores: List[float]) -> List[Dict]:
+    return [
+        {"sample_id": record["id"], "metric": metric, "score": float(score), "group": "per_sample"}
+        for record, score in zip(batch, scores)
+    ]
+
+
+def rouge_metric(batch: List[Dict], **_) -> List[Dict]:
+    from evals.generation.rouge.rouge import rouge_batch, normalize_rouge_results
+
+    result = rouge_batch([r["reference"] for r in batch], [r["answer"] for r in batch])
+    return _relabel(normalize_rouge_results(result), batch)
+
+
+def bleu_metric(batch: List[Dict], **_) -> List[Dict]:
+    from evals.generation.bleu.bleu import bleu_score, normalize_bleu_results
+
+    result = bleu_score([r["reference"] for r in batch], [r["answer"] for r in batch])
+    return _relabel(normalize_bleu_results(result), batch)
+
+
+def ndcg_metric(batch: List[Dict], k: int = 10, **_) -> List[Dict]:
+    from evals.retrieval.ndcg.ndcg import ndcg_at_k_single
+
+    scores = [ndcg_at_k_single(r["retrieved_ids"], r["relevance"], k) for r in batch]
+    return per_sample_records(f"ndcg@{k}", batch, scores)
+
+
+def faithfulness_metric(batch: List[Dict], client=None, model: str = "gpt-4o-mini", **_) -> List[Dict]:
+    from evals.semantic.faithfulness.faithfulness import evaluate_faithfulness
+
+    if client is None:
+        raise ValueError("faithfulness metric needs a judge `client` in metric_kwargs")
+    scores = [
+        evaluate_faithfulness(r["answer"], r["context"], r["question"], client, model).faithfulness_score
+        for r in batch
+    ]
+    return per_sample_records("faithfulness", batch, scores)
+
+
+def regression_metric(batch: List[Dict], thresholds: Optional[Dict[str, float]] = None, **_) -> List[Dict]:
+    from evals.regression.layer1_engine.run import run_batch_regression_eval
+
+    result = run_batch_regression_eval(
+        baseline_answers=[r["baseline_answer"] for r in batch],
+        new_answers=[r["answer"] for r in batch],
+        contexts=[r.get("context", "") for r in batch],
+        baseline_answer_embs=[r["baseline_answer_emb"] for r in batch],
+        new_answer_embs=[r["answer_emb"] for r in batch],
+        context_embs=[r["context_emb"] for r in batch],
+        thresholds=thresholds,
+    )
+    records = []
+    for name in ("semantic_drift", "coverage_drift", "grounding_drift", "regression"):
+        records.extend(
+            per_sample_records(name, batch, [float(s[name]) for s in result["samples"]])
+        )
+    return records
+
+
+METRICS: Dict[str, Callable[..., List[Dict]]] = {
+    "rouge": rouge_metric,
+    "bleu": bleu_metric,
+    "ndcg": ndcg_metric,
+    "faithfulness": faithfulness_metric,
+    "regression": regression_metric,
+}
+
+
+# -----------------------------
+# Runner
+# -----------------------------
+
+class RunningMeans:
+    """O(#metrics) running mean per metric name."""
+
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+    def update(self, records: Iterable[Dict]) -> None:
+        for r in records:
+            self.totals[r["metric"]] = self.totals.get(r["metric"], 0.0) + r["score"]
+            self.counts[r["metric"]] = self.counts.get(r["metric"], 0) + 1
+
+    def records(self) -> List[Dict]:
+        return [
+            {"sample_id": "ALL", "metric": m, "score": self.totals[m] / self.counts[m], "group": "mean"}
+            for m in self.totals
+        ]
+
+
+def _is_json(value) -> bool:
+    try:
+        json.dumps(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def task_config(metric_kwargs: Dict) -> Dict:
+    """
+    The part of a metric's kwargs that decides its scores, in a JSON comparable form.
+    Live objects (a judge `client`) are left out; settings such as {"k": 5} or thresholds stay.
+    """
+    return json.loads(json.dumps({k: v for k, v in sorted(metric_kwargs.items()) if _is_json(v)}))
+
+
+class CheckpointJournal:
+    """
+    Append-only journal of finished (sample_id, metric) work items so an interrupted run
+    resumes exactly where it stopped.
+
+    The first time a task is run against the journal its config is written as a header line,
+    {"task": "ndcg", "config": {"k": 5}}, and opening the journal for the same task with a
+    different config raises ValueError instead of mixing results from two settings.
+
+    After that, one line per work item, flushed after every (batch, metric):
+    {"sample_id": ..., "task": "rouge", "records": [<normalized records for that sample>]}
+
+    A line cut short by a crash fails to parse and is ignored, so that item is simply redone.
+    """
+
+    def __init__(self, path: str, fsync: bool = False, configs: Optional[Dict[str, Dict]] = None):
+        self.path = path
+        self.fsync = fsync
+        self.completed = set()
+        journaled: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            for entry in self._lines():
+                if "config" in entry:
+                    journaled.setdefault(entry["task"], entry["config"])
+            for entry in self._entries():
+                self.completed.add(self._key(entry["sample_id"], entry["task"]))
+
+        configs = configs or {}
+        for task, config in configs.items():
+            if task in journaled and journaled[task] != config:
+                raise ValueError(
+                    f"Checkpoint {path} was written for {task} with config {journaled[task]}, "
+                    f"this run uses {config}. Use a new checkpoint path or rerun with the same settings."
+                )
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._f = open(path, "a", encoding="utf-8")
+        if self._f.tell() > 0 and not self._ends_with_newline():
+            # terminate a torn last line so the next entry starts clean
+            self._f.write("\n")
+        for task, config in configs.items():
+            if task not in journaled:
+                self._f.write(json.dumps({"task": task, "config": config}) + "\n")
+        self._f.flush()
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    @staticmethod
+    def _key(sample_id, task: str):
+        # json round trips keep int vs str ids apart, so key on the JSON form
+        return json.dumps(sample_id), task
+
+    def _lines(self) -> Iterator[Dict]:
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def _entries(self) -> Iterator[Dict]:
+        seen = set()
+        for entry in self._lines():
+            if "config" in entry:
+                continue
+            key = self._key(entry["sample_id"], entry["task"])
+            if key in seen:
+                continue
+            seen.add(key)
+            yield entry
+
+    def is_done(self, sample_id, task: str) -> bool:
+        return self._key(sample_id, task) in self.completed
+
+    def record(self, sample_id, task: str, records: List[Dict]) -> None:
+        self._f.write(json.dumps({"sample_id": sample_id, "task": task, "records": records}) + "\n")
+        self.completed.add(self._key(sample_id, task))
+
+    def commit(self) -> None:
+        """Flushes everything recorded so far (called once per batch)."""
+        self._f.flush()
+        if self.fsync:
+            os.fsync(self._f.fileno())
+
+    def iter_records(
+        self, tasks: Optional[Iterable[str]] = None, sample_ids: Optional[Iterable] = None
+    ) -> Iterator[Dict]:
+        """
+        Streams journaled normalized records, first entry per (sample_id, task) wins.
+        tasks / sample_ids restrict the output to the current run's metrics and dataset, so
+        work journaled for other metrics or for samples since removed is left out.
+        """
+        self.commit()
+        tasks = None if tasks is None else set(tasks)
+        wanted = None if sample_ids is None else {json.dumps(i) for i in sample_ids}
+        for entry in self._entries():
+            if tasks is not None and entry["task"] not in tasks:
+                continue
+            if wanted is not None and json.dumps(entry["sample_id"]) not in wanted:
+                continue
+            yield from entry["records"]
+
+    def close(self) -> None:
+        self._f.close()
+
+
+def _run_with_checkpoint(
+    batches: Iterable[List[Dict]],
+    metrics: List[str],
+    metric_kwargs: Dict[str, Dict],
+    journal: CheckpointJournal,
+) -> List:
+    """Runs only the (sample, metric) items missing from the journal. Returns the ids seen."""
+    sample_ids = []
+    for batch in batches:
+        for name in metrics:
+            todo = [r for r in batch if not journal.is_done(r["id"], name)]
+            if not todo:
+                continue
+            records = METRICS[name](todo, **metric_kwargs.get(name, {}))
+            by_sample: Dict[str, List[Dict]] = {json.dumps(r["id"]): [] for r in todo}
+            for rec in records:
+                by_sample[json.dumps(rec["sample_id"])].append(rec)
+            for r in todo:
+                journal.record(r["id"], name, by_sample[json.dumps(r["id"])])
+            journal.commit()
+        sample_ids.extend(r["id"] for r in batch)
+    return sample_ids
+
+
+def run_batch(
+    dataset_path: str,
+    output_path: str,
+    metrics: Iterable[str] = ("rouge", "bleu"),
+    batch_size: int = 64,
+    metric_kwargs: Optional[Dict[str, Dict]] = None,
+    checkpoint_path: Optional[str] = None,
+) -> Dict:
+    """
+    Streams dataset_path through the selected metrics in batches of batch_size and writes
+    normalized per-sample records to output_path as it goes; "ALL"/"mean" records are
+    appended at the end.
+
+    metric_kwargs: per-metric extra arguments, e.g. {"ndcg": {"k": 5}, "faithfulness": {"client": client}}
+    checkpoint_path: if given, every finished (sample, metric) is journaled there and a rerun
+        with the same path skips completed work. The journal is the incremental record in this
+        mode; output_path is written from it (old + new results merged) once the run completes,
+        keeping only the selected metrics and the ids in dataset_path. A journal written with
+        different metric settings (e.g. another ndcg k) is refused with ValueError.
+
+    Returns:
+        {"num_samples": int, "mean": {metric: float}}
+    """
+    metric_kwargs = metric_kwargs or {}
+    metrics = list(metrics)
+    unknown = [m for m in metrics if m not in METRICS]
+    if unknown:
+        raise ValueError(f"Unknown metrics: {unknown}. Available: {sorted(METRICS)}")
+
+    batches = batched(read_jsonl(dataset_path), batch_size)
+    means = RunningMeans()
+    num_samples = 0
+
+    if checkpoint_path is not None:
+        configs = {name: task_config(metric_kwargs.get(name, {})) for name in metrics}
+        journal = CheckpointJournal(checkpoint_path, configs=configs)
+        try:
+            sample_ids = _run_with_checkpoint(batches, metrics, metric_kwargs, journal)
+            num_samples = len(sample_ids)
+            with JsonlRecordWriter(output_path) as writer:
+                for records in batched(journal.iter_records(metrics, sample_ids), batch_size):
+                    writer.write(records)
+                    means.update(records)
+                mean_records = means.records()
+                writer.write(mean_records)
+        finally:
+            journal.close()
+    else:
+        with JsonlRecordWriter(output_path) as writer:
+            for batch in batches:
+                for name in metrics:
+                    records = METRICS[name](batch, **metric_kwargs.get(name, {}))
+                    writer.write(records)
+                    means.update(records)
+                num_samples += len(batch)
+            mean_records = means.records()
+            writer.write(mean_records)
+
+    return {
+        "num_samples": num_samples,
+        "mean": {r["metric"]: r["score"] for r in mean_records},
+    }
@@ -1,5 +1,6 @@
 from typing import List,Tuple
 import json
+from evals.utils.caching.caching import cached_chat_completion, require_json
 def binary_correctness_label(qa_pairs:List[Tuple[str,str]],client,model:str='gpt-4.1-nano')\
     ->List[int]:
     formatted_items = []
@@ -17,12 +18,11 @@ def binary_correctness_label(qa_pairs:List[Tuple[str,str]],client,model:str='gpt
     Do not add any explanation.
     Pairs:
     {joined}"""
-    response = client.chat.completions.create(model=model,messages=[{"role": "user", "content": prompt}],
-        temperature=0)
+    response = cached_chat_completion(client, model=model,messages=[{"role": "user", "content": prompt}],
+        temperature=0,validate=require_json("results"))
     content = response.choices[0].message.content.strip()
-    import json
     try:
-        data = json.loads()
+        data = json.loads(content)
         bools = data['results']
         return [1 if x else 0 for x in bools]
     except Exception as e:
@@ -53,8 +53,8 @@ def scalar_correctness_batch(qa_pairs:List[Tuple[str,str]],client,model='gpt-4.1
     }}
     Do not include any explanation or extra text.
     Pairs:{joined}"""
-    response = client.chat.completions.create(model=model,messages=[{"role": "user", "content": prompt}],
-        temperature=0)
+    response = cached_chat_completion(client, model=model,messages=[{"role": "user", "content": prompt}],
+        temperature=0,validate=require_json("scores"))
     content = response.choices[0].message.content.strip()
     try:
         data = json.loads(content)
@@ -85,8 +85,8 @@ def extract_claims_batch(answers: List[str],client,model: str = "gpt-4o-mini") -
         ]
     }}
     Answers:{joined}"""
-    response = client.chat.completions.create(model=model,messages=[{"role": "user", "content": prompt}],
-        temperature=0)
+    response = cached_chat_completion(client, model=model,messages=[{"role": "user", "content": prompt}],
+        temperature=0,validate=require_json("results"))
     content = response.choices[0].message.content.strip()
     try:
         data = json.loads(content)
@@ -109,8 +109,8 @@ def verify_claims_batch(q_claim_pairs: List[Tuple[str, str]],client,model: str =
     }}
     Pairs:{joined}
 """
-    response = client.chat.completions.create(model=model,messages=[{"role": "user", "content": prompt}],
-        temperature=0)
+    response = cached_chat_completion(client, model=model,messages=[{"role": "user", "content": prompt}],
+        temperature=0,validate=require_json("results"))
     content = response.choices[0].message.content.strip()
     try:
         data = json.loads(content)
@@ -146,7 +146,82 @@ def claim_level_correctness_batch(qa_pairs: List[Tuple[str, str]],client,model:
         scores.append(c / t if t > 0 else 0.0)
     return scores
 
-            
-    
 
+# Dataset scale driver: token budgeted micro-batches, judged concurrently
+
+from typing import Callable, Iterator, Optional
+from evals.judges.executor import JudgeExecutor
+from src.utils.token_counter import count_tokens
+
+# rubric / instructions around the numbered pairs in the batch prompts above
+PROMPT_OVERHEAD_TOKENS = 250
+
+class BatchLengthMismatch(ValueError):
+    """Raised when a judge returns a different number of results than it was given."""
+    pass
+
+def pack_qa_batches(qa_pairs:List[Tuple[str,str]],model:str='gpt-4.1-nano',max_prompt_tokens:int=4000,
+    max_batch_size:int=50)->Iterator[Tuple[int,int]]:
+    """
+    Lazily packs consecutive pairs into (start,end) micro-batches that fit max_prompt_tokens
+    and hold at most max_batch_size pairs. A single oversized pair still gets its own batch.
+    """
+    start = 0
+    used = PROMPT_OVERHEAD_TOKENS
+    for i,(q,a) in enumerate(qa_pairs):
+        item_tokens = count_tokens(f"{i-start+1}.Question:{q}\n Answer:{a}\n\n",model)
+        if i > start and (used+item_tokens > max_prompt_tokens or i-start >= max_batch_size):
+            yield start,i
+            start = i
+            used = PROMPT_OVERHEAD_TOKENS
+        used += item_tokens
+    if start < len(qa_pairs):
+        yield start,len(qa_pairs)
+
+def judge_with_resplit(qa_pairs:List[Tuple[str,str]],judge_fn:Callable,client,model:str,
+    on_error:str='raise')->List:
+    """
+    Runs judge_fn on one micro-batch. If the response cannot be parsed or its length does not
+    match the input, the batch is split in half and only the failing halves are retried.
+    A single pair that still fails is re-raised (on_error='raise') or logged and scored
+    None (on_error='skip'), so one bad pair does not stop a dataset run.
+    """
+    try:
+        results = judge_fn(qa_pairs,client,model)
+        if len(results) != len(qa_pairs):
+            raise BatchLengthMismatch(f"Expected {len(qa_pairs)} results, got {len(results)}")
+        return list(results)
+    except (ValueError,KeyError,TypeError) as e:
+        if len(qa_pairs) == 1:
+            if on_error == 'raise':
+                raise
+            print(f"Skipping unjudgeable pair {qa_pairs[0][0]!r}: {type(e).__name__}: {e}")
+            return [None]
+    mid = len(qa_pairs)//2
+    return (judge_with_resplit(qa_pairs[:mid],judge_fn,client,model,on_error)
+            + judge_with_resplit(qa_pairs[mid:],judge_fn,client,model,on_error))
+
+def correctness_dataset_stream(qa_pairs:List[Tuple[str,str]],client,judge_fn:Callable=None,
+    model:str='gpt-4.1-nano',max_prompt_tokens:int=4000,max_batch_size:int=50,max_workers:int=4,
+    executor:Optional[JudgeExecutor]=None,on_error:str='skip')->Iterator:
+    """
+    Dataset level correctness judging (e.g. 20k pairs).
+    Pairs are packed into token budgeted micro-batches, judged concurrently with at most
+    max_workers batches in flight, and scores are yielded one by one in INPUT order.
+    judge_fn defaults to scalar_correctness_batch; binary_correctness_label works too.
+    on_error: 'skip' yields None for a pair the judge keeps failing on, 'raise' stops the stream.
+    """
+    if on_error not in ('skip','raise'):
+        raise ValueError("on_error must be 'skip' or 'raise'")
+    judge_fn = judge_fn or scalar_correctness_batch
+    executor = executor or JudgeExecutor(max_workers=max_workers)
+    calls = (
+        (judge_with_resplit,(qa_pairs[start:end],judge_fn,client,model,on_error))
+        for start,end in pack_qa_batches(qa_pairs,model,max_prompt_tokens,max_batch_size)
+    )
+    for batch_scores in executor.imap(calls):
+        yield from batch_scores
 
+def correctness_dataset(qa_pairs:List[Tuple[str,str]],client,**kwargs)->List:
+    """Collects correctness_dataset_stream into a list (same order as qa_pairs)."""
+    return list(correctness_dataset_stream(qa_pairs,client,**kwargs))
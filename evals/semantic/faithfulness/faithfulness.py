@@ -14,6 +14,11 @@ import json
 from typing import List, Literal, Optional
 from pydantic import BaseModel, ValidationError
 
+from evals.judges.executor import JudgeExecutor
+from evals.utils.caching.caching import cached_chat_completion, require_json
+from src.logging.traces import traced
+from src.utils.token_counter import count_tokens
+
 
 # -----------------------------
 # Pydantic Schemas
@@ -55,6 +60,7 @@ def safe_json_load(text: str):
 # Step 1: Claim Extraction
 # -----------------------------
 
+@traced("faithfulness.extract_claims")
 def extract_claims(answer: str, client, model="gpt-4o-mini") -> List[str]:
     prompt = f"""
 You are an expert linguistic analyst.
@@ -69,10 +75,12 @@ Return ONLY valid JSON:
 {{ "claims": ["claim1", "claim2", "..."] }}
 """
 
-    response = client.chat.completions.create(
+    response = cached_chat_completion(
+        client,
         model=model,
         temperature=0,
         messages=[{"role": "user", "content": prompt}],
+        validate=require_json(),
     )
 
     data = safe_json_load(response.choices[0].message.content)
@@ -83,6 +91,7 @@ Return ONLY valid JSON:
 # Step 2: Claim Importance
 # -----------------------------
 
+@traced("faithfulness.score_claim_importance")
 def score_claim_importance(claim: str, question: str, client, model="gpt-4o-mini") -> float:
     prompt = f"""
 You are evaluating how important a claim is for answering the user's question.
@@ -102,10 +111,12 @@ Return ONLY valid JSON:
 {{ "importance": 0.0 }}
 """
 
-    response = client.chat.completions.create(
+    response = cached_chat_completion(
+        client,
         model=model,
         temperature=0,
         messages=[{"role": "user", "content": prompt}],
+        validate=require_json(),
     )
 
     data = safe_json_load(response.choices[0].message.content)
@@ -116,6 +127,7 @@ Return ONLY valid JSON:
 # Step 3: Claim Verification (NLI-style)
 # -----------------------------
 
+@traced("faithfulness.verify_claim")
 def verify_claim(claim: str, context: str, client, model="gpt-4o-mini"):
     prompt = f"""
 You are a strict faithfulness evaluator using natural language inference.
@@ -139,10 +151,12 @@ Return ONLY valid JSON:
 }}
 """
 
-    response = client.chat.completions.create(
+    response = cached_chat_completion(
+        client,
         model=model,
         temperature=0,
         messages=[{"role": "user", "content": prompt}],
+        validate=require_json(),
     )
 
     return safe_json_load(response.choices[0].message.content)
@@ -160,29 +174,22 @@ VERDICT_SCORE = {
 }
 
 
-def evaluate_faithfulness(
-    answer: str,
-    context: str,
-    question: str,
-    client,
-    model="gpt-4o-mini",
-    strict: bool = False,
+def _build_result(
+    claims_text: List[str],
+    verdicts: List[dict],
+    importances: List[float],
+    strict: bool,
 ) -> FaithfulnessResult:
-
-    claims_text = extract_claims(answer, client, model)
+    """Aggregates per-claim verdicts and importances (same order as claims_text)."""
 
     claims: List[Claim] = []
     weighted_score_sum = 0.0
     weight_sum = 0.0
 
-    for c in claims_text:
-        verdict_data = verify_claim(c, context, client, model)
-
+    for c, verdict_data, importance in zip(claims_text, verdicts, importances):
         verdict = verdict_data.get("verdict", "not_supported")
         evidence = verdict_data.get("evidence")
 
-        importance = score_claim_importance(c, question, client, model)
-
         score = VERDICT_SCORE.get(verdict, 0.0)
 
         weighted_score_sum += score * importance
@@ -214,6 +221,232 @@ def evaluate_faithfulness(
     )
 
 
+@traced("faithfulness.evaluate")
+def evaluate_faithfulness(
+    answer: str,
+    context: str,
+    question: str,
+    client,
+    model="gpt-4o-mini",
+    strict: bool = False,
+) -> FaithfulnessResult:
+
+    claims_text = extract_claims(answer, client, model)
+
+    verdicts = []
+    importances = []
+
+    for c in claims_text:
+        verdicts.append(verify_claim(c, context, client, model))
+        importances.append(score_claim_importance(c, question, client, model))
+
+    return _build_result(claims_text, verdicts, importances, strict)
+
+
+# -----------------------------
+# Step 5: Concurrent Faithfulness Evaluation
+# -----------------------------
+
+@traced("faithfulness.evaluate_concurrent")
+def evaluate_faithfulness_concurrent(
+    answer: str,
+    context: str,
+    question: str,
+    client,
+    model="gpt-4o-mini",
+    strict: bool = False,
+    executor: Optional[JudgeExecutor] = None,
+    max_workers: int = 8,
+    requests_per_second: Optional[float] = None,
+    max_retries: int = 3,
+) -> FaithfulnessResult:
+    """
+    Same result as evaluate_faithfulness, but after claim extraction all
+    verify_claim and score_claim_importance calls are sent concurrently
+    (2 x claims calls in one wave instead of one after another).
+
+    Pass a shared `executor` to apply one concurrency cap / rate limit across
+    many answers; otherwise one is built from max_workers, requests_per_second
+    and max_retries. Claim order is the extraction order.
+    """
+    if executor is None:
+        executor = JudgeExecutor(
+            max_workers=max_workers,
+            requests_per_second=requests_per_second,
+            max_retries=max_retries,
+        )
+
+    claims_text = executor.run([(extract_claims, (answer, client, model))])[0]
+
+    calls = []
+    for c in claims_text:
+        calls.append((verify_claim, (c, context, client, model)))
+        calls.append((score_claim_importance, (c, question, client, model)))
+    outputs = executor.run(calls)
+
+    verdicts = outputs[0::2]
+    importances = outputs[1::2]
+    return _build_result(claims_text, verdicts, importances, strict)
+
+
+# -----------------------------
+# Step 6: Batched Faithfulness Evaluation
+# -----------------------------
+
+BATCH_VERIFY_TEMPLATE = """
+You are a strict faithfulness evaluator using natural language inference.
+
+Question:
+\"\"\"{question}\"\"\"
+
+Context:
+\"\"\"{context}\"\"\"
+
+For EACH numbered claim below:
+a) Classify it against the context as:
+   - supported: directly stated or clearly entailed
+   - partially_supported: some support but missing details or weaker wording
+   - not_supported: not stated or cannot be inferred
+   - contradicted: context explicitly says the opposite
+b) Score how important it is for answering the question from 0 to 1:
+   - 1.0 = central to answering the question
+   - 0.5 = useful detail
+   - 0.1 = minor or background info
+
+Claims:
+{claims}
+
+Return ONLY valid JSON with one entry per claim, using the claim numbers as ids:
+{{
+  "results": [
+    {{"id": 1, "verdict": "supported | partially_supported | not_supported | contradicted",
+      "evidence": "exact supporting or contradicting text from context, or null",
+      "importance": 0.0}}
+  ]
+}}
+"""
+
+
+def _format_claims(claims: List[str]) -> str:
+    return "\n".join(f"{i}. {c}" for i, c in enumerate(claims, 1))
+
+
+def verify_and_score_claims_batch(
+    claims: List[str],
+    context: str,
+    question: str,
+    client,
+    model="gpt-4o-mini",
+) -> List[Optional[dict]]:
+    """
+    Verifies AND weights all claims in one judge call, sending the context once.
+    Returns one {"verdict", "evidence", "importance"} dict per claim (same order);
+    items that are missing or malformed in the response come back as None.
+    """
+    if not claims:
+        return []
+
+    prompt = BATCH_VERIFY_TEMPLATE.format(
+        question=question, context=context, claims=_format_claims(claims)
+    )
+    response = cached_chat_completion(
+        client,
+        model=model,
+        temperature=0,
+        messages=[{"role": "user", "content": prompt}],
+        validate=require_json(),
+    )
+
+    parsed: List[Optional[dict]] = [None] * len(claims)
+    try:
+        data = safe_json_load(response.choices[0].message.content)
+        items = data.get("results", [])
+    except (ValueError, AttributeError, TypeError):
+        print("Batched claim verification parse failed, falling back per claim")
+        return parsed
+
+    for pos, item in enumerate(items):
+        try:
+            idx = int(item.get("id", pos + 1)) - 1
+            verdict = item["verdict"]
+            importance = float(item["importance"])
+        except (AttributeError, KeyError, TypeError, ValueError):
+            continue
+        if not 0 <= idx < len(claims) or verdict not in VERDICT_SCORE:
+            continue
+        parsed[idx] = {
+            "verdict": verdict,
+            "evidence": item.get("evidence"),
+            "importance": min(1.0, max(0.0, importance)),
+        }
+    return parsed
+
+
+def pack_claims(
+    claims: List[str],
+    context: str,
+    question: str,
+    model="gpt-4o-mini",
+    max_prompt_tokens: int = 6000,
+) -> List[List[str]]:
+    """
+    Splits claims into groups whose batched prompt stays within max_prompt_tokens.
+    Every group holds at least one claim, even if the context alone is over budget.
+    """
+    base_tokens = count_tokens(
+        BATCH_VERIFY_TEMPLATE.format(question=question, context=context, claims=""), model
+    )
+    groups: List[List[str]] = []
+    current: List[str] = []
+    used = base_tokens
+    for i, c in enumerate(claims, 1):
+        # the number prefix restarts per group, so this slightly overestimates
+        claim_tokens = count_tokens(f"{i}. {c}\n", model)
+        if current and used + claim_tokens > max_prompt_tokens:
+            groups.append(current)
+            current = []
+            used = base_tokens
+        current.append(c)
+        used += claim_tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+def evaluate_faithfulness_batched(
+    answer: str,
+    context: str,
+    question: str,
+    client,
+    model="gpt-4o-mini",
+    strict: bool = False,
+    max_prompt_tokens: int = 6000,
+) -> FaithfulnessResult:
+    """
+    Same result as evaluate_faithfulness using 1 + ceil(claims / batch) judge calls:
+    all claims are verified and weighted against ONE copy of the context.
+    Requests are split when they would exceed max_prompt_tokens, and claims whose
+    batched verdict fails to parse fall back to verify_claim + score_claim_importance.
+    """
+    claims_text = extract_claims(answer, client, model)
+
+    parsed: List[Optional[dict]] = []
+    for group in pack_claims(claims_text, context, question, model, max_prompt_tokens):
+        parsed.extend(verify_and_score_claims_batch(group, context, question, client, model))
+
+    verdicts = []
+    importances = []
+    for c, item in zip(claims_text, parsed):
+        if item is None:
+            verdicts.append(verify_claim(c, context, client, model))
+            importances.append(score_claim_importance(c, question, client, model))
+        else:
+            verdicts.append({"verdict": item["verdict"], "evidence": item["evidence"]})
+            importances.append(item["importance"])
+
+    return _build_result(claims_text, verdicts, importances, strict)
+
+
 """
 context = LangChain integrates with FAISS and Pinecone as vector stores for document retrieval.
 
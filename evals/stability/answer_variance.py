@@ -10,8 +10,9 @@ This module is intentionally:
 
 It only measures how different the answers are semantically
 """
-from typing import List,Dict
+from typing import List,Dict,Optional
 import numpy as np
+from src.core.embeddings.store import EmbeddingStore
 def cosine_similarity(vec_a:np.ndarray,vec_b:np.ndarray)->float:
     """
     Computes cosine similarity between two vectors and handles edge cases safely
@@ -27,24 +28,118 @@ def embed_texts(texts:List[str],embed_fn)->np.ndarray:
     Converts a list of texts into embedding vectors
     embed_fn Must accepts a List[str] and return List[List[int]] or np.ndarray
     This design makes the code usable accross a wide-span of embedders
+    embed_fn can also be an EmbeddingStore (src/core/embeddings/store.py); texts are then the
+    store ids and vectors are read straight from the memory map (no copy for float32 stores
+    when the ids are consecutive rows)
     """
+    if isinstance(embed_fn,EmbeddingStore):
+        return np.asarray(embed_fn.select(texts),dtype=np.float32)
     embeddings = embed_fn(texts)
     return np.asarray(embeddings,dtype=np.float32)
 
+def normalize_embeddings(embeddings:np.ndarray)->np.ndarray:
+    """
+    L2 normalizes embeddings along the last axis so a plain dot product is the cosine similarity.
+    Zero vectors stay zero, which keeps the same "similarity = 0" edge case as cosine_similarity
+    """
+    embeddings = np.asarray(embeddings,dtype=np.float32)
+    norms = np.linalg.norm(embeddings,axis=-1,keepdims=True)
+    safe_norms = np.where(norms == 0,1.0,norms).astype(np.float32)
+    return embeddings/safe_norms
+
 def compute_similarity_matrix(embedding:np.ndarray)->np.ndarray:
     """
     Computes full pair wise cosine similarity and gives a similarity matrix
-    Output shape will be (n,n)
+    Output shape will be (n,n), or (g,n,n) when a 3-D stack of g answer groups is given
     Diagonals will be 1 as cosine(a,a) = 1
+    Embeddings are normalized once and all pairs come out of a single matrix product
+    """
+    unit = normalize_embeddings(embedding)
+    if unit.ndim not in (2,3):
+        raise ValueError("embedding must be 2-D (n,d) or 3-D (g,n,d)")
+    return np.matmul(unit,np.swapaxes(unit,-1,-2))
+
+def upper_triangle_similarities(sim_matrix:np.ndarray)->np.ndarray:
+    """
+    Picks the strictly upper triangle (i < j) of a (n,n) or (g,n,n) similarity matrix
+    Output shape will be (n*(n-1)/2,) or (g,n*(n-1)/2)
+    """
+    n = sim_matrix.shape[-1]
+    rows,cols = np.triu_indices(n,k=1)
+    return sim_matrix[...,rows,cols]
+
+def variance_from_embeddings(embeddings:np.ndarray)->List[Dict[str,float]]:
+    """
+    Batched engine: scores many answer groups in one call.
+    embeddings shape is (g,n,d) -> g groups of n answers each, a 2-D (n,d) input is treated as one group.
+    Returns one statistics dict per group
+    """
+    embeddings = np.asarray(embeddings,dtype=np.float32)
+    if embeddings.ndim == 2:
+        embeddings = embeddings[np.newaxis]
+    if embeddings.ndim != 3:
+        raise ValueError("embeddings must be 2-D (n,d) or 3-D (g,n,d)")
+    if embeddings.shape[1] < 2:
+        raise ValueError("Answer variance requires at least 2 answers.")
+
+    similarities = upper_triangle_similarities(compute_similarity_matrix(embeddings))
+    mean = np.mean(similarities,axis=1)
+    variance = np.var(similarities,axis=1)
+    std_dev = np.std(similarities,axis=1)
+    worst = np.min(similarities,axis=1)
+    return [
+        {
+            "mean_similarity": float(mean[g]),
+            "variance": float(variance[g]),
+            "std_dev": float(std_dev[g]),
+            "worst_case_similarity": float(worst[g])
+        }
+        for g in range(embeddings.shape[0])
+    ]
+
+def chunked_variance_from_embeddings(embeddings:np.ndarray,chunk_size:int=1024)->Dict[str,float]:
     """
-    n = embedding.shape(0)
-    sim_matrix = np.zeros(shape=(n,n),dtype=np.float32)
-    for i in range(n):
-        for j in range(n):
-            sim_matrix[i][j] = cosine_similarity(embedding[i],embedding[j])
-    return sim_matrix
+    Same statistics as variance_from_embeddings for ONE group, but for very large n.
+    Only a (chunk_size,n) block of similarities is alive at a time, so memory is O(chunk_size*n)
+    instead of O(n^2). Block statistics are merged with the parallel variance formula (Chan et al.)
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+    unit = normalize_embeddings(embeddings)
+    n = unit.shape[0]
+    if n < 2:
+        raise ValueError("Answer variance requires at least 2 answers.")
+
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    worst = np.inf
+    for start in range(0,n-1,chunk_size):
+        stop = min(start+chunk_size,n)
+        block = unit[start:stop] @ unit[start:].T
+        rows,cols = np.triu_indices(stop-start,k=1,m=n-start)
+        sims = block[rows,cols].astype(np.float64)
+        if sims.size == 0:
+            continue
+        block_count = sims.size
+        block_mean = float(sims.mean())
+        block_m2 = float(((sims-block_mean)**2).sum())
+        delta = block_mean-mean
+        total = count+block_count
+        mean += delta*block_count/total
+        m2 += block_m2 + delta*delta*count*block_count/total
+        count = total
+        worst = min(worst,float(sims.min()))
+
+    variance = m2/count
+    return {
+        "mean_similarity": float(mean),
+        "variance": float(variance),
+        "std_dev": float(np.sqrt(variance)),
+        "worst_case_similarity": float(worst)
+    }
 
-def compute_answer_variance(answers:List[str],embed_fn)->Dict[str,float]:
+def compute_answer_variance(answers:List[str],embed_fn,chunk_size:Optional[int]=None)->Dict[str,float]:
     """
     Computes semantic variance metrics across multiple answers.
     This is the PRIMARY metric used by:
@@ -52,6 +147,9 @@ def compute_answer_variance(answers:List[str],embed_fn)->Dict[str,float]:
     - regression detection
     - robustness analysis
 
+    chunk_size: if given, uses the memory bounded chunked engine (for very large n)
+    Wrap embed_fn in src.core.embeddings.cache.CachedEmbedder so reruns only embed new answers
+
     Returns:
     {
         "mean_similarity":float
@@ -70,27 +168,37 @@ def compute_answer_variance(answers:List[str],embed_fn)->Dict[str,float]:
     # Embed answers
     embeddings = embed_texts(answers, embed_fn)
 
-    # Compute similarity index 
-    sim_matrix = compute_similarity_matrix(embeddings)
+    if chunk_size is not None:
+        return chunked_variance_from_embeddings(embeddings,chunk_size=chunk_size)
 
-    # Compute upper triangle similarites and get a code
-    similarities = []
-    n = sim_matrix.shape[0]
-    for i in range(n):
-        for j in range(i + 1, n):
-            similarities.append(sim_matrix[i, j])
+    # Similarity matrix + upper triangle in one vectorized pass
+    return variance_from_embeddings(embeddings)[0]
 
-    # Compute the feature indices
-    similarities = np.array(similarities, dtype=np.float32)
-    mean_similarity = float(np.mean(similarities))
-    variance = float(np.var(similarities))
-    std_dev = float(np.std(similarities))
-    worst_case_similarity = float(np.min(similarities))
+def compute_answer_variance_batch(answer_groups:List[List[str]],embed_fn)->List[Dict[str,float]]:
+    """
+    Scores many prompts (answer groups) at once.
+    All answers are embedded with ONE embed_fn call, groups of the same size are stacked into
+    a (g,n,d) tensor and scored together. Output order matches answer_groups.
+    """
+    for answers in answer_groups:
+        if len(answers) < 2:
+            raise ValueError(
+                "Answer variance requires at least 2 answers."
+            )
+    if not answer_groups:
+        return []
 
-    # Return the statistics
-    return {
-        "mean_similarity": mean_similarity,
-        "variance": variance,
-        "std_dev": std_dev,
-        "worst_case_similarity": worst_case_similarity
-    }
+    flat = [answer for answers in answer_groups for answer in answers]
+    embeddings = embed_texts(flat, embed_fn)
+
+    offsets = np.cumsum([0]+[len(answers) for answers in answer_groups])
+    groups_by_size: Dict[int,List[int]] = {}
+    for g,answers in enumerate(answer_groups):
+        groups_by_size.setdefault(len(answers),[]).append(g)
+
+    results: List[Optional[Dict[str,float]]] = [None]*len(answer_groups)
+    for size,group_ids in groups_by_size.items():
+        stack = np.stack([embeddings[offsets[g]:offsets[g]+size] for g in group_ids])
+        for g,stats in zip(group_ids,variance_from_embeddings(stack)):
+            results[g] = stats
+    return results
@@ -10,14 +10,20 @@ Sending each version to the model
 Comparing how similar the answers are
 Reporting where the instability comes from
 
+evaluate_batch runs many prompts at once: identical variant strings (across perturbation
+types and across prompts) are sent to the model only once, and the unique ones are
+dispatched concurrently on a bounded worker pool. Noise is drawn from a generator seeded
+per (seed, prompt), so a prompt always gets the same variants regardless of batch order.
 """
-from typing import List,Dict,Callable
+from typing import List,Dict,Callable,Optional
 from dataclasses import dataclass
 from enum import Enum
 import numpy as np
 import re
 import random
 
+from evals.judges.executor import JudgeExecutor
+
 # Perturbation types
 class PerturbationType(Enum):
 
@@ -27,7 +33,7 @@ class PerturbationType(Enum):
     LEXICAL = "lexical" # Small wording changes
     SYNTACTIC = 'syntactic' # Small sentence strucutre changes
     INSTRUCTION_NOISE = 'instruction_noise' # Extra instructions without effecting meaning
-    CONTEXT_RECORDER = 'context_recorder' #Instruction Ordering changes
+    CONTEXT_REORDER = 'context_reorder' #Instruction Ordering changes
     NOISY_USER_INPUT = 'noisy_user_input'  # Realistic human noise: typos, grammar mistakes, informal phrasing
 
 @dataclass(frozen=True)
@@ -46,10 +52,13 @@ class PromptPerturbationGenerator:
     - We DO NOT add random garbage
     - We ONLY simulate realistic user variations
     """
-    def __init__(self,noise_sample_per_prompt:int=16):
+    def __init__(self,noisy_samples_per_prompt:int=16,seed:int=0,max_attempts:Optional[int]=None):
         
-        self.noise_sample_per_prompt = noise_sample_per_prompt
-        self.perturbations.Dict[PerturbationType,Callable[[str],List[str]]] = {
+        self.noisy_samples_per_prompt = noisy_samples_per_prompt
+        self.seed = seed
+        # Upper bound on noise draws per prompt; short prompts may have fewer unique variants
+        self.max_attempts = max_attempts if max_attempts is not None else 8 * noisy_samples_per_prompt
+        self.perturbations: Dict[PerturbationType,Callable[[str],List[str]]] = {
             PerturbationType.LEXICAL: self._lexical,
             PerturbationType.SYNTACTIC: self._syntactic,
             PerturbationType.INSTRUCTION_NOISE: self._instruction_noise,
@@ -80,14 +89,20 @@ class PromptPerturbationGenerator:
     # Bounded stochastic noise
     # (Random but controlled)
 
-    def _introduce_typo(self, text: str) -> str:
+    def _rng(self, prompt: str) -> random.Random:
+        """Deterministic generator per (seed, prompt)."""
+        return random.Random(f"{self.seed}:{prompt}")
+
+    def _introduce_typo(self, text: str, rng: random.Random) -> str:
         """Introduces a small typo by swapping characters.Simulates real human typing mistakes."""
         words = text.split()
-        idx = random.randint(0,len(words)-1)
+        if not words:
+            return text
+        idx = rng.randint(0,len(words)-1)
         word = words[idx]
 
-        if len(word) < 3:
-            char_idx = random.randint(1, len(word) - 2)
+        if len(word) >= 3:
+            char_idx = rng.randint(1, len(word) - 2)
             word = (
                 word[:char_idx]+ word[char_idx + 1]+ word[char_idx]+ word[char_idx + 2:]
             )
@@ -110,12 +125,15 @@ class PromptPerturbationGenerator:
         """Generates MANY noisy prompts that:look like real user input and still clearly preserve intent"""
         generators = [self._introduce_typo,self._drop_punctuation,
             self._informal_rephrase,self._grammar_noise]
-        noisy_variants = set()
-        # Keep generating until we reach the desired count
-        while len(noisy_variants) < self.noisy_samples_per_prompt:
-            fn = random.choice(generators)
-            noisy_variant = fn(prompt)
-            noisy_variants.add(noisy_variant)
+        rng = self._rng(prompt)
+        noisy_variants: Dict[str, None] = {}
+        # Keep generating until we reach the desired count or run out of attempts
+        for _ in range(self.max_attempts):
+            if len(noisy_variants) >= self.noisy_samples_per_prompt:
+                break
+            fn = rng.choice(generators)
+            noisy_variant = fn(prompt, rng) if fn == self._introduce_typo else fn(prompt)
+            noisy_variants.setdefault(noisy_variant, None)
 
         return list(noisy_variants)
 
@@ -147,25 +165,48 @@ class PromptStabilityEvaluator:
     4. Measures semantic variance
     """
     def __init__(self,model_fn: Callable[[str], str],variance_fn: Callable[[List[str]], Dict[str, float]],
-        noisy_samples_per_prompt: int = 16):
+        noisy_samples_per_prompt: int = 16, seed: int = 0, max_workers: int = 8,
+        executor: Optional[JudgeExecutor] = None):
         self.model_fn = model_fn
         self.variance_fn = variance_fn
         self.generator = PromptPerturbationGenerator(
-            noisy_samples_per_prompt=noisy_samples_per_prompt
+            noisy_samples_per_prompt=noisy_samples_per_prompt, seed=seed
         )
+        # Shared executor = one concurrency cap / rate limit for every model call
+        self.executor = executor or JudgeExecutor(max_workers=max_workers)
+
     def evaluate(self, prompt: str) -> Dict:
         """
         Runs full prompt stability evaluation for ONE prompt.
         """
+        return self.evaluate_batch([prompt])[0]
+
+    def evaluate_batch(self, prompts: List[str]) -> List[Dict]:
+        """
+        Runs prompt stability evaluation for MANY prompts, one result per prompt (in order).
+        Each unique variant string is sent to model_fn once, concurrently.
+        """
 
         # Step 1: Generate prompt variants
-        variants = self.generator.generate(prompt)
+        variants_per_prompt = [self.generator.generate(prompt) for prompt in prompts]
+
+        # Step 2: Call the model once per unique variant string
+        unique_prompts = list(dict.fromkeys(
+            variant.variant_prompt for variants in variants_per_prompt for variant in variants
+        ))
+        outputs = dict(zip(unique_prompts, self.executor.map(self.model_fn, unique_prompts)))
+
+        return [
+            self._summarize(variants, outputs)
+            for variants in variants_per_prompt
+        ]
 
-        # Step 2: Collect model outputs grouped by perturbation type
+    def _summarize(self, variants: List[PromptVariant], outputs_by_prompt: Dict[str, str]) -> Dict:
+        # Collect model outputs grouped by perturbation type
         outputs_by_type: Dict[PerturbationType, List[str]] = {}
 
         for variant in variants:
-            output = self.model_fn(variant.variant_prompt)
+            output = outputs_by_prompt[variant.variant_prompt]
 
             outputs_by_type.setdefault(
                 variant.perturbation_type, []
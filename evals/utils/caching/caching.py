@@ -0,0 +1,277 @@
+"""
+Content-addressed cache for LLM judge responses.
+
+All judges run at temperature 0, so the same (model, messages, params) request
+always deserves the same answer. Responses are stored in SQLite keyed by a
+SHA-256 hash of the canonical request, so reruns on unchanged answers cost nothing.
+
+Features:
+1) LRU eviction once max_entries / max_bytes is exceeded
+2) optional TTL per entry
+3) hit / miss / eviction counters
+4) thread safe (JudgeExecutor calls judges from a thread pool)
+5) replies are only stored once they pass the caller's validate check, so a malformed
+   judge reply is never replayed to a retry
+
+Usage:
+    set_default_cache(JudgeCache(".cache/judge.sqlite"))
+    # every judge helper now goes through the cache
+
+or set the JUDGE_CACHE_PATH environment variable.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional
+
+CACHE_ENV_VAR = "JUDGE_CACHE_PATH"
+
+
+def make_cache_key(model: str, messages: Any, **params) -> str:
+    """SHA-256 of the canonical JSON form of (model, messages, params)."""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "params": params},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class JudgeCache:
+    """
+    SQLite backed response cache.
+    path        : database file (":memory:" for a process-local cache)
+    max_entries : LRU cap on number of entries (None = unbounded)
+    max_bytes   : LRU cap on total stored response size (None = unbounded)
+    ttl_seconds : entries older than this are treated as misses (None = never expire)
+    """
+
+    def __init__(
+        self,
+        path: str = ".cache/judge_cache.sqlite",
+        max_entries: Optional[int] = 100_000,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+    ):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS judge_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_judge_cache_access ON judge_cache(last_access)"
+        )
+        self._conn.commit()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM judge_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or self._expired(row[1], now):
+                if row is not None:
+                    self._conn.execute("DELETE FROM judge_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                    self.evictions += 1
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE judge_cache SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO judge_cache VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM judge_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drops least recently used entries until both caps hold. Caller holds the lock."""
+        if self.max_entries is not None:
+            count = self._conn.execute("SELECT COUNT(*) FROM judge_cache").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM judge_cache WHERE key IN "
+                    "(SELECT key FROM judge_cache ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+        if self.max_bytes is not None:
+            total = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM judge_cache"
+            ).fetchone()[0]
+            if total > self.max_bytes:
+                rows = self._conn.execute(
+                    "SELECT key, size FROM judge_cache ORDER BY last_access ASC"
+                ).fetchall()
+                doomed = []
+                for key, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    doomed.append((key,))
+                    total -= size
+                self._conn.executemany("DELETE FROM judge_cache WHERE key = ?", doomed)
+                self.evictions += len(doomed)
+
+    def purge_expired(self) -> int:
+        """Deletes all entries past their TTL. Returns the number removed."""
+        if self.ttl_seconds is None:
+            return 0
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM judge_cache WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,),
+            )
+            self._conn.commit()
+            self.evictions += cur.rowcount
+            return cur.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM judge_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM judge_cache"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# -----------------------------
+# Default cache + client helpers
+# -----------------------------
+
+_default_cache: Optional[JudgeCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def set_default_cache(cache: Optional[JudgeCache]) -> None:
+    """Installs (or removes, with None) the cache used by all judge helpers."""
+    global _default_cache
+    with _default_cache_lock:
+        _default_cache = cache
+
+
+def get_default_cache() -> Optional[JudgeCache]:
+    """The installed cache; lazily created from JUDGE_CACHE_PATH if that is set."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None and os.environ.get(CACHE_ENV_VAR):
+            _default_cache = JudgeCache(os.environ[CACHE_ENV_VAR])
+        return _default_cache
+
+
+def _as_response(content: str) -> SimpleNamespace:
+    """Minimal stand-in for a chat completion: response.choices[0].message.content."""
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+    )
+
+
+def require_json(*keys: str) -> Callable[[str], Any]:
+    """validate check for cached_chat_completion: the reply is a JSON object with `keys`."""
+    def validate(content: str) -> Any:
+        data = json.loads(content)
+        if not isinstance(data, dict):
+            raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+        for key in keys:
+            if key not in data:
+                raise KeyError(key)
+        return data
+
+    return validate
+
+
+def _is_valid(content: str, validate: Optional[Callable[[str], Any]]) -> bool:
+    if validate is None:
+        return True
+    try:
+        validate(content)
+    except Exception:
+        return False
+    return True
+
+
+def cached_chat_completion(
+    client,
+    cache: Optional[JudgeCache] = None,
+    validate: Optional[Callable[[str], Any]] = None,
+    **request,
+):
+    """
+    Drop-in for client.chat.completions.create(**request) that goes through the cache.
+    Only deterministic (temperature 0) requests are cached; anything else, or no
+    cache installed, is passed straight to the client.
+    validate(content) should raise on a reply the caller cannot parse (e.g. json.loads,
+    require_json("results")). Such replies are returned but not cached, and a cached entry
+    that fails it is dropped and fetched again, so retries reach the client.
+    """
+    cache = cache if cache is not None else get_default_cache()
+    if cache is None or request.get("temperature", 1) != 0:
+        return client.chat.completions.create(**request)
+
+    params = {k: v for k, v in request.items() if k not in ("model", "messages")}
+    key = make_cache_key(request.get("model"), request.get("messages"), **params)
+    content = cache.get(key)
+    if content is not None:
+        if _is_valid(content, validate):
+            return _as_response(content)
+        cache.delete(key)
+
+    response = client.chat.completions.create(**request)
+    content = response.choices[0].message.content
+    if content is not None and _is_valid(content, validate):
+        cache.set(key, content)
+    return response
@@ -0,0 +1,155 @@
+"""
+Shared tokenize-once layer for lexical metrics.
+
+ROUGE (generation/rouge), BLEU (generation/bleu) and coverage (regression/layer1_engine)
+used to tokenize and stem the same answer strings separately. TokenCache memoizes two
+tokenizations per string:
+
+1) rouge_tokens : rouge_score's default tokenizer with Porter stemming
+                  (lowercase, non-alphanumerics -> spaces, stem words longer than 3 chars)
+2) split_tokens : plain str.split(), as used by BLEU
+
+Tokens are interned and every distinct word is stemmed only once, so scoring ROUGE-1/2/L,
+BLEU and coverage over the same corpus tokenizes each string exactly once per scheme.
+
+Usage:
+    cache = get_default_token_cache()
+    scorer = make_rouge_scorer(["rougeL"])        # RougeScorer reading tokens from the cache
+    tokens = cache.split_tokens("the cat sat")
+"""
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from nltk.stem import porter
+from rouge_score import rouge_scorer
+from rouge_score import tokenize as rouge_tokenize
+from rouge_score import tokenizers
+
+Tokens = Tuple[str, ...]
+
+
+class TokenCache:
+    """
+    Memoized, interned tokenization.
+    max_entries: LRU cap on cached strings per scheme (None = unbounded)
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._rouge: "OrderedDict[str, Tokens]" = OrderedDict()
+        self._split: "OrderedDict[str, Tokens]" = OrderedDict()
+        self._stems: Dict[str, str] = {}
+        self._stemmer = porter.PorterStemmer()
+        self._lock = threading.Lock()
+
+    def _lookup(self, table: "OrderedDict[str, Tokens]", text: str) -> Optional[Tokens]:
+        tokens = table.get(text)
+        if tokens is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.max_entries is not None:
+            table.move_to_end(text)
+        return tokens
+
+    def _store(self, table: "OrderedDict[str, Tokens]", text: str, tokens: Tokens) -> Tokens:
+        table[text] = tokens
+        if self.max_entries is not None and len(table) > self.max_entries:
+            table.popitem(last=False)
+        return tokens
+
+    def _stem(self, word: str) -> str:
+        stem = self._stems.get(word)
+        if stem is None:
+            # same rule as rouge_score: only stem words more than 3 characters long
+            stem = sys.intern(self._stemmer.stem(word) if len(word) > 3 else word)
+            self._stems[word] = stem
+        return stem
+
+    def rouge_tokens(self, text: str) -> Tokens:
+        """Tokens identical to rouge_score DefaultTokenizer(use_stemmer=True).tokenize(text)."""
+        with self._lock:
+            tokens = self._lookup(self._rouge, text)
+            if tokens is not None:
+                return tokens
+            normalized = rouge_tokenize.NON_ALPHANUM_RE.sub(" ", text.lower())
+            tokens = tuple(
+                self._stem(w)
+                for w in rouge_tokenize.SPACES_RE.split(normalized)
+                if w
+            )
+            tokens = tuple(t for t in tokens if rouge_tokenize.VALID_TOKEN_RE.match(t))
+            return self._store(self._rouge, text, tokens)
+
+    def split_tokens(self, text: str) -> Tokens:
+        """Whitespace tokens, identical to text.split()."""
+        with self._lock:
+            tokens = self._lookup(self._split, text)
+            if tokens is not None:
+                return tokens
+            tokens = tuple(sys.intern(w) for w in text.split())
+            return self._store(self._split, text, tokens)
+
+    def pretokenize(self, texts: Iterable[str], rouge: bool = True, split: bool = True) -> None:
+        """Warms the cache for a corpus up front."""
+        for text in texts:
+            if rouge:
+                self.rouge_tokens(text)
+            if split:
+                self.split_tokens(text)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "rouge_entries": len(self._rouge),
+            "split_entries": len(self._split),
+            "distinct_stems": len(self._stems),
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rouge.clear()
+            self._split.clear()
+            self._stems.clear()
+
+
+class CachedRougeTokenizer(tokenizers.Tokenizer):
+    """rouge_score tokenizer that reads from a TokenCache instead of re-tokenizing."""
+
+    def __init__(self, cache: Optional[TokenCache] = None):
+        self.cache = cache if cache is not None else get_default_token_cache()
+
+    def tokenize(self, text: str) -> Tokens:
+        return self.cache.rouge_tokens(text)
+
+
+_default_cache: Optional[TokenCache] = None
+_default_cache_lock = threading.Lock()
+
+# bounded so long-running processes don't grow without limit
+DEFAULT_MAX_ENTRIES = 500_000
+
+
+def get_default_token_cache() -> TokenCache:
+    """Process-wide cache shared by all lexical metrics."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = TokenCache(max_entries=DEFAULT_MAX_ENTRIES)
+        return _default_cache
+
+
+def set_default_token_cache(cache: TokenCache) -> None:
+    global _default_cache
+    with _default_cache_lock:
+        _default_cache = cache
+
+
+def make_rouge_scorer(rouge_types: List[str], cache: Optional[TokenCache] = None) -> rouge_scorer.RougeScorer:
+    """RougeScorer with stemming whose tokens come from the shared cache."""
+    return rouge_scorer.RougeScorer(rouge_types, tokenizer=CachedRougeTokenizer(cache))
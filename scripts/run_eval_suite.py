@@ -0,0 +1,45 @@
+"""
+Runs the eval suite over a JSONL evaluation set with the streaming batch runner.
+
+Usage (from the repo root):
+    python -m scripts.run_eval_suite data/evaluation_sets/rag_gold.jsonl \
+        --output data/processed/rag_gold_results.jsonl --metrics rouge bleu ndcg --batch-size 128
+"""
+import argparse
+import json
+
+from evals.runners.batch_run.batch_run import METRICS, run_batch
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the eval suite over a JSONL evaluation set.")
+    parser.add_argument("dataset", help="Path to the JSONL evaluation set")
+    parser.add_argument("--output", required=True, help="Where to write normalized JSONL records")
+    parser.add_argument(
+        "--metrics", nargs="+", default=["rouge", "bleu"], choices=sorted(METRICS),
+        help="Metrics to compute",
+    )
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--ndcg-k", type=int, default=10)
+    parser.add_argument(
+        "--checkpoint", default=None,
+        help="Journal file; rerunning with the same path resumes an interrupted run",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    summary = run_batch(
+        args.dataset,
+        args.output,
+        metrics=args.metrics,
+        batch_size=args.batch_size,
+        metric_kwargs={"ndcg": {"k": args.ndcg_k}},
+        checkpoint_path=args.checkpoint,
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Embedding cache keyed by (model, normalized text hash).
+
+Wraps any embedder -- a plain embed_fn(List[str]) -> vectors, or a backend object with an
+.embed(texts) method -- so that only texts never seen before are sent to it:
+
+1) texts are normalized (NFKC, trimmed, whitespace collapsed) and hashed with the model name
+2) duplicates inside a batch are embedded once
+3) an in-memory LRU is checked first, then a SQLite store holding float16 vectors
+4) the remaining texts go to the embedder in one call (or batches of batch_size)
+
+Vectors are always returned as float32 rounded through float16, so a text gets exactly the
+same vector whether it was a cache hit or a fresh embedding.
+
+Usage:
+    embed = CachedEmbedder(openai_embed_fn, model="text-embedding-3-small")
+    compute_answer_variance(answers, embed)
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# SQLite limits the number of bound parameters per statement
+_SQL_BATCH = 500
+
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def embedding_cache_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\x00{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class CachedEmbedder:
+    """
+    embedder        : embed_fn(List[str]) -> List[List[float]] | np.ndarray, or an object with .embed()
+    model           : model name, part of the cache key
+    path            : SQLite file for the float16 store (None = in-memory LRU only)
+    max_memory_items: LRU size of the in-memory front
+    batch_size      : max texts per embedder call for cache misses (None = all at once)
+    """
+
+    def __init__(
+        self,
+        embedder,
+        model: str,
+        path: Optional[str] = ".cache/embeddings.sqlite",
+        max_memory_items: int = 50_000,
+        batch_size: Optional[int] = None,
+    ):
+        self._embed_fn: Callable[[List[str]], object] = getattr(embedder, "embed", embedder)
+        self.model = model
+        self.max_memory_items = max_memory_items
+        self.batch_size = batch_size
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if path is not None:
+            if path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embedding_cache "
+                "(key TEXT PRIMARY KEY, dim INTEGER NOT NULL, vector BLOB NOT NULL)"
+            )
+            self._conn.commit()
+
+    # -----------------------------
+    # memory / disk tiers
+    # -----------------------------
+
+    def _remember(self, key: str, vec: np.ndarray) -> None:
+        self._memory[key] = vec
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _load_from_disk(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        if self._conn is None:
+            return found
+        for start in range(0, len(keys), _SQL_BATCH):
+            chunk = keys[start:start + _SQL_BATCH]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT key, vector FROM embedding_cache WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float16)
+        return found
+
+    def _save_to_disk(self, items: Dict[str, np.ndarray]) -> None:
+        if self._conn is None or not items:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO embedding_cache VALUES (?, ?, ?)",
+            [(key, vec.shape[0], vec.tobytes()) for key, vec in items.items()],
+        )
+        self._conn.commit()
+
+    def _embed_missing(self, texts: List[str]) -> np.ndarray:
+        step = self.batch_size or len(texts)
+        parts = []
+        for i in range(0, len(texts), step):
+            chunk = texts[i:i + step]
+            part = np.asarray(self._embed_fn(chunk), dtype=np.float32)
+            if part.ndim != 2 or part.shape[0] != len(chunk):
+                raise ValueError(
+                    f"embedder returned {part.shape[0] if part.ndim else 0} vectors "
+                    f"(shape {part.shape}) for {len(chunk)} texts; expected one row per text"
+                )
+            parts.append(part)
+        return np.concatenate(parts, axis=0)
+
+    # -----------------------------
+    # public API
+    # -----------------------------
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """(len(texts), d) float32 vectors; only uncached, de-duplicated texts hit the embedder."""
+        keys = [embedding_cache_key(self.model, t) for t in texts]
+        first_text: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            first_text.setdefault(key, text)
+
+        with self._lock:
+            vectors: Dict[str, np.ndarray] = {}
+            for key in first_text:
+                vec = self._memory.get(key)
+                if vec is not None:
+                    self._memory.move_to_end(key)
+                    vectors[key] = vec
+            self.memory_hits += len(vectors)
+
+            on_disk = self._load_from_disk([k for k in first_text if k not in vectors])
+            self.disk_hits += len(on_disk)
+            for key, vec in on_disk.items():
+                vectors[key] = vec
+                self._remember(key, vec)
+
+            missing = [k for k in first_text if k not in vectors]
+            self.misses += len(missing)
+
+        if missing:
+            fresh = self._embed_missing([first_text[k] for k in missing]).astype(np.float16)
+            new_items = {key: fresh[i].copy() for i, key in enumerate(missing)}
+            with self._lock:
+                self._save_to_disk(new_items)
+                for key, vec in new_items.items():
+                    vectors[key] = vec
+                    self._remember(key, vec)
+
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([vectors[k] for k in keys]).astype(np.float32)
+
+    __call__ = embed
+
+    def stats(self) -> Dict[str, int]:
+        entries = 0
+        if self._conn is not None:
+            with self._lock:
+                entries = self._conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+            "disk_entries": entries,
+        }
+
+    def close(self) -> None:
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+                self._conn = None
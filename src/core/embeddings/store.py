@@ -0,0 +1,163 @@
+"""
+Memory-mapped on-disk embedding store.
+
+Layout of one store (a directory, by default under data/embeddings/):
+    vectors.npy   (n, d) float32 or float16, opened with np.load(mmap_mode="r")
+    ids.json      list of n ids, row i belongs to ids[i]
+    meta.json     {"count": n, "dim": d, "dtype": "float16"}
+
+Nothing is loaded into RAM up front: reads are slices of the memory map, which are
+zero-copy when the requested ids are consecutive rows. Multi-million-row baselines
+can therefore be compared chunk by chunk.
+
+Usage:
+    with EmbeddingStoreWriter("data/embeddings/baseline", count=n, dim=768) as writer:
+        for ids, vecs in batches:
+            writer.add(ids, vecs)
+
+    store = EmbeddingStore("data/embeddings/baseline")
+    vecs = store.select(["q-1", "q-2"])
+"""
+import json
+import os
+from typing import Dict, Iterable, List, Sequence, Union
+
+import numpy as np
+
+DEFAULT_ROOT = os.path.join("data", "embeddings")
+SUPPORTED_DTYPES = ("float32", "float16")
+
+
+def store_path(name: str, root: str = DEFAULT_ROOT) -> str:
+    return os.path.join(root, name)
+
+
+class EmbeddingStoreWriter:
+    """
+    Streams vectors into a new store without holding them in memory.
+    count and dim must be known up front (the .npy header is written first).
+    """
+
+    def __init__(self, path: str, count: int, dim: int, dtype: str = "float16"):
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"dtype must be one of {SUPPORTED_DTYPES}")
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.count = count
+        self.dim = dim
+        self.dtype = dtype
+        self._vectors = np.lib.format.open_memmap(
+            os.path.join(path, "vectors.npy"), mode="w+", dtype=dtype, shape=(count, dim)
+        )
+        self._ids: List[str] = []
+
+    def add(self, ids: Sequence[str], vectors) -> None:
+        vectors = np.asarray(vectors)
+        if vectors.shape != (len(ids), self.dim):
+            raise ValueError(f"expected vectors of shape ({len(ids)}, {self.dim}), got {vectors.shape}")
+        start = len(self._ids)
+        if start + len(ids) > self.count:
+            raise ValueError("more vectors than the store was created for")
+        self._vectors[start:start + len(ids)] = vectors
+        self._ids.extend(ids)
+
+    def close(self) -> None:
+        if len(self._ids) != self.count:
+            raise ValueError(f"store expects {self.count} vectors, got {len(self._ids)}")
+        if len(set(self._ids)) != len(self._ids):
+            raise ValueError("ids must be unique")
+        self._vectors.flush()
+        del self._vectors
+        with open(os.path.join(self.path, "ids.json"), "w", encoding="utf-8") as f:
+            json.dump(self._ids, f)
+        with open(os.path.join(self.path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"count": self.count, "dim": self.dim, "dtype": self.dtype}, f)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+
+
+class RowSelection:
+    """
+    Lazy, array-like view over arbitrary (non-consecutive) rows of a store.
+    Slicing gathers only the requested chunk, so chunked kernels never materialize
+    the whole selection.
+    """
+
+    def __init__(self, vectors: np.ndarray, rows: np.ndarray):
+        self.vectors = vectors
+        self.rows = rows
+        self.shape = (len(rows), vectors.shape[1])
+        self.ndim = 2
+        self.dtype = vectors.dtype
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, key):
+        return self.vectors[self.rows[key]]
+
+    def __array__(self, dtype=None, copy=None):
+        arr = self.vectors[self.rows]
+        return arr if dtype is None else arr.astype(dtype)
+
+
+class EmbeddingStore:
+    """Read-only, memory-mapped embedding store with an id -> row index."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.vectors: np.ndarray = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        with open(os.path.join(path, "ids.json"), "r", encoding="utf-8") as f:
+            self.ids: List[str] = json.load(f)
+        self._index: Dict[str, int] = {id_: row for row, id_ in enumerate(self.ids)}
+
+    @classmethod
+    def build(cls, path: str, ids: Sequence[str], vectors, dtype: str = "float16",
+              chunk_size: int = 65536) -> "EmbeddingStore":
+        """Writes ids/vectors (array or list) to a new store and opens it."""
+        vectors = np.asarray(vectors)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("vectors must be (len(ids), d)")
+        with EmbeddingStoreWriter(path, len(ids), vectors.shape[1], dtype) as writer:
+            for start in range(0, len(ids), chunk_size):
+                writer.add(ids[start:start + chunk_size], vectors[start:start + chunk_size])
+        return cls(path)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, id_: str) -> bool:
+        return id_ in self._index
+
+    @property
+    def dim(self) -> int:
+        return self.vectors.shape[1]
+
+    def rows(self, ids: Iterable[str]) -> np.ndarray:
+        """Row numbers for ids (KeyError on unknown ids)."""
+        return np.fromiter((self._index[i] for i in ids), dtype=np.int64)
+
+    def select(self, ids: Sequence[str]) -> Union[np.ndarray, RowSelection]:
+        """
+        Vectors for ids, in the given order.
+        Consecutive rows come back as a zero-copy memmap slice; anything else as a lazy
+        RowSelection that gathers rows chunk by chunk.
+        """
+        rows = self.rows(ids)
+        if len(rows) == 0:
+            return self.vectors[0:0]
+        start = int(rows[0])
+        if np.array_equal(rows, np.arange(start, start + len(rows))):
+            return self.vectors[start:start + len(rows)]
+        return RowSelection(self.vectors, rows)
+
+    def __call__(self, ids: Sequence[str]) -> np.ndarray:
+        """Lets a store stand in for an embed_fn when the "texts" are store ids."""
+        return np.asarray(self.select(ids))
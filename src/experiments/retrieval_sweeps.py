@@ -0,0 +1,90 @@
+"""
+Multi-cutoff retrieval sweeps.
+
+Calling mean_ndcg_at_k / mean_recall_at_k once per k re-walks every ranked list and
+re-sorts every relevance map for IDCG on each call. A sweep instead:
+
+1) encodes the qrels once (EncodedQrels); ideal DCG prefixes are cached on it, so repeated
+   sweeps over the same qrels (other retrievers, other settings) skip the IDCG work entirely
+2) encodes each run once to depth max(cutoffs) and takes cumulative gain / hit prefixes,
+   so every cutoff is a column lookup: O(max_k) per query in total
+
+Usage:
+    sweep = RetrievalSweep(all_relevance_maps, cutoffs=(1, 3, 5, 10, 20, 50))
+    results = sweep.compare({"bm25": bm25_runs, "dense": dense_runs})
+    for row in sweep_table(results["dense"]):
+        print(row)
+"""
+from typing import Dict, List, Mapping, Sequence, Union
+
+from evals.retrieval.engine.engine import (
+    EncodedQrels,
+    Relevance,
+    encode_runs,
+    per_query_metrics,
+)
+
+DEFAULT_CUTOFFS = (1, 3, 5, 10, 20, 50)
+DEFAULT_METRICS = ("ndcg", "recall", "precision", "map", "hit_rate")
+
+SweepResult = Dict[str, Union[float, Dict[int, float]]]
+
+
+class RetrievalSweep:
+    """
+    all_relevance : per-query relevance ({doc_id: grade} maps or sets of relevant ids),
+                    or an already built EncodedQrels
+    cutoffs       : k values reported for every metric
+    metrics       : subset of ndcg / recall / precision / map / hit_rate
+    """
+
+    def __init__(
+        self,
+        all_relevance: Union[Sequence[Relevance], EncodedQrels],
+        cutoffs: Sequence[int] = DEFAULT_CUTOFFS,
+        metrics: Sequence[str] = DEFAULT_METRICS,
+    ):
+        if not cutoffs or min(cutoffs) < 1:
+            raise ValueError("cutoffs must be positive")
+        self.qrels = all_relevance if isinstance(all_relevance, EncodedQrels) else EncodedQrels(all_relevance)
+        self.cutoffs = tuple(sorted(set(cutoffs)))
+        self.metrics = tuple(metrics)
+        self.max_k = self.cutoffs[-1]
+
+    def run(self, all_retrieved: Sequence[Sequence[str]]) -> SweepResult:
+        """
+        Returns {"ndcg": {k: mean}, "recall": {k: mean}, ..., "mrr": mean}.
+        MRR only looks at the first max(cutoffs) ranks.
+        """
+        runs = encode_runs(all_retrieved, self.qrels, max_k=self.max_k)
+        per_query = per_query_metrics(runs, self.cutoffs, self.metrics)
+        n = max(1, runs.num_queries)
+        result: SweepResult = {
+            name: {k: float(values.sum()) / n for k, values in per_query[name].items()}
+            for name in self.metrics
+        }
+        result["mrr"] = float(per_query["mrr"].sum()) / n
+        return result
+
+    def compare(self, named_runs: Mapping[str, Sequence[Sequence[str]]]) -> Dict[str, SweepResult]:
+        """Same qrels, several retrievers: {name: run(...)}."""
+        return {name: self.run(all_retrieved) for name, all_retrieved in named_runs.items()}
+
+
+def sweep_retrieval_metrics(
+    all_retrieved: Sequence[Sequence[str]],
+    all_relevance: Sequence[Relevance],
+    cutoffs: Sequence[int] = DEFAULT_CUTOFFS,
+    metrics: Sequence[str] = DEFAULT_METRICS,
+) -> SweepResult:
+    """One-off sweep; keep a RetrievalSweep around to reuse the qrels across runs."""
+    return RetrievalSweep(all_relevance, cutoffs, metrics).run(all_retrieved)
+
+
+def sweep_table(result: SweepResult) -> List[Dict[str, float]]:
+    """One row per cutoff: [{"k": 1, "ndcg": ..., "recall": ..., ...}, ...]."""
+    cutoffs = sorted({k for values in result.values() if isinstance(values, dict) for k in values})
+    return [
+        {"k": k, **{name: values[k] for name, values in result.items() if isinstance(values, dict)}}
+        for k in cutoffs
+    ]
@@ -0,0 +1,389 @@
+"""
+Span-based tracing for RAG and eval stages.
+
+latency_timer only records a flat stage -> ms dict; nested work (a retrieval made of several
+steps, the per-claim judge calls inside faithfulness) is invisible. A span is one timed unit
+of work with:
+    trace_id / span_id / parent_id   parent = the span open in the current context
+    start_ns / end_ns                time.perf_counter_ns (monotonic)
+    attributes                       small JSON-serializable key/values
+
+Spans are cheap context managers. Finished spans are appended to a bounded ring buffer
+(a deque: append/popleft are atomic, so the hot path takes no lock). A background exporter
+thread drains the ring in batches -- when flush_batch spans are buffered or every
+flush_interval_s -- so no file I/O runs on (and gets timed inside) an instrumented thread:
+    JsonlSpanExporter    one JSON object per span
+    ChromeTraceExporter  trace-event format, open the file in chrome://tracing or Perfetto
+When the ring is full the oldest spans are dropped and counted in tracer.dropped.
+
+The parent is tracked with a ContextVar, so nesting follows threads and asyncio tasks.
+JudgeExecutor copies the caller's context into its workers, so judge calls made on the
+pool nest under the span that submitted them.
+
+Usage:
+    set_tracer(Tracer([JsonlSpanExporter("traces/spans.jsonl"), ChromeTraceExporter("traces/trace.json")]))
+    with get_tracer().span("retrieval", top_k=5):
+        with get_tracer().span("vector_search"):
+            ...
+    client = TracedClient(openai_client)      # every chat completion becomes a span
+    get_tracer().close()
+
+or set the TRACE_DIR environment variable. Without a tracer installed, spans are no-ops.
+"""
+import atexit
+import functools
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+TRACE_ENV_VAR = "TRACE_DIR"
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+def _new_id() -> str:
+    return f"{random.getrandbits(64):016x}"
+
+
+def current_span() -> Optional["Span"]:
+    return _current_span.get()
+
+
+class Span:
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+        "attributes", "thread_id", "_tracer", "_token",
+    )
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]):
+        parent = _current_span.get()
+        self.name = name
+        self.span_id = _new_id()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.trace_id = parent.trace_id if parent is not None else _new_id()
+        self.attributes = attributes
+        self.start_ns = 0
+        self.end_ns = 0
+        self.thread_id = 0
+        self._tracer = tracer
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        self.thread_id = threading.get_ident()
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.attributes["error"] = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        self._tracer._finish(self)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "thread_id": self.thread_id,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Returned by a disabled tracer: no timing, no buffering."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+# -----------------------------
+# Exporters
+# -----------------------------
+
+class JsonlSpanExporter:
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, spans: Sequence[Span]) -> None:
+        self._file.write("".join(json.dumps(s.to_dict(), default=str) + "\n" for s in spans))
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ChromeTraceExporter:
+    """
+    Chrome trace-event JSON array of complete ("X") events, ts/dur in microseconds.
+    The array is left open while tracing (the format allows that, so a crashed run is
+    still loadable) and closed with "]" on close().
+    """
+
+    def __init__(self, path: str, pid: Optional[int] = None):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.pid = pid if pid is not None else os.getpid()
+        self._file = open(path, "w", encoding="utf-8")
+        self._file.write("[\n")
+        self._events = 0
+
+    def export(self, spans: Sequence[Span]) -> None:
+        lines = []
+        for s in spans:
+            event = {
+                "name": s.name,
+                "cat": "span",
+                "ph": "X",
+                "ts": s.start_ns / 1000,
+                "dur": (s.end_ns - s.start_ns) / 1000,
+                "pid": self.pid,
+                "tid": s.thread_id,
+                "args": {"trace_id": s.trace_id, "span_id": s.span_id, "parent_id": s.parent_id, **s.attributes},
+            }
+            prefix = ",\n" if self._events else ""
+            lines.append(prefix + json.dumps(event, default=str))
+            self._events += 1
+        self._file.write("".join(lines))
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.write("\n]\n")
+        self._file.close()
+
+
+# -----------------------------
+# Tracer
+# -----------------------------
+
+class Tracer:
+    """
+    exporters   : objects with export(spans) / close()
+    capacity    : ring buffer size; the oldest spans are dropped beyond it
+    flush_batch : buffered spans that wake the exporter thread
+    flush_interval_s : the exporter thread also flushes this often
+    enabled     : False turns every span into a no-op
+    """
+
+    def __init__(
+        self,
+        exporters: Sequence[Any] = (),
+        capacity: int = 65536,
+        flush_batch: int = 1024,
+        enabled: bool = True,
+        flush_interval_s: float = 1.0,
+    ):
+        self.exporters = list(exporters)
+        self.capacity = capacity
+        self.flush_batch = flush_batch
+        self.flush_interval_s = flush_interval_s
+        self.enabled = enabled
+        self.dropped = 0
+        self._ring: deque = deque(maxlen=capacity)
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._exporter_thread: Optional[threading.Thread] = None
+        if self.enabled and self.exporters:
+            self._exporter_thread = threading.Thread(target=self._export_loop, name="span-exporter", daemon=True)
+            self._exporter_thread.start()
+
+    def _export_loop(self) -> None:
+        while not self._closed.is_set():
+            self._wake.wait(self.flush_interval_s)
+            self._wake.clear()
+            self.flush()
+
+    def span(self, name: str, **attributes):
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name, attributes)
+
+    def traced(self, name: Optional[str] = None) -> Callable:
+        """Decorator: every call of the function runs inside a span."""
+        def decorator(fn: Callable) -> Callable:
+            span_name = name or fn.__qualname__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return fn(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def _finish(self, span: Span) -> None:
+        ring = self._ring
+        if len(ring) == self.capacity:
+            self.dropped += 1
+        ring.append(span)
+        if len(ring) >= self.flush_batch:
+            self._wake.set()  # the exporter thread does the I/O
+
+    def drain(self) -> List[Span]:
+        """Removes and returns every buffered span."""
+        spans = []
+        ring = self._ring
+        while True:
+            try:
+                spans.append(ring.popleft())
+            except IndexError:
+                return spans
+
+    def flush(self, blocking: bool = True) -> int:
+        """
+        Exports buffered spans now (normally left to the exporter thread); with
+        blocking=False, returns at once if another thread is flushing.
+        """
+        if not self._flush_lock.acquire(blocking=blocking):
+            return 0
+        try:
+            spans = self.drain()
+            if spans:
+                for exporter in self.exporters:
+                    exporter.export(spans)
+            return len(spans)
+        finally:
+            self._flush_lock.release()
+
+    def close(self) -> None:
+        self._closed.set()
+        self._wake.set()
+        if self._exporter_thread is not None:
+            self._exporter_thread.join()
+            self._exporter_thread = None
+        self.flush()
+        for exporter in self.exporters:
+            exporter.close()
+        self.exporters = []
+
+
+_default_tracer: Optional[Tracer] = None
+_default_tracer_lock = threading.Lock()
+_DISABLED = Tracer(enabled=False)
+
+
+def set_tracer(tracer: Optional[Tracer]) -> None:
+    """Installs (or removes, with None) the tracer used by all instrumented code."""
+    global _default_tracer
+    with _default_tracer_lock:
+        _default_tracer = tracer
+
+
+def get_tracer() -> Tracer:
+    """The installed tracer; lazily created from TRACE_DIR if set, otherwise a no-op tracer."""
+    global _default_tracer
+    tracer = _default_tracer
+    if tracer is not None:
+        return tracer
+    if not os.environ.get(TRACE_ENV_VAR):
+        return _DISABLED
+    with _default_tracer_lock:
+        if _default_tracer is None:
+            trace_dir = os.environ[TRACE_ENV_VAR]
+            _default_tracer = Tracer([
+                JsonlSpanExporter(os.path.join(trace_dir, "spans.jsonl")),
+                ChromeTraceExporter(os.path.join(trace_dir, f"trace-{os.getpid()}.json")),
+            ])
+            atexit.register(_default_tracer.close)
+        return _default_tracer
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Like Tracer.traced, but resolves get_tracer() at call time."""
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with get_tracer().span(span_name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# -----------------------------
+# Judge client wrapper
+# -----------------------------
+
+class _TracedCompletions:
+    def __init__(self, completions, tracer: Optional[Tracer]):
+        self._completions = completions
+        self._tracer = tracer
+
+    def create(self, **request):
+        tracer = self._tracer or get_tracer()
+        messages = request.get("messages") or []
+        with tracer.span(
+            "llm.chat.completions",
+            model=request.get("model"),
+            temperature=request.get("temperature"),
+            num_messages=len(messages),
+            prompt_chars=sum(len(str(m.get("content", ""))) for m in messages if isinstance(m, dict)),
+        ) as span:
+            response = self._completions.create(**request)
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                span.set_attribute("prompt_tokens", getattr(usage, "prompt_tokens", None))
+                span.set_attribute("completion_tokens", getattr(usage, "completion_tokens", None))
+            return response
+
+    def __getattr__(self, name):
+        return getattr(self._completions, name)
+
+
+class _TracedChat:
+    def __init__(self, chat, tracer: Optional[Tracer]):
+        self._chat = chat
+        self.completions = _TracedCompletions(chat.completions, tracer)
+
+    def __getattr__(self, name):
+        return getattr(self._chat, name)
+
+
+class TracedClient:
+    """
+    Wraps an OpenAI-style client so every chat.completions.create call is a span
+    (model, temperature, prompt size, token usage). Everything else is passed through,
+    so it drops into every judge helper (and cached_chat_completion) unchanged.
+    """
+
+    def __init__(self, client, tracer: Optional[Tracer] = None):
+        self._client = client
+        self.chat = _TracedChat(client.chat, tracer)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
@@ -0,0 +1,254 @@
+"""
+Pipelined stage execution for RAG requests.
+
+A request handler runs preprocess -> retrieve -> build_prompt -> call_llm strictly in
+sequence, so under batch workloads CPU-bound prompt building and I/O-bound retrieval / LLM
+calls never overlap. PipelinedExecutor gives every stage its own worker threads and a bounded
+input queue:
+
+    feeder -> [q0] -> preprocessing x N -> [q1] -> retrieval x N -> ... -> [out] -> caller
+
+Many requests are in flight at once, one per stage worker. A full queue blocks the stage in
+front of it (backpressure), and the feeder admits at most max_in_flight requests that have
+not been yielded yet, so a slow request at the head of ordered output cannot pile the rest
+up in the reorder buffer: memory stays bounded however many requests are submitted.
+Closing the result generator early stops the feeder and every stage worker.
+
+Per request the result keeps the handle_request accounting and adds queue waits:
+    latency_ms     stage -> service time (ms), plus "total" = sum of stages
+    queue_wait_ms  stage -> time spent waiting in that stage's queue, plus "total"
+    end_to_end_ms  submit -> done
+
+Usage:
+    stages = rag_stages(preprocess, retrieve_documents, build_prompt, call_llm,
+                        workers={"retrieval": 16, "llm_inference": 32})
+    for result in PipelinedExecutor(stages).imap(queries):
+        ...
+"""
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from src.logging.traces import get_tracer
+
+_DONE = object()
+
+
+class Stage:
+    """
+    name       : stage name, the key in latency_ms / queue_wait_ms
+    fn         : fn(state) -> None, reads and writes the per-request state dict
+    workers    : worker threads for this stage
+    queue_size : capacity of the stage's input queue
+    """
+
+    def __init__(self, name: str, fn: Callable[[Dict[str, Any]], None], workers: int = 4, queue_size: int = 64):
+        if workers < 1 or queue_size < 1:
+            raise ValueError("workers and queue_size must be >= 1")
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.queue_size = queue_size
+
+
+class _Job:
+    __slots__ = ("index", "state", "latency_ms", "queue_wait_ms", "submitted", "enqueued", "error")
+
+    def __init__(self, index: int, state: Dict[str, Any]):
+        self.index = index
+        self.state = state
+        self.latency_ms: Dict[str, float] = {}
+        self.queue_wait_ms: Dict[str, float] = {}
+        self.submitted = time.perf_counter()
+        self.enqueued = self.submitted
+        self.error: Optional[str] = None
+
+
+class PipelinedExecutor:
+    """
+    stages     : ordered Stage list
+    recorder   : optional LatencyRecorder-like object (.record(stage, ms)); service times are
+                 recorded under the stage name, queue waits under "<stage>.queue_wait"
+    output_key : state key returned as the result's "answer"
+    max_in_flight : requests submitted but not yet yielded (default: every stage's
+                 queue plus its workers)
+    """
+
+    def __init__(self, stages: Sequence[Stage], recorder=None, output_key: str = "answer",
+                 max_in_flight: Optional[int] = None):
+        if not stages:
+            raise ValueError("at least one stage is required")
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError("max_in_flight must be >= 1")
+        self.stages = list(stages)
+        self.recorder = recorder
+        self.output_key = output_key
+        self.max_in_flight = max_in_flight or sum(s.queue_size + s.workers for s in self.stages)
+
+    def _worker(
+        self, stage: Stage, inbox: queue.Queue, outbox: queue.Queue,
+        downstream: int, finished: List[int], lock: threading.Lock, stop: threading.Event,
+    ) -> None:
+        tracer = get_tracer()
+        while True:
+            job = inbox.get()
+            if job is _DONE:
+                break
+            if stop.is_set():
+                continue  # the caller went away: drain without running the stage
+            start = time.perf_counter()
+            wait_ms = (start - job.enqueued) * 1000
+            job.queue_wait_ms[stage.name] = round(wait_ms, 2)
+            if job.error is None:
+                with tracer.span(stage.name, request=job.index, queue_wait_ms=round(wait_ms, 2)):
+                    try:
+                        stage.fn(job.state)
+                    except Exception as e:
+                        job.error = f"{stage.name}: {type(e).__name__}: {e}"
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                job.latency_ms[stage.name] = round(elapsed_ms, 2)
+                if self.recorder is not None:
+                    self.recorder.record(stage.name, elapsed_ms)
+                    self.recorder.record(f"{stage.name}.queue_wait", wait_ms)
+            job.enqueued = time.perf_counter()
+            outbox.put(job)  # blocks while the next stage is full: backpressure
+        # the last worker of a stage to exit tells every worker of the next stage to stop
+        with lock:
+            finished[0] += 1
+            last = finished[0] == stage.workers
+        if last:
+            for _ in range(downstream):
+                outbox.put(_DONE)
+
+    def _result(self, job: _Job) -> Dict[str, Any]:
+        latency_ms = dict(job.latency_ms)
+        latency_ms["total"] = round(sum(job.latency_ms.values()), 2)
+        queue_wait_ms = dict(job.queue_wait_ms)
+        queue_wait_ms["total"] = round(sum(job.queue_wait_ms.values()), 2)
+        result = {
+            "answer": job.state.get(self.output_key),
+            "latency_ms": latency_ms,
+            "queue_wait_ms": queue_wait_ms,
+            # submit -> left the last stage (time spent in the reorder buffer is not counted)
+            "end_to_end_ms": round((job.enqueued - job.submitted) * 1000, 2),
+        }
+        if job.error is not None:
+            result["error"] = job.error
+        if self.recorder is not None:
+            self.recorder.record("total", latency_ms["total"])
+        return result
+
+    def imap(self, items: Iterable[Any], input_key: str = "query", ordered: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Streams results as requests leave the last stage (in input order unless ordered=False).
+        items are consumed lazily; a failing stage marks the request with "error" and the
+        remaining stages skip it.
+        """
+        queues = [queue.Queue(maxsize=s.queue_size) for s in self.stages]
+        out: queue.Queue = queue.Queue(maxsize=self.stages[-1].queue_size)
+        outboxes = queues[1:] + [out]
+        # how many _DONE markers each outbox needs: one per consuming worker (1 = the caller)
+        downstream = [s.workers for s in self.stages[1:]] + [1]
+
+        stop = threading.Event()
+        # one slot per request between submit and yield; bounds the reorder buffer too
+        slots = threading.Semaphore(self.max_in_flight)
+
+        threads = []
+        for stage, inbox, outbox, consumers in zip(self.stages, queues, outboxes, downstream):
+            finished, lock = [0], threading.Lock()
+            for _ in range(stage.workers):
+                t = threading.Thread(
+                    target=self._worker, args=(stage, inbox, outbox, consumers, finished, lock, stop),
+                    daemon=True,
+                )
+                t.start()
+                threads.append(t)
+
+        feed_error: List[BaseException] = []
+
+        def feed() -> None:
+            try:
+                for index, item in enumerate(items):
+                    slots.acquire()
+                    if stop.is_set():
+                        break
+                    queues[0].put(_Job(index, {input_key: item}))  # blocks when stage 0 is full
+            except BaseException as e:
+                feed_error.append(e)
+            finally:
+                for _ in range(self.stages[0].workers):
+                    queues[0].put(_DONE)
+
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+
+        drained = False
+        try:
+            pending: Dict[int, _Job] = {}
+            next_index = 0
+            while True:
+                job = out.get()
+                if job is _DONE:
+                    drained = True
+                    break
+                if not ordered:
+                    slots.release()
+                    yield self._result(job)
+                    continue
+                pending[job.index] = job
+                while next_index in pending:
+                    slots.release()
+                    yield self._result(pending.pop(next_index))
+                    next_index += 1
+        finally:
+            if not drained:
+                # closed early (or a result raised): stop feeding, let the workers skip what
+                # is queued, and drain the output until every stage has shut down
+                stop.set()
+                slots.release()
+                while out.get() is not _DONE:
+                    pass
+            for t in threads:
+                t.join()
+            feeder.join()
+        if feed_error:
+            raise feed_error[0]
+
+    def map(self, items: Iterable[Any], input_key: str = "query") -> List[Dict[str, Any]]:
+        return list(self.imap(items, input_key=input_key))
+
+
+def rag_stages(
+    preprocess: Callable[[str], str],
+    retrieve: Callable[[str], List[str]],
+    build_prompt: Callable[[str, List[str]], str],
+    call_llm: Callable[[str], str],
+    workers: Optional[Dict[str, int]] = None,
+    queue_size: int = 64,
+) -> List[Stage]:
+    """
+    The four RAG stages, with the same names as handle_request's latency_ms keys.
+    workers: per-stage thread counts, e.g. more for I/O-bound retrieval / LLM calls.
+    """
+    workers = {"preprocessing": 2, "retrieval": 8, "prompt_build": 2, "llm_inference": 16, **(workers or {})}
+
+    def _preprocess(state):
+        state["clean_query"] = preprocess(state["query"])
+
+    def _retrieve(state):
+        state["docs"] = retrieve(state["clean_query"])
+
+    def _build_prompt(state):
+        state["prompt"] = build_prompt(state["clean_query"], state["docs"])
+
+    def _call_llm(state):
+        state["answer"] = call_llm(state["prompt"])
+
+    return [
+        Stage("preprocessing", _preprocess, workers["preprocessing"], queue_size),
+        Stage("retrieval", _retrieve, workers["retrieval"], queue_size),
+        Stage("prompt_build", _build_prompt, workers["prompt_build"], queue_size),
+        Stage("llm_inference", _call_llm, workers["llm_inference"], queue_size),
+    ]
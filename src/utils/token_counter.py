@@ -0,0 +1,41 @@
+"""
+Token counting helpers used for prompt budgeting.
+
+Uses tiktoken when it is installed; otherwise falls back to the usual
+~4 characters per token estimate (same heuristic as evals/latency/pipeline.py).
+"""
+from functools import lru_cache
+from typing import List
+
+try:
+    import tiktoken
+except ImportError:  # optional dependency
+    tiktoken = None
+
+CHARS_PER_TOKEN = 4
+DEFAULT_ENCODING = "cl100k_base"
+
+
+@lru_cache(maxsize=32)
+def _get_encoding(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    """Number of tokens `text` takes for `model` (estimated if tiktoken is missing)."""
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_tokens_batch(texts: List[str], model: str = "gpt-4o-mini") -> List[int]:
+    """count_tokens for many texts."""
+    return [count_tokens(t, model) for t in texts]
@@ -0,0 +1,130 @@
+import json
+import re
+from types import SimpleNamespace
+from typing import Dict, Tuple
+
+import numpy as np
+import pytest
+
+WORDS = "the model answer explains retrieval latency context prompt tokens cache index score".split()
+
+
+def make_regression_inputs(
+    n: int = 60,
+    dim: int = 16,
+    seed: int = 0,
+    new_scale: float = 0.4,
+    ctx_scale: float = 0.3,
+    answer_words: int = 8,
+    drop: Tuple[float, float] = (0.3, 0.3),
+) -> SimpleNamespace:
+    """
+    A seeded golden set for the regression layer:
+        ids                       "s-0", "s-1", ...
+        base / new / ctx          (n, dim) float32; new and ctx are base plus gaussian noise
+        baseline_answers          answer_words random WORDS each
+        new_answers               the baseline with each word dropped with a per-sample
+                                  probability drawn from drop (lo, hi)
+        contexts                  "context <i>"
+    """
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=(n, dim)).astype(np.float32)
+    new = base + rng.normal(scale=new_scale, size=(n, dim)).astype(np.float32)
+    ctx = base + rng.normal(scale=ctx_scale, size=(n, dim)).astype(np.float32)
+    baseline_answers, new_answers = [], []
+    for _ in range(n):
+        words = list(rng.choice(WORDS, size=answer_words))
+        p_drop = rng.uniform(*drop)
+        baseline_answers.append(" ".join(words))
+        new_answers.append(" ".join(w for w in words if rng.random() >= p_drop) or "empty")
+    return SimpleNamespace(
+        ids=[f"s-{i}" for i in range(n)],
+        base=base,
+        new=new,
+        ctx=ctx,
+        baseline_answers=baseline_answers,
+        new_answers=new_answers,
+        contexts=[f"context {i}" for i in range(n)],
+    )
+
+
+@pytest.fixture
+def regression_inputs():
+    """Factory fixture: regression_inputs(n=..., seed=..., ...) -> make_regression_inputs(...)."""
+    return make_regression_inputs
+
+
+class ScriptedClient:
+    """
+    Stand-in for an OpenAI client. `replies` is either a list of contents, returned in order
+    and then repeating the last one, or a function of the request kwargs returning the content.
+    """
+
+    def __init__(self, replies):
+        self.replies = replies if callable(replies) else list(replies)
+        self.calls = 0
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **request):
+        self.requests.append(request)
+        if callable(self.replies):
+            content = self.replies(request)
+        else:
+            content = self.replies[min(self.calls, len(self.replies) - 1)]
+        self.calls += 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture
+def scripted_client():
+    """Factory fixture: scripted_client(replies) -> ScriptedClient."""
+    return ScriptedClient
+
+
+# claim -> (verdict, importance) for the fake faithfulness judge
+JUDGMENTS: Dict[str, Tuple[str, float]] = {
+    "Paris is in France": ("supported", 1.0),
+    "Paris has 9 million people": ("partially_supported", 0.5),
+    "Paris is the capital of Spain": ("contradicted", 0.8),
+    "Paris hosted the 1900 Olympics": ("not_supported", 0.1),
+}
+
+
+def _quoted_after(prompt: str, label: str) -> str:
+    return prompt.split(f'{label}:\n"""', 1)[1].split('"""', 1)[0]
+
+
+def faithfulness_reply(request, batched=None) -> str:
+    """
+    Answers every faithfulness judge prompt from JUDGMENTS. `batched(claims)` may override
+    the reply to the one-call-per-group prompt (e.g. to drop or garble items).
+    """
+    prompt = request["messages"][0]["content"]
+    if "Extract all ATOMIC" in prompt:
+        return json.dumps({"claims": list(JUDGMENTS)})
+    if "For EACH numbered claim" in prompt:
+        block = prompt.split("Claims:\n", 1)[1].split("\n\nReturn ONLY", 1)[0]
+        claims = [re.sub(r"^\d+\. ", "", line) for line in block.splitlines() if line.strip()]
+        if batched is not None:
+            return batched(claims)
+        return json.dumps({"results": [
+            {"id": i, "verdict": JUDGMENTS[c][0], "evidence": None, "importance": JUDGMENTS[c][1]}
+            for i, c in enumerate(claims, 1)
+        ]})
+    if "how important a claim" in prompt:
+        return json.dumps({"importance": JUDGMENTS[_quoted_after(prompt, "Claim")][1]})
+    if "Classify the claim as" in prompt:
+        return json.dumps({"verdict": JUDGMENTS[_quoted_after(prompt, "Claim")][0], "evidence": None})
+    raise AssertionError(f"unexpected prompt: {prompt[:80]}")
+
+
+@pytest.fixture
+def judgments():
+    return JUDGMENTS
+
+
+@pytest.fixture
+def faithfulness_client():
+    """Factory fixture: faithfulness_client(batched=None) -> ScriptedClient answering from JUDGMENTS."""
+    return lambda batched=None: ScriptedClient(lambda request: faithfulness_reply(request, batched))
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from evals.stability.answer_variance import (
+    chunked_variance_from_embeddings,
+    compute_answer_variance,
+    compute_answer_variance_batch,
+    cosine_similarity,
+    variance_from_embeddings,
+)
+
+
+def _reference(embeddings):
+    """The original pairwise loop over cosine_similarity."""
+    n = len(embeddings)
+    sims = [cosine_similarity(embeddings[i], embeddings[j]) for i in range(n) for j in range(i + 1, n)]
+    return {
+        "mean_similarity": float(np.mean(sims)),
+        "variance": float(np.var(sims)),
+        "std_dev": float(np.std(sims)),
+        "worst_case_similarity": float(np.min(sims)),
+    }
+
+
+def _assert_stats_close(actual, expected, atol=1e-5):
+    assert set(actual) == set(expected)
+    for key in expected:
+        assert actual[key] == pytest.approx(expected[key], abs=atol), key
+
+
+def _embeddings(n, dim=24, seed=0):
+    rng = np.random.default_rng(seed)
+    emb = rng.normal(size=(n, dim)).astype(np.float32)
+    emb[1] = 0.0  # zero vector: similarity 0, like cosine_similarity
+    return emb
+
+
+@pytest.mark.parametrize("n", [2, 3, 17])
+def test_vectorized_variance_matches_pairwise_loop(n):
+    emb = _embeddings(n)
+    _assert_stats_close(variance_from_embeddings(emb)[0], _reference(emb))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64])
+def test_chunked_variance_matches_pairwise_loop(chunk_size):
+    emb = _embeddings(50, seed=1)
+    _assert_stats_close(chunked_variance_from_embeddings(emb, chunk_size=chunk_size), _reference(emb))
+
+
+def test_batch_matches_one_group_at_a_time():
+    vectors = {f"a{i}": v for i, v in enumerate(_embeddings(30, seed=2))}
+
+    def embed_fn(texts):
+        return np.stack([vectors[t] for t in texts])
+
+    groups = [[f"a{i}" for i in range(5)], [f"a{i}" for i in range(5, 8)], [f"a{i}" for i in range(8, 13)]]
+    batch = compute_answer_variance_batch(groups, embed_fn)
+    for answers, stats in zip(groups, batch):
+        _assert_stats_close(stats, compute_answer_variance(answers, embed_fn))
+        _assert_stats_close(stats, _reference(embed_fn(answers)))
+
+
+def test_fewer_than_two_answers_is_rejected():
+    with pytest.raises(ValueError):
+        compute_answer_variance(["only"], lambda texts: np.ones((len(texts), 3)))
@@ -0,0 +1,86 @@
+import json
+import os
+
+import pytest
+
+from evals.generation.bleu.bleu import bleu_score
+from evals.generation.rouge.rouge import rouge_batch
+from evals.retrieval.ndcg.ndcg import ndcg_at_k_single
+from evals.runners.batch_run.batch_run import read_jsonl, run_batch
+from scripts.run_eval_suite import main
+
+DATASET = os.path.join(os.path.dirname(__file__), "data", "eval_set.jsonl")
+IDS = ["q-001", "q-002", "q-003", "q-004", "q-005", 5, "q-007"]
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.fixture
+def samples():
+    return list(read_jsonl(DATASET))
+
+
+def test_records_without_an_id_get_their_line_index(samples):
+    assert [s["id"] for s in samples] == IDS
+
+
+def test_per_sample_and_mean_records_span_several_batches(tmp_path, samples):
+    out = str(tmp_path / "out.jsonl")
+    summary = run_batch(DATASET, out, ["rouge", "bleu", "ndcg"], batch_size=3, metric_kwargs={"ndcg": {"k": 3}})
+    records = _read(out)
+    assert summary["num_samples"] == len(IDS)
+
+    per_sample = {}
+    for r in records:
+        if r["group"] == "per_sample":
+            per_sample.setdefault(r["metric"], {})[r["sample_id"]] = r["score"]
+    assert set(per_sample) == {"rouge1", "rouge2", "rougeL", "bleu", "ndcg@3"}
+    assert all(list(scores) == IDS for scores in per_sample.values())
+
+    references = [s["reference"] for s in samples]
+    answers = [s["answer"] for s in samples]
+    assert list(per_sample["bleu"].values()) == pytest.approx(bleu_score(references, answers)["per_sample"])
+    rouge = rouge_batch(references, answers)["per_sample"]
+    for metric in ("rouge1", "rouge2", "rougeL"):
+        assert list(per_sample[metric].values()) == pytest.approx([s[metric] for s in rouge])
+    ndcg = [ndcg_at_k_single(s["retrieved_ids"], s["relevance"], 3) for s in samples]
+    assert list(per_sample["ndcg@3"].values()) == pytest.approx(ndcg)
+
+    means = {r["metric"]: r["score"] for r in records if r["group"] == "mean"}
+    assert records[-len(means):] == [r for r in records if r["group"] == "mean"]  # written last
+    assert means == summary["mean"]
+    for metric, scores in per_sample.items():
+        assert means[metric] == pytest.approx(sum(scores.values()) / len(scores))
+
+
+def test_batch_size_does_not_change_results(tmp_path):
+    outputs = []
+    for batch_size in (1, 3, 64):
+        out = str(tmp_path / f"out-{batch_size}.jsonl")
+        run_batch(DATASET, out, ["rouge", "bleu"], batch_size=batch_size)
+        outputs.append(_read(out))
+    key = lambda r: (r["group"], str(r["sample_id"]), r["metric"])
+    first = sorted(outputs[0], key=key)
+    for other in outputs[1:]:
+        other = sorted(other, key=key)
+        assert [key(r) for r in other] == [key(r) for r in first]
+        assert [r["score"] for r in other] == pytest.approx([r["score"] for r in first])
+
+
+def test_unknown_metric_and_bad_batch_size_are_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unknown metrics"):
+        run_batch(DATASET, str(tmp_path / "out.jsonl"), ["rouge", "meteor"])
+    with pytest.raises(ValueError, match="batch_size"):
+        run_batch(DATASET, str(tmp_path / "out.jsonl"), ["rouge"], batch_size=0)
+
+
+def test_cli_writes_records_and_prints_the_summary(tmp_path, capsys):
+    out = str(tmp_path / "out.jsonl")
+    main([DATASET, "--output", out, "--metrics", "ndcg", "--ndcg-k", "2", "--batch-size", "4"])
+    summary = json.loads(capsys.readouterr().out)
+    assert summary["num_samples"] == len(IDS)
+    assert set(summary["mean"]) == {"ndcg@2"}
+    assert len([r for r in _read(out) if r["group"] == "per_sample"]) == len(IDS)
@@ -0,0 +1,105 @@
+import json
+
+import pytest
+
+from evals.runners.batch_run import batch_run
+from evals.runners.batch_run.batch_run import CheckpointJournal, run_batch
+
+
+def _write_dataset(path, n):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            f.write(json.dumps({
+                "id": f"q-{i}",
+                "reference": "the cache index answers the query",
+                "answer": "the index answers the query" if i % 2 else "a cache answers",
+                "retrieved_ids": ["d1", "d2", "d3"],
+                "relevance": {"d2": 1, "d3": 2} if i % 3 else {"d1": 1},
+            }) + "\n")
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    path = tmp_path / "eval.jsonl"
+    _write_dataset(path, 10)
+    return str(path)
+
+
+def test_resume_after_crash_matches_an_uninterrupted_run(tmp_path, dataset, monkeypatch):
+    kwargs = {"ndcg": {"k": 2}}
+    expected = run_batch(dataset, str(tmp_path / "full.jsonl"), ["rouge", "ndcg"], 3, kwargs)
+
+    real_ndcg = batch_run.METRICS["ndcg"]
+    calls = []
+    crash_on = {"q-3"}
+
+    def crashing_ndcg(batch, **kw):
+        calls.append([r["id"] for r in batch])
+        if crash_on & {r["id"] for r in batch}:
+            crash_on.clear()
+            raise RuntimeError("worker died")
+        return real_ndcg(batch, **kw)
+
+    checkpoint = str(tmp_path / "ckpt.jsonl")
+    out = str(tmp_path / "out.jsonl")
+    monkeypatch.setitem(batch_run.METRICS, "ndcg", crashing_ndcg)
+    with pytest.raises(RuntimeError):
+        run_batch(dataset, out, ["rouge", "ndcg"], 3, kwargs, checkpoint_path=checkpoint)
+
+    calls.clear()
+    resumed = run_batch(dataset, out, ["rouge", "ndcg"], 3, kwargs, checkpoint_path=checkpoint)
+    # only the unfinished ndcg batches are redone
+    assert calls == [["q-3", "q-4", "q-5"], ["q-6", "q-7", "q-8"], ["q-9"]]
+    assert resumed["num_samples"] == 10
+    assert resumed["mean"] == pytest.approx(expected["mean"])
+    key = lambda r: (r["sample_id"], r["metric"])
+    per_sample = lambda path: sorted((r for r in _read(path) if r["group"] == "per_sample"), key=key)
+    assert per_sample(out) == per_sample(tmp_path / "full.jsonl")
+
+
+def test_torn_last_line_is_redone(tmp_path, dataset):
+    checkpoint = tmp_path / "ckpt.jsonl"
+    expected = run_batch(dataset, str(tmp_path / "a.jsonl"), ["rouge"], 4, checkpoint_path=str(checkpoint))
+
+    lines = checkpoint.read_text(encoding="utf-8").splitlines(keepends=True)
+    checkpoint.write_text("".join(lines[:-1]) + lines[-1][: len(lines[-1]) // 2], encoding="utf-8")
+    journal = CheckpointJournal(str(checkpoint))
+    assert not journal.is_done("q-9", "rouge") and journal.is_done("q-8", "rouge")
+    journal.close()
+
+    out = str(tmp_path / "b.jsonl")
+    assert run_batch(dataset, out, ["rouge"], 4, checkpoint_path=str(checkpoint)) == expected
+    rouge1 = [r["sample_id"] for r in _read(out) if r["metric"] == "rouge1" and r["group"] == "per_sample"]
+    assert sorted(rouge1) == [f"q-{i}" for i in range(10)]
+
+
+def test_changed_metric_config_is_refused(tmp_path, dataset):
+    checkpoint = str(tmp_path / "ckpt.jsonl")
+    out = str(tmp_path / "out.jsonl")
+    run_batch(dataset, out, ["ndcg"], 4, {"ndcg": {"k": 1}}, checkpoint_path=checkpoint)
+
+    with pytest.raises(ValueError, match="ndcg"):
+        run_batch(dataset, out, ["ndcg"], 4, {"ndcg": {"k": 5}}, checkpoint_path=checkpoint)
+    # the same settings still resume
+    assert "ndcg@1" in run_batch(dataset, out, ["ndcg"], 4, {"ndcg": {"k": 1}}, checkpoint_path=checkpoint)["mean"]
+
+
+def test_output_keeps_only_requested_metrics_and_current_ids(tmp_path, dataset):
+    checkpoint = str(tmp_path / "ckpt.jsonl")
+    run_batch(dataset, str(tmp_path / "first.jsonl"), ["ndcg", "bleu"], 4, checkpoint_path=checkpoint)
+
+    smaller = tmp_path / "smaller.jsonl"
+    _write_dataset(smaller, 6)
+    out = str(tmp_path / "out.jsonl")
+    result = run_batch(str(smaller), out, ["bleu"], 4, checkpoint_path=checkpoint)
+
+    assert set(result["mean"]) == {"bleu"}
+    per_sample = [r for r in _read(out) if r["group"] == "per_sample"]
+    assert {r["metric"] for r in per_sample} == {"bleu"}
+    assert sorted(r["sample_id"] for r in per_sample) == sorted(f"q-{i}" for i in range(6))
+    assert result["mean"] == run_batch(str(smaller), str(tmp_path / "fresh.jsonl"), ["bleu"], 4)["mean"]
@@ -0,0 +1,69 @@
+import math
+import warnings
+
+import pytest
+
+nltk_bleu = pytest.importorskip("nltk.translate.bleu_score")
+
+from evals.generation.bleu.benchmark import make_pairs
+from evals.generation.bleu.bleu import bleu_score, corpus_bleu_score, native_bleu_score
+
+SMOOTH = nltk_bleu.SmoothingFunction().method1
+
+EDGE_CASES = [
+    ("the cat sat on the mat", "the cat sat on the mat"),       # identical
+    ("the cat sat on the mat", "a dog ran in a park"),          # no overlap
+    ("the cat sat on the mat", ""),                             # empty hypothesis
+    ("", "the cat"),                                            # empty reference
+    ("", ""),
+    ("the cat sat on the mat today", "the cat"),                # short: brevity penalty
+    ("the cat", "the cat sat on the mat"),                      # hypothesis longer than reference
+    ("the cat sat", "the cat sat"),                             # shorter than 4-grams
+    ("a a a a b", "a a a a a a"),                               # clipped counts
+    ("retrieval context answer", "context answer retrieval"),
+]
+
+
+def _nltk_sentence(ref, hyp):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return nltk_bleu.sentence_bleu([ref.split()], hyp.split(), smoothing_function=SMOOTH)
+
+
+def _nltk_corpus(refs, hyps):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return nltk_bleu.corpus_bleu(
+            [[r.split()] for r in refs], [h.split() for h in hyps], smoothing_function=SMOOTH
+        )
+
+
+@pytest.mark.parametrize("ref,hyp", EDGE_CASES)
+def test_sentence_bleu_matches_nltk(ref, hyp):
+    native = native_bleu_score([ref], [hyp])["per_sample"][0]
+    assert math.isclose(native, _nltk_sentence(ref, hyp), rel_tol=1e-12, abs_tol=1e-15)
+
+
+def test_engines_agree_on_random_pairs():
+    references, candidates = make_pairs(2000, seed=3)
+    nltk_result = bleu_score(references, candidates, engine="nltk")
+    native_result = bleu_score(references, candidates, engine="native")
+    for a, b in zip(nltk_result["per_sample"], native_result["per_sample"]):
+        assert math.isclose(a, b, rel_tol=1e-12, abs_tol=1e-15)
+    assert math.isclose(nltk_result["mean_bleu"], native_result["mean_bleu"], rel_tol=1e-12)
+
+
+def test_corpus_bleu_matches_nltk():
+    references, candidates = make_pairs(2000, seed=4)
+    references += [r for r, _ in EDGE_CASES]
+    candidates += [h for _, h in EDGE_CASES]
+    assert math.isclose(corpus_bleu_score(references, candidates), _nltk_corpus(references, candidates),
+                        rel_tol=1e-12)
+
+
+def test_corpus_brevity_penalty_matches_nltk():
+    references = ["the cat sat on the mat today", "a quick brown fox jumps over the dog"]
+    candidates = ["the cat sat", "a quick brown fox"]
+    native = corpus_bleu_score(references, candidates)
+    assert native < native_bleu_score(references, references)["corpus_bleu"]
+    assert math.isclose(native, _nltk_corpus(references, candidates), rel_tol=1e-12)
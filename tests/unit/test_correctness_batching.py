@@ -0,0 +1,42 @@
+import pytest
+
+from evals.judges.executor import JudgeExecutor
+from evals.semantic.correctness.correctness import correctness_dataset, judge_with_resplit
+
+PAIRS = [(f"q{i}", f"a{i}") for i in range(10)]
+
+
+class FlakyJudge:
+    """Scores pairs by index; drops a result for batches over 4 and cannot parse 'q7'."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, qa_pairs, client, model):
+        self.batches.append(len(qa_pairs))
+        if any(q == "q7" for q, _ in qa_pairs):
+            raise ValueError("Invalid JSON from LLM")
+        scores = [int(q[1:]) / 10 for q, _ in qa_pairs]
+        return scores[:-1] if len(qa_pairs) > 4 else scores
+
+
+def test_failing_batches_are_split_until_they_parse():
+    judge = FlakyJudge()
+    scores = judge_with_resplit(PAIRS[:7], judge, None, "m")
+    assert scores == [i / 10 for i in range(7)]
+    assert judge.batches[0] == 7 and max(judge.batches[1:]) <= 4
+
+
+def test_permanently_bad_pair_raises_by_default():
+    with pytest.raises(ValueError):
+        judge_with_resplit(PAIRS, FlakyJudge(), None, "m")
+
+
+def test_permanently_bad_pair_is_skipped_in_dataset_runs():
+    executor = JudgeExecutor(max_workers=2, retry_on=(ConnectionError,))
+    scores = correctness_dataset(PAIRS, None, judge_fn=FlakyJudge(), max_batch_size=5, executor=executor)
+    assert scores == [i / 10 if i != 7 else None for i in range(10)]
+
+    with pytest.raises(ValueError):
+        correctness_dataset(PAIRS, None, judge_fn=FlakyJudge(), max_batch_size=5, executor=executor,
+                            on_error="raise")
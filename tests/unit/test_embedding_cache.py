@@ -0,0 +1,93 @@
+import hashlib
+
+import numpy as np
+import pytest
+
+from src.core.embeddings.cache import CachedEmbedder, embedding_cache_key
+
+
+class HashEmbedder:
+    """Deterministic text -> vector, recording every batch it is asked to embed."""
+
+    def __init__(self, dim=8):
+        self.dim = dim
+        self.batches = []
+
+    def embed(self, texts):
+        self.batches.append(list(texts))
+        rows = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+            rows.append(np.random.default_rng(seed).normal(size=self.dim))
+        return rows
+
+
+@pytest.fixture
+def embedder():
+    return HashEmbedder()
+
+
+def test_duplicates_in_a_batch_are_embedded_once(embedder):
+    cached = CachedEmbedder(embedder, model="m", path=None)
+    vectors = cached.embed(["a  b", "c", "a b", " a b ", "c"])
+    assert embedder.batches == [["a  b", "c"]]  # whitespace variants normalize to one key
+    assert vectors.shape == (5, 8) and vectors.dtype == np.float32
+    np.testing.assert_array_equal(vectors[0], vectors[2])
+    np.testing.assert_array_equal(vectors[1], vectors[4])
+    assert cached.stats()["misses"] == 2
+
+
+def test_memory_and_disk_hits_are_counted_separately(tmp_path, embedder):
+    path = str(tmp_path / "emb.sqlite")
+    first = CachedEmbedder(embedder, model="m", path=path)
+    first.embed(["x", "y"])
+    first.embed(["x", "z"])
+    assert first.stats() == {
+        "memory_hits": 1, "disk_hits": 0, "misses": 3, "memory_entries": 3, "disk_entries": 3,
+    }
+    first.close()
+
+    # a new process: empty memory tier, same SQLite file
+    second = CachedEmbedder(embedder, model="m", path=path)
+    second.embed(["x", "y", "w"])
+    second.embed(["x"])
+    stats = second.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 2, 1)
+    assert embedder.batches[-1] == ["w"]
+
+
+def test_cache_key_depends_on_the_model(tmp_path, embedder):
+    assert embedding_cache_key("m1", "text") != embedding_cache_key("m2", "text")
+    assert embedding_cache_key("m1", " text\n") == embedding_cache_key("m1", "text")
+
+    path = str(tmp_path / "emb.sqlite")
+    CachedEmbedder(embedder, model="m1", path=path).embed(["text"])
+    other = CachedEmbedder(embedder, model="m2", path=path)
+    other.embed(["text"])
+    assert other.stats()["misses"] == 1 and len(embedder.batches) == 2
+
+
+def test_hits_return_the_same_vector_as_a_fresh_embedding(tmp_path, embedder):
+    path = str(tmp_path / "emb.sqlite")
+    fresh = CachedEmbedder(embedder, model="m", path=path).embed(["p", "q"])
+    memory_hit = CachedEmbedder(embedder, model="m", path=path, max_memory_items=10)
+    disk = memory_hit.embed(["p", "q"])
+    memory = memory_hit.embed(["q", "p"])
+    np.testing.assert_array_equal(disk, fresh)
+    np.testing.assert_array_equal(memory, fresh[::-1])
+    # float32 rounded through float16, whatever tier served it
+    np.testing.assert_array_equal(fresh, fresh.astype(np.float16).astype(np.float32))
+
+
+def test_batch_size_splits_embedder_calls(embedder):
+    cached = CachedEmbedder(embedder, model="m", path=None, batch_size=2)
+    assert cached.embed([f"t{i}" for i in range(5)]).shape == (5, 8)
+    assert [len(b) for b in embedder.batches] == [2, 2, 1]
+
+
+@pytest.mark.parametrize("rows", [1, 3])
+def test_wrong_row_count_from_the_embedder_is_rejected(rows):
+    cached = CachedEmbedder(lambda texts: np.ones((rows, 4)), model="m", path=None)
+    with pytest.raises(ValueError, match="for 2 texts"):
+        cached.embed(["a", "b"])
+    assert cached.stats()["memory_entries"] == 0
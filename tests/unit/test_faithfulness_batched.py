@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from evals.semantic.faithfulness.faithfulness import (
+    BATCH_VERIFY_TEMPLATE,
+    evaluate_faithfulness,
+    evaluate_faithfulness_batched,
+    pack_claims,
+    verify_and_score_claims_batch,
+)
+from src.utils.token_counter import count_tokens
+
+CONTEXT = "Paris is the capital and largest city of France. " * 20
+QUESTION = "What do we know about Paris?"
+
+
+@pytest.fixture
+def claims(judgments):
+    return list(judgments)
+
+
+def _prompt_tokens(group):
+    numbered = "\n".join(f"{i}. {c}" for i, c in enumerate(group, 1))
+    return count_tokens(BATCH_VERIFY_TEMPLATE.format(question=QUESTION, context=CONTEXT, claims=numbered))
+
+
+def test_pack_claims_respects_the_budget_and_keeps_order(claims):
+    base = _prompt_tokens([])
+    budget = base + 2 * max(count_tokens(f"1. {c}\n") for c in claims)
+    groups = pack_claims(claims, CONTEXT, QUESTION, max_prompt_tokens=budget)
+    assert len(groups) > 1
+    assert [c for g in groups for c in g] == claims
+    assert all(g and _prompt_tokens(g) <= budget for g in groups)
+
+    assert pack_claims(claims, CONTEXT, QUESTION, max_prompt_tokens=10**6) == [claims]
+    assert pack_claims([], CONTEXT, QUESTION) == []
+
+
+def test_pack_claims_gives_every_claim_a_group_when_the_context_is_over_budget(claims):
+    assert pack_claims(claims, CONTEXT, QUESTION, max_prompt_tokens=1) == [[c] for c in claims]
+
+
+def test_batched_matches_per_claim_evaluation(faithfulness_client):
+    expected = evaluate_faithfulness("an answer", CONTEXT, QUESTION, faithfulness_client())
+    client = faithfulness_client()
+    assert evaluate_faithfulness_batched("an answer", CONTEXT, QUESTION, client) == expected
+    assert client.calls == 2  # extraction + one batched call
+
+
+def test_missing_and_malformed_items_fall_back_per_claim(faithfulness_client, judgments):
+    def partial(group):
+        verdict, importance = judgments[group[0]]
+        return json.dumps({"results": [
+            {"id": 1, "verdict": verdict, "evidence": None, "importance": importance},
+            {"id": 2, "verdict": "maybe", "importance": 0.5},        # unknown verdict
+            {"id": 3, "verdict": "supported", "importance": "high"},  # bad importance
+            # claim 4 missing
+        ]})
+
+    expected = evaluate_faithfulness("an answer", CONTEXT, QUESTION, faithfulness_client())
+    client = faithfulness_client(batched=partial)
+    assert evaluate_faithfulness_batched("an answer", CONTEXT, QUESTION, client) == expected
+    assert client.calls == 2 + 2 * 3  # three claims each redo verify + importance
+
+
+@pytest.mark.parametrize("reply", [None, "not json", '["a list"]', '{"results": "nope"}'])
+def test_unparseable_batch_reply_falls_back_for_every_claim(reply, faithfulness_client, claims):
+    client = faithfulness_client(batched=lambda group: reply)
+    assert verify_and_score_claims_batch(claims, CONTEXT, QUESTION, client) == [None] * len(claims)
+
+    expected = evaluate_faithfulness("an answer", CONTEXT, QUESTION, faithfulness_client())
+    assert evaluate_faithfulness_batched("an answer", CONTEXT, QUESTION, client) == expected
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from evals.regression.layer1_engine.incremental import run_incremental_regression_eval
+from evals.regression.layer1_engine.run import run_batch_regression_eval
+from src.core.embeddings.store import EmbeddingStore
+
+@pytest.fixture
+def golden_set(regression_inputs):
+    def make(seed=0):
+        d = regression_inputs(n=60, seed=seed)
+        return d.ids, d.baseline_answers, d.new_answers, d.contexts, d.base, d.new, d.ctx
+
+    return make
+
+
+def _assert_matches_full(incremental, full):
+    summary = {k: v for k, v in incremental["summary"].items() if k != "num_recomputed"}
+    assert summary == full["summary"]
+    samples = [{k: v for k, v in s.items() if k != "sample_id"} for s in incremental["samples"]]
+    assert samples == full["samples"]
+
+
+def test_incremental_runs_match_full_runs(tmp_path, golden_set):
+    ids, baseline, answers, contexts, base, new, ctx = golden_set()
+    state = str(tmp_path / "state.json")
+
+    first = run_incremental_regression_eval(ids, baseline, answers, contexts, base, new, ctx, state)
+    _assert_matches_full(first, run_batch_regression_eval(baseline, answers, contexts, base, new, ctx))
+    assert first["summary"]["num_recomputed"] == len(ids)
+
+    # change a few answers (and their embeddings), then rerun
+    answers = list(answers)
+    new = new.copy()
+    for i in (2, 17, 40):
+        answers[i] = "completely different wording"
+        new[i] = -base[i]
+    second = run_incremental_regression_eval(ids, baseline, answers, contexts, base, new, ctx, state)
+    assert second["summary"]["num_recomputed"] == 3
+    _assert_matches_full(second, run_batch_regression_eval(baseline, answers, contexts, base, new, ctx))
+
+    unchanged = run_incremental_regression_eval(ids, baseline, answers, contexts, base, new, ctx, state)
+    assert unchanged["summary"]["num_recomputed"] == 0
+    _assert_matches_full(unchanged, run_batch_regression_eval(baseline, answers, contexts, base, new, ctx))
+
+
+def test_dropped_samples_and_new_thresholds_match_full_runs(tmp_path, golden_set):
+    ids, baseline, answers, contexts, base, new, ctx = golden_set(seed=1)
+    state = str(tmp_path / "state.json")
+    run_incremental_regression_eval(ids, baseline, answers, contexts, base, new, ctx, state)
+
+    keep = [i for i in range(len(ids)) if i % 4]
+    subset = lambda xs: [xs[i] for i in keep]
+    thresholds = {"semantic": 0.1, "coverage": 0.5, "grounding": 0.1}
+    result = run_incremental_regression_eval(
+        subset(ids), subset(baseline), subset(answers), subset(contexts),
+        base[keep], new[keep], ctx[keep], state, thresholds=thresholds,
+    )
+    assert result["summary"]["num_recomputed"] == 0
+    full = run_batch_regression_eval(
+        subset(baseline), subset(answers), subset(contexts), base[keep], new[keep], ctx[keep],
+        thresholds=thresholds,
+    )
+    # means come from running totals, so allow float drift in the last rounded digit
+    for key in ("mean_semantic_drift", "mean_coverage_drift", "mean_grounding_drift"):
+        assert result["summary"][key] == pytest.approx(full["summary"][key], abs=1e-3)
+    assert result["summary"]["num_failures"] == full["summary"]["num_failures"]
+    assert [s["regression"] for s in result["samples"]] == [s["regression"] for s in full["samples"]]
+
+
+def test_store_inputs_are_read_by_sample_id(tmp_path, golden_set):
+    ids, baseline, answers, contexts, base, new, ctx = golden_set(seed=2)
+    order = np.random.default_rng(3).permutation(len(ids))
+    shuffled_ids = [ids[i] for i in order]
+    new_store = EmbeddingStore.build(str(tmp_path / "new"), shuffled_ids, new[order], dtype="float32")
+    result = run_incremental_regression_eval(
+        ids, baseline, answers, contexts, base, new_store, ctx, str(tmp_path / "state.json")
+    )
+    _assert_matches_full(result, run_batch_regression_eval(baseline, answers, contexts, base, new, ctx))
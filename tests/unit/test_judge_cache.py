@@ -0,0 +1,76 @@
+import pytest
+
+from evals.judges.executor import JudgeExecutor
+from evals.semantic.faithfulness.faithfulness import extract_claims
+from evals.utils.caching.caching import (
+    JudgeCache,
+    cached_chat_completion,
+    make_cache_key,
+    require_json,
+    set_default_cache,
+)
+
+
+REQUEST = {"model": "m", "messages": [{"role": "user", "content": "judge this"}], "temperature": 0}
+
+
+def test_replies_are_cached_only_after_they_validate(scripted_client):
+    cache = JudgeCache(":memory:")
+    client = scripted_client(["not json", '{"results": [true]}'])
+
+    bad = cached_chat_completion(client, cache=cache, validate=require_json("results"), **REQUEST)
+    assert bad.choices[0].message.content == "not json"
+    assert cache.stats()["entries"] == 0
+
+    good = cached_chat_completion(client, cache=cache, validate=require_json("results"), **REQUEST)
+    assert good.choices[0].message.content == '{"results": [true]}'
+    again = cached_chat_completion(client, cache=cache, validate=require_json("results"), **REQUEST)
+    assert again.choices[0].message.content == '{"results": [true]}'
+    assert client.calls == 2
+
+
+def test_invalid_cached_entry_is_dropped_and_refetched(scripted_client):
+    cache = JudgeCache(":memory:")
+    params = {k: v for k, v in REQUEST.items() if k not in ("model", "messages")}
+    cache.set(make_cache_key(REQUEST["model"], REQUEST["messages"], **params), '{"scores": ')
+    client = scripted_client(['{"scores": [0.5]}'])
+
+    response = cached_chat_completion(client, cache=cache, validate=require_json("scores"), **REQUEST)
+    assert response.choices[0].message.content == '{"scores": [0.5]}'
+    assert client.calls == 1
+
+
+def test_executor_retries_reach_the_client_after_a_malformed_reply(scripted_client):
+    cache = JudgeCache(":memory:")
+    client = scripted_client(["Sure! Here are the claims:", '{"claims": ["a", "b"]}'])
+    executor = JudgeExecutor(max_workers=1, backoff_base=0.0, retry_on=(ValueError,))
+
+    set_default_cache(cache)
+    try:
+        claims = executor.run([(extract_claims, ("an answer", client))])[0]
+    finally:
+        set_default_cache(None)
+    assert claims == ["a", "b"]
+    assert client.calls == 2
+
+
+@pytest.mark.parametrize("content", ['["results"]', '"results"', "null", '{"scores": []}', "{bad", None])
+def test_require_json_rejects_non_objects_and_missing_keys(content):
+    with pytest.raises((ValueError, KeyError, TypeError)):
+        require_json("results")(content)
+
+
+def test_require_json_returns_the_object():
+    assert require_json("results")('{"results": [], "extra": 1}') == {"results": [], "extra": 1}
+    assert require_json()("{}") == {}
+    with pytest.raises(ValueError, match="JSON object"):
+        require_json()("[1, 2]")
+
+
+def test_non_object_reply_is_not_cached(scripted_client):
+    cache = JudgeCache(":memory:")
+    client = scripted_client(['["a", "b"]', '{"claims": ["a"]}'])
+    cached_chat_completion(client, cache=cache, validate=require_json(), **REQUEST)
+    assert cache.stats()["entries"] == 0
+    cached_chat_completion(client, cache=cache, validate=require_json(), **REQUEST)
+    assert cache.stats()["entries"] == 1
@@ -0,0 +1,135 @@
+import threading
+
+import pytest
+
+from evals.judges import executor as executor_module
+from evals.judges.executor import JudgeExecutor, TokenBucket, call_with_retry
+from evals.semantic.faithfulness.faithfulness import (
+    evaluate_faithfulness,
+    evaluate_faithfulness_concurrent,
+)
+
+
+class FakeClock:
+    """time.monotonic / time.sleep stand-in: sleeping just advances the clock."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+        self._lock = threading.Lock()
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        with self._lock:
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(executor_module, "time", fake)
+    # full jitter draws from [0, delay]; take the top so delays are exact
+    monkeypatch.setattr(executor_module.random, "uniform", lambda lo, hi: hi)
+    return fake
+
+
+def test_token_bucket_allows_a_burst_then_paces_at_the_rate(clock):
+    bucket = TokenBucket(rate=4, capacity=2)
+    for _ in range(6):
+        bucket.acquire()
+    assert clock.now == pytest.approx(1.0)  # 2 free, then 4 x 0.25s
+    assert all(s == pytest.approx(0.25) for s in clock.sleeps)
+
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def _flaky(failures, exc=ConnectionError):
+    calls = []
+
+    def fn(x):
+        calls.append(x)
+        if len(calls) <= failures:
+            raise exc("transient")
+        return x * 2
+
+    return fn, calls
+
+
+def test_retry_backs_off_exponentially_up_to_the_cap(clock):
+    fn, calls = _flaky(4)
+    assert call_with_retry(fn, 21, max_retries=4, backoff_base=0.5, backoff_max=2.0) == 42
+    assert len(calls) == 5
+    assert clock.sleeps == [0.5, 1.0, 2.0, 2.0]
+
+
+def test_retry_gives_up_after_max_retries(clock):
+    fn, calls = _flaky(10, TimeoutError)
+    with pytest.raises(TimeoutError):
+        call_with_retry(fn, 1, max_retries=2)
+    assert len(calls) == 3
+
+
+def test_only_transient_errors_are_retried_by_default(clock):
+    fn, calls = _flaky(1, ValueError)
+    with pytest.raises(ValueError):
+        call_with_retry(fn, 1)
+    assert len(calls) == 1 and clock.sleeps == []
+
+    fn, calls = _flaky(1, ValueError)
+    assert call_with_retry(fn, 1, retry_on=(ValueError,)) == 2
+
+
+def test_every_attempt_takes_a_rate_limit_token(clock):
+    acquired = []
+
+    class CountingBucket:
+        def acquire(self):
+            acquired.append(clock.now)
+
+    fn, _ = _flaky(2)
+    call_with_retry(fn, 1, backoff_base=0.0, rate_limiter=CountingBucket())
+    assert len(acquired) == 3
+
+
+def test_executor_keeps_submission_order_and_retries(clock):
+    executor = JudgeExecutor(max_workers=4, backoff_base=0.0)
+    flaky = [_flaky(i % 3)[0] for i in range(20)]
+    assert executor.run([(fn, (i,)) for i, fn in enumerate(flaky)]) == [2 * i for i in range(20)]
+    assert list(executor.imap(((fn, (i,)) for i, fn in enumerate(flaky)), max_in_flight=3)) == [
+        2 * i for i in range(20)
+    ]
+
+
+def test_concurrent_faithfulness_matches_serial(faithfulness_client):
+    expected = evaluate_faithfulness("an answer", "context", "question", faithfulness_client())
+    actual = evaluate_faithfulness_concurrent("an answer", "context", "question", faithfulness_client())
+    assert actual == expected
+    assert [c.claim for c in actual.claims] == [c.claim for c in expected.claims]
+
+
+def test_concurrent_faithfulness_survives_dropped_connections(faithfulness_client):
+    expected = evaluate_faithfulness("an answer", "context", "question", faithfulness_client())
+    client = faithfulness_client()
+    create = client.chat.completions.create
+    dropped = []
+    lock = threading.Lock()
+
+    def unreliable(**request):
+        with lock:
+            drop = len(dropped) < 3
+            if drop:
+                dropped.append(request)
+        if drop:
+            raise ConnectionError("reset by peer")
+        return create(**request)
+
+    client.chat.completions.create = unreliable
+    executor = JudgeExecutor(max_workers=4, requests_per_second=200, burst=2, backoff_base=0.0)
+    assert evaluate_faithfulness_concurrent(
+        "an answer", "context", "question", client, executor=executor
+    ) == expected
+    assert len(dropped) == 3
@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from evals.latency.benchmark import percentile
+from evals.latency.sketch import LatencyRecorder, QuantileSketch, check_accuracy, merge_recorders
+
+
+def test_check_accuracy_holds_on_a_small_run(capsys):
+    # the full 1M-value run is `python -m evals.latency.sketch`; this is the same check, smaller
+    check_accuracy(num_values=20_000, relative_accuracy=0.01, seed=1)
+    assert "heavy_tail" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("relative_accuracy", [0.01, 0.05])
+def test_rank_quantiles_stay_within_the_relative_error(relative_accuracy):
+    rng = random.Random(0)
+    values = sorted(rng.lognormvariate(5, 1) for _ in range(5000))
+    sketch = QuantileSketch(relative_accuracy)
+    for v in values:
+        sketch.add(v)
+    for q in (0.1, 0.5, 0.9, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert sketch.quantile(q) == pytest.approx(exact, rel=relative_accuracy)
+    assert sketch.quantile(0) == values[0] and sketch.quantile(1) == values[-1]
+    assert sketch.mean == pytest.approx(sum(values) / len(values))
+
+
+def test_merged_snapshots_equal_one_sketch():
+    rng = random.Random(2)
+    values = [rng.expovariate(0.01) for _ in range(3000)] + [0.0] * 10
+    whole = QuantileSketch()
+    parts = [QuantileSketch() for _ in range(3)]
+    for i, v in enumerate(values):
+        whole.add(v)
+        parts[i % 3].add(v)
+    merged = QuantileSketch.from_dict(parts[0].to_dict())
+    for part in parts[1:]:
+        merged.merge(QuantileSketch.from_dict(part.to_dict()))
+    assert merged.counts == whole.counts and merged.zero_count == whole.zero_count == 10
+    for p in (50, 95, 99, 99.9):
+        assert merged.percentile(p) == whole.percentile(p)
+
+    with pytest.raises(ValueError):
+        merged.merge(QuantileSketch(0.02))
+
+
+def test_max_buckets_keeps_the_tail():
+    sketch = QuantileSketch(0.01, max_buckets=50)
+    values = [1.0 * 1.05 ** i for i in range(400)]
+    for v in values:
+        sketch.add(v)
+    assert len(sketch.counts) <= 50
+    assert sketch.percentile(99) == pytest.approx(percentile(values, 99), rel=0.05)
+
+
+def test_recorders_merge_per_stage():
+    a, b = LatencyRecorder(), LatencyRecorder()
+    a.record_all({"retrieval": 100.0, "total": 400.0})
+    b.record_all({"retrieval": 300.0, "llm_inference": 900.0})
+    report = merge_recorders([a, LatencyRecorder.from_dict(b.to_dict())]).report()
+    assert set(report) == {"retrieval", "total", "llm_inference"}
+    assert report["retrieval"]["count"] == 2 and report["retrieval"]["mean_ms"] == 200.0
+    assert a.report()["retrieval"]["count"] == 1  # inputs are not modified
@@ -0,0 +1,34 @@
+import pytest
+
+pytest.importorskip("rouge_score")
+pytest.importorskip("nltk")
+
+from evals.generation.bleu.benchmark import make_pairs
+from evals.generation.bleu.bleu import bleu_score
+from evals.generation.rouge.rouge import rouge_batch
+
+
+@pytest.fixture(scope="module")
+def pairs():
+    references, candidates = make_pairs(300, seed=5)
+    return references, candidates
+
+
+def test_parallel_rouge_matches_serial(pairs):
+    references, candidates = pairs
+    serial = rouge_batch(references, candidates)
+    parallel = rouge_batch(references, candidates, n_jobs=2, min_parallel_size=10)
+    assert parallel == serial
+
+
+def test_parallel_bleu_matches_serial(pairs):
+    references, candidates = pairs
+    serial = bleu_score(references, candidates)
+    parallel = bleu_score(references, candidates, n_jobs=2, min_parallel_size=10)
+    assert parallel == serial
+
+
+def test_small_inputs_stay_serial_and_empty_inputs_are_zero():
+    assert rouge_batch(["a b c"], ["a b c"], n_jobs=2)["mean"]["rougeL"] == 1.0
+    assert rouge_batch([], [])["mean"] == {"rouge1": 0.0, "rouge2": 0.0, "rougeL": 0.0}
+    assert bleu_score([], [], n_jobs=2) == {"mean_bleu": 0.0, "per_sample": []}
@@ -0,0 +1,41 @@
+import math
+
+import pytest
+
+from evals.latency.load_test import arrival_times, constant_load, ramp_load, step_load
+
+
+def test_constant_rate_arrivals_are_evenly_spaced():
+    times = arrival_times(constant_load(10, 5))
+    assert len(times) == 49  # n / 10 < 5 for n = 1..49
+    assert times == pytest.approx([n / 10 for n in range(1, 50)])
+
+
+def test_linear_ramp_matches_the_expected_count():
+    times = arrival_times(ramp_load(0, 10, 10))
+    assert len(times) == 49  # L(10) = 10 * 10 / 2 = 50 expected arrivals
+    assert times == sorted(times)
+    # the rate grows, so gaps shrink; L(t) = t^2 / 2 reaches n at sqrt(2n)
+    assert times == pytest.approx([math.sqrt(2 * n) for n in range(1, 50)])
+    assert len(arrival_times(ramp_load(10, 0, 10))) == 49
+
+
+def test_stages_are_offset_and_empty_stages_only_take_time():
+    times = arrival_times(step_load([2, 0, 4], step_s=2))
+    assert times == pytest.approx([0.5, 1.0, 1.5, 4.25, 4.5, 4.75, 5.0, 5.25, 5.5, 5.75])
+    assert arrival_times([(5, 5, 0)]) == []
+
+
+def test_poisson_arrivals_are_seeded():
+    stages = ramp_load(5, 50, 20, hold_s=20)
+    first = arrival_times(stages, seed=7, poisson=True)
+    assert first == arrival_times(stages, seed=7, poisson=True)
+    assert first != arrival_times(stages, seed=8, poisson=True)
+    assert first == sorted(first) and 0 < first[0] and first[-1] < 40
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_poisson_count_is_close_to_the_expected_count(seed):
+    expected = 100 * 30  # 100 rps for 30 s
+    count = len(arrival_times(constant_load(100, 30), seed=seed, poisson=True))
+    assert abs(count - expected) < 4 * math.sqrt(expected)
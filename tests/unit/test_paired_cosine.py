@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from evals.regression.layer1_engine.grounding import batch_grounding_drift
+from evals.regression.layer1_engine.similiarity import batch_semantic_drift, paired_cosine_similarity
+
+
+@pytest.fixture
+def pairs(regression_inputs):
+    data = regression_inputs(n=257, dim=12, new_scale=1.0, ctx_scale=1.0)
+    a, b, c = data.base.copy(), data.new.copy(), data.ctx
+    a[3] = 0.0
+    b[5] = 0.0
+    return a, b, c
+
+
+def _diagonal_reference(a, b):
+    """The old kernel: full sklearn N x N matrix, then its diagonal."""
+    sklearn_pairwise = pytest.importorskip("sklearn.metrics.pairwise")
+    return np.diag(sklearn_pairwise.cosine_similarity(a, b))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 16, 100, 65536])
+def test_paired_cosine_matches_full_matrix_diagonal(chunk_size, pairs):
+    a, b, _ = pairs
+    expected = _diagonal_reference(a, b)
+    actual = paired_cosine_similarity(a, b, chunk_size)
+    assert actual.dtype == np.float32
+    np.testing.assert_allclose(actual, expected, atol=1e-6)
+    assert actual[3] == 0.0 and actual[5] == 0.0
+
+
+def test_memory_mapped_and_list_inputs_agree(tmp_path, pairs):
+    a, b, _ = pairs
+    np.save(tmp_path / "a.npy", a)
+    expected = paired_cosine_similarity(a, b)
+    actual = paired_cosine_similarity(str(tmp_path / "a.npy"), b.tolist(), chunk_size=50)
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_drifts_match_the_matrix_formulation(pairs):
+    a, b, c = pairs
+    np.testing.assert_allclose(batch_semantic_drift(a, b), 1 - _diagonal_reference(a, b), atol=1e-6)
+    expected_grounding = np.maximum(0.0, _diagonal_reference(a, c) - _diagonal_reference(b, c))
+    np.testing.assert_allclose(batch_grounding_drift(a, b, c), expected_grounding, atol=1e-6)
+
+
+def test_shape_mismatch_is_rejected(pairs):
+    a, b, _ = pairs
+    with pytest.raises(ValueError):
+        paired_cosine_similarity(a, b[:-1])
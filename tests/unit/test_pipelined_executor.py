@@ -0,0 +1,53 @@
+import threading
+import time
+
+from src.rag.pipeline import PipelinedExecutor, Stage
+
+
+def _double(state):
+    state["answer"] = state["query"] * 2
+
+
+def _fail_on_three(state):
+    if state["query"] == 3:
+        raise RuntimeError("boom")
+
+
+def test_results_come_back_in_input_order_with_errors_marked():
+    stages = [Stage("check", _fail_on_three, workers=3, queue_size=2), Stage("double", _double, workers=4, queue_size=2)]
+    results = PipelinedExecutor(stages).map(range(20))
+    assert [r["answer"] for r in results] == [i * 2 if i != 3 else None for i in range(20)]
+    assert results[3]["error"] == "check: RuntimeError: boom"
+    assert set(results[0]["latency_ms"]) == {"check", "double", "total"}
+
+
+def test_stalled_head_does_not_grow_the_reorder_buffer():
+    release = threading.Event()
+    submitted = []
+
+    def stall_first(state):
+        submitted.append(state["query"])
+        if state["query"] == 0:
+            release.wait(5)
+
+    executor = PipelinedExecutor([Stage("stall", stall_first, workers=4, queue_size=4)], max_in_flight=16)
+    results = executor.imap(range(10_000))
+    threading.Timer(0.3, release.set).start()
+    first = next(results)
+    assert first["latency_ms"]["stall"] >= 250
+    # while request 0 was stuck, only max_in_flight requests were admitted
+    assert len(submitted) <= 16
+    assert sum(1 for _ in results) == 9_999
+
+
+def test_closing_early_stops_every_thread():
+    before = threading.active_count()
+    executor = PipelinedExecutor([Stage("a", _double, workers=3, queue_size=2), Stage("b", _double, workers=3, queue_size=2)])
+    results = executor.imap(iter(range(100_000)))
+    for _ in range(5):
+        next(results)
+    results.close()
+    deadline = time.time() + 2
+    while threading.active_count() > before and time.time() < deadline:
+        time.sleep(0.01)
+    assert threading.active_count() == before
@@ -0,0 +1,74 @@
+import random
+import threading
+from collections import Counter
+
+import pytest
+
+from evals.stability.prompt_stability import (
+    PerturbationType,
+    PromptPerturbationGenerator,
+    PromptStabilityEvaluator,
+)
+
+PROMPTS = ["What is retrieval augmented generation?", "Define nDCG.", "What is retrieval augmented generation?"]
+
+
+def _agreement(outputs):
+    """Share of outputs identical to the most common one (a stand-in for answer variance)."""
+    return {"mean_similarity": Counter(outputs).most_common(1)[0][1] / len(outputs)}
+
+
+class CountingModel:
+    def __init__(self):
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt):
+        with self._lock:
+            self.calls[prompt] += 1
+        return "informal" if prompt.startswith("Hey") else "formal"
+
+
+def test_each_unique_variant_is_sent_to_the_model_once():
+    model = CountingModel()
+    evaluator = PromptStabilityEvaluator(model, _agreement, noisy_samples_per_prompt=6, max_workers=4)
+    results = evaluator.evaluate_batch(PROMPTS)
+
+    expected = {v.variant_prompt for p in PROMPTS for v in evaluator.generator.generate(p)}
+    assert set(model.calls) == expected
+    assert set(model.calls.values()) == {1}
+    assert results[0] == results[2]
+
+
+def test_batch_results_match_one_prompt_at_a_time():
+    batched = PromptStabilityEvaluator(CountingModel(), _agreement, seed=3).evaluate_batch(PROMPTS)
+    single = PromptStabilityEvaluator(CountingModel(), _agreement, seed=3)
+    assert batched == [single.evaluate(p) for p in PROMPTS]
+    assert set(batched[0]["by_perturbation"]) == {t.value for t in PerturbationType}
+
+
+def test_noisy_variants_are_deterministic_per_seed_and_prompt():
+    prompt = PROMPTS[0]
+    a = PromptPerturbationGenerator(noisy_samples_per_prompt=8, seed=1)
+    b = PromptPerturbationGenerator(noisy_samples_per_prompt=8, seed=1)
+    b._noisy_user_inputs("another prompt first")
+    assert a._noisy_user_inputs(prompt) == b._noisy_user_inputs(prompt)
+    variants = a._noisy_user_inputs(prompt)
+    assert len(variants) == len(set(variants)) <= 8
+
+
+@pytest.mark.parametrize("max_attempts", [None, 5])
+def test_one_word_prompt_stops_within_max_attempts(monkeypatch, max_attempts):
+    generator = PromptPerturbationGenerator(noisy_samples_per_prompt=16, max_attempts=max_attempts)
+    draws = []
+
+    class CountingRandom(random.Random):
+        def choice(self, seq):
+            draws.append(1)
+            return super().choice(seq)
+
+    monkeypatch.setattr(generator, "_rng", lambda prompt: CountingRandom(prompt))
+    variants = generator._noisy_user_inputs("Hi")
+    # typo / grammar / punctuation leave "Hi" unchanged: only two distinct variants exist
+    assert sorted(variants) == ["Hey, can you tell me hi", "Hi"]
+    assert len(draws) == generator.max_attempts == (max_attempts or 8 * 16)
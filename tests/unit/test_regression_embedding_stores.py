@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from evals.regression.layer1_engine.run import run_batch_regression_eval
+from src.core.embeddings.store import EmbeddingStore
+
+
+def test_stores_with_shuffled_ids_need_sample_ids(tmp_path, regression_inputs):
+    data = regression_inputs(n=40, new_scale=0.8)
+    ids, answers, new_answers = data.ids, data.baseline_answers, data.new_answers
+    order = np.random.default_rng(1).permutation(len(ids))
+    baseline_store = EmbeddingStore.build(str(tmp_path / "base"), ids, data.base, dtype="float32")
+    new_store = EmbeddingStore.build(str(tmp_path / "new"), [ids[i] for i in order], data.new[order], dtype="float32")
+    context_store = EmbeddingStore.build(str(tmp_path / "ctx"), ids, data.ctx, dtype="float32")
+
+    with pytest.raises(ValueError, match="sample_ids"):
+        run_batch_regression_eval(answers, new_answers, answers, baseline_store, new_store, context_store)
+
+    expected = run_batch_regression_eval(answers, new_answers, answers, data.base, data.new, data.ctx)
+    aligned = run_batch_regression_eval(
+        answers, new_answers, answers, baseline_store, new_store, context_store, sample_ids=ids
+    )
+    assert aligned == expected
+
+
+def test_stores_in_the_same_order_are_positional(tmp_path, regression_inputs):
+    data = regression_inputs(n=40, new_scale=0.8)
+    answers, new_answers = data.baseline_answers, data.new_answers
+    stores = [
+        EmbeddingStore.build(str(tmp_path / name), data.ids, vecs, dtype="float32")
+        for name, vecs in (("base", data.base), ("new", data.new), ("ctx", data.ctx))
+    ]
+
+    expected = run_batch_regression_eval(answers, new_answers, answers, data.base, data.new, data.ctx)
+    assert run_batch_regression_eval(answers, new_answers, answers, *stores) == expected
@@ -0,0 +1,58 @@
+import pytest
+
+from evals.regression.layer1_engine.gate import run_tiered_regression_gate
+from evals.regression.layer1_engine.run import run_batch_regression_eval
+
+
+@pytest.fixture
+def synthetic(regression_inputs):
+    """Vectors that barely drift, answers whose wording (coverage) often does."""
+    data = regression_inputs(n=300, dim=32, new_scale=0.05, ctx_scale=0.05, answer_words=10, drop=(0.0, 0.8))
+    return data.baseline_answers, data.new_answers, data.base, data.new, data.ctx
+
+
+def test_coverage_regressions_with_low_vector_drift_fail_the_gate(synthetic):
+    baseline_answers, new_answers, base, new, ctx = synthetic
+    full = run_batch_regression_eval(baseline_answers, new_answers, baseline_answers, base, new, ctx)
+    assert full["summary"]["num_failures"] > 0
+
+    for margin in (0.0, 0.5):
+        gate = run_tiered_regression_gate(
+            baseline_answers, new_answers, baseline_answers, base, new, ctx,
+            min_pass_rate=0.0, margin=margin, early_exit=False,
+        )
+        assert gate["summary"]["num_failures"] == full["summary"]["num_failures"]
+        assert gate["summary"]["pass_rate"] == full["summary"]["pass_rate"]
+        assert [s["regression"] for s in gate["samples"]] == [s["regression"] for s in full["samples"]]
+
+
+def test_gate_verdict_matches_full_run(synthetic):
+    baseline_answers, new_answers, base, new, ctx = synthetic
+    full = run_batch_regression_eval(baseline_answers, new_answers, baseline_answers, base, new, ctx)
+    min_pass_rate = 0.5
+    gate = run_tiered_regression_gate(
+        baseline_answers, new_answers, baseline_answers, base, new, ctx,
+        min_pass_rate=min_pass_rate, batch_size=32,
+    )
+    summary = gate["summary"]
+    assert summary["gate_passed"] == (full["summary"]["pass_rate"] >= min_pass_rate)
+    if summary["num_undecided"]:
+        assert summary["early_stopped"] and not summary["gate_passed"]
+
+
+def test_judge_only_sees_borderline_coverage(synthetic):
+    baseline_answers, new_answers, base, new, ctx = synthetic
+    seen = []
+
+    def judge(baseline, new_answer, context):
+        seen.append((baseline, new_answer))
+        return False
+
+    gate = run_tiered_regression_gate(
+        baseline_answers, new_answers, baseline_answers, base, new, ctx,
+        min_pass_rate=0.0, margin=0.2, judge_fn=judge, early_exit=False,
+    )
+    judged = [s for s in gate["samples"] if s["tier"] == "judge"]
+    assert len(judged) == len(seen) == gate["summary"]["work"]["judge_checked"]
+    assert all(0.24 <= s["coverage_drift"] <= 0.36 for s in judged)
+    assert all(s["regression"] is False for s in judged)
@@ -0,0 +1,72 @@
+import math
+
+import pytest
+
+from evals.retrieval.engine.benchmark import KS, engine_metrics, make_runs, reference_metrics
+from evals.retrieval.engine.engine import compute_retrieval_metrics, encode_runs, per_query_metrics
+from evals.retrieval.mrr.mrr import mean_reciprocal_rank
+from evals.retrieval.ndcg.ndcg import mean_ndcg_at_k, ndcg_at_k_single
+from evals.retrieval.precision_at_k.precision_at_k import mean_precision_at_k
+from evals.retrieval.recall_at_k.recall_at_k import mean_recall_at_k
+
+# one query per edge case; graded maps, with the binary sets derived from them
+EDGE_RETRIEVED = [
+    ["d1", "d2", "d3"],                 # no relevant docs for this query
+    ["d1"],                             # k larger than the ranked list
+    [],                                 # nothing retrieved
+    ["d1", "d1", "d2", "d1"],           # duplicate doc ids
+    ["x", "y", "d9", "z", "d8", "d9"],  # relevant docs deep in the list, one duplicated
+]
+EDGE_MAPS = [
+    {},
+    {"d1": 2, "d4": 1},
+    {"d1": 1},
+    {"d1": 1, "d2": 3},
+    {"d8": 1, "d9": 2, "d7": 3},
+]
+EDGE_SETS = [set(m) for m in EDGE_MAPS]
+
+
+def _close(a, b):
+    return math.isclose(a, b, rel_tol=1e-12, abs_tol=1e-12)
+
+
+def test_engine_matches_per_metric_functions_on_random_runs():
+    runs = make_runs(1500, seed=7)
+    expected = reference_metrics(*runs)
+    actual = engine_metrics(*runs)
+    for key, value in expected.items():
+        assert _close(actual[key], value), key
+
+
+@pytest.mark.parametrize("k", [0, 1, 2, 3, 5, 10])
+def test_edge_cases_match_per_metric_functions(k):
+    binary = compute_retrieval_metrics(EDGE_RETRIEVED, EDGE_SETS, [k], ("precision", "recall"))
+    assert _close(binary[f"precision@{k}"], mean_precision_at_k(EDGE_RETRIEVED, EDGE_SETS, k))
+    assert _close(binary[f"recall@{k}"], mean_recall_at_k(EDGE_RETRIEVED, EDGE_SETS, k))
+    assert _close(binary["mrr"], mean_reciprocal_rank(EDGE_RETRIEVED, EDGE_SETS))
+    if k > 0:
+        graded = compute_retrieval_metrics(EDGE_RETRIEVED, EDGE_MAPS, [k], ("ndcg",))
+        assert _close(graded[f"ndcg@{k}"], mean_ndcg_at_k(EDGE_RETRIEVED, EDGE_MAPS, k))
+
+
+def test_per_query_values_match_single_query_functions():
+    ks = (1, 3, 10)
+    per_query = per_query_metrics(encode_runs(EDGE_RETRIEVED, EDGE_MAPS, max_k=10), ks, ("ndcg", "precision"))
+    for q, (retrieved, relevance_map) in enumerate(zip(EDGE_RETRIEVED, EDGE_MAPS)):
+        for k in ks:
+            assert _close(per_query["ndcg"][k][q], ndcg_at_k_single(retrieved, relevance_map, k))
+            assert _close(per_query["precision"][k][q], mean_precision_at_k([retrieved], [set(relevance_map)], k))
+        assert _close(per_query["mrr"][q], mean_reciprocal_rank([retrieved], [set(relevance_map)]))
+
+
+def test_k_beyond_the_encoded_depth_is_rejected():
+    runs = encode_runs(EDGE_RETRIEVED, EDGE_MAPS, max_k=3)
+    with pytest.raises(ValueError):
+        per_query_metrics(runs, ks=(5,))
+
+
+def test_ks_match_the_benchmark_cutoffs():
+    # compute_retrieval_metrics pads to max(ks), so every benchmark cutoff is valid
+    result = compute_retrieval_metrics(EDGE_RETRIEVED, EDGE_SETS, KS, ("precision",))
+    assert set(result) == {f"precision@{k}" for k in KS} | {"mrr"}
@@ -0,0 +1,73 @@
+import pytest
+
+from evals.regression.layer1_engine.sequential import (
+    make_precomputed_evaluator,
+    sequential_regression_test,
+    wilson_interval,
+)
+from src.core.embeddings.store import EmbeddingStore
+
+
+def _flag_evaluator(failure_rate):
+    """Every round(1 / failure_rate)-th sample regresses; records which indices were paid for."""
+    step = round(1 / failure_rate) if failure_rate else None
+    calls = []
+
+    def evaluate_batch(indices):
+        calls.append(list(indices))
+        return [{"regression": step is not None and i % step == 0, "semantic_drift": 0.1} for i in indices]
+
+    return evaluate_batch, calls
+
+
+@pytest.mark.parametrize(
+    "failure_rate, verdict",
+    [(0.0, "pass"), (0.02, "pass"), (0.20, "fail")],
+)
+def test_sprt_verdicts_stop_early(failure_rate, verdict):
+    num_samples = 5000
+    evaluate_batch, calls = _flag_evaluator(failure_rate)
+    result = sequential_regression_test(num_samples, evaluate_batch, min_pass_rate=0.95, seed=1)
+
+    assert result["verdict"] == verdict
+    assert result["decided_by"] == "sprt"
+    assert result["num_evaluated"] < num_samples
+    assert result["num_evaluated"] >= 20  # min_samples
+    assert sum(len(c) for c in calls) == result["num_evaluated"] == len(set(result["evaluated_indices"]))
+    lo, hi = result["pass_rate_ci"]
+    assert lo <= result["pass_rate"] <= hi
+
+
+def test_small_golden_set_is_decided_exactly():
+    evaluate_batch, _ = _flag_evaluator(0.05)
+    result = sequential_regression_test(30, evaluate_batch, min_pass_rate=0.95, batch_size=8)
+    assert result["decided_by"] == "exhausted"
+    assert result["num_evaluated"] == 30
+    assert result["verdict"] == ("pass" if result["pass_rate"] >= 0.95 else "fail")
+
+
+def test_wilson_interval_bounds():
+    assert wilson_interval(0, 0, 0.95) == (0.0, 1.0)
+    lo, hi = wilson_interval(95, 100, 0.95)
+    assert 0.88 < lo < 0.95 < hi < 0.99
+
+
+def test_precomputed_evaluator_lines_up_stores_by_id(tmp_path, regression_inputs):
+    data = regression_inputs(n=3, dim=8)
+    ids, answers = data.ids, data.baseline_answers
+    # identical vectors everywhere: nothing can regress once rows are paired by id
+    baseline_store = EmbeddingStore.build(str(tmp_path / "base"), ids, data.base, dtype="float32")
+    new_store = EmbeddingStore.build(str(tmp_path / "new"), ids[::-1], data.base[::-1], dtype="float32")
+    context_store = EmbeddingStore.build(str(tmp_path / "ctx"), ids, data.base, dtype="float32")
+    args = (answers, answers, data.contexts, baseline_store, new_store, context_store)
+
+    with pytest.raises(ValueError, match="sample_ids"):
+        make_precomputed_evaluator(*args)
+
+    evaluate_batch = make_precomputed_evaluator(*args, sample_ids=ids)
+    samples = evaluate_batch([2, 0, 1])
+    assert [s["regression"] for s in samples] == [False, False, False]
+    assert all(s["semantic_drift"] == 0.0 for s in samples)
+
+    result = sequential_regression_test(3, evaluate_batch, min_samples=1)
+    assert result["verdict"] == "pass" and result["pass_rate"] == 1.0
@@ -0,0 +1,88 @@
+import pytest
+
+from evals.latency.budgets import LatencyBudgetViolation, LatencyBudgets, SLOMonitor
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def _monitor(clock, strict=False, **kwargs):
+    options = dict(percentile=95, window_s=60, num_buckets=6, check_interval_s=0, min_samples=20, clock=clock)
+    options.update(kwargs)
+    return SLOMonitor(LatencyBudgets({"retrieval": 100, "total": 1000}, strict=strict), **options)
+
+
+def _feed(monitor, clock, latencies, start=0.0, step=0.1):
+    results = []
+    for i, ms in enumerate(latencies):
+        clock.now = start + i * step
+        results.append(monitor.observe({"retrieval": ms, "total": 500, "unbudgeted": 1e9}))
+    return results
+
+
+def test_burn_rate_and_windowed_breach(clock):
+    monitor = _monitor(clock)
+    _feed(monitor, clock, [50] * 90 + [200] * 10)
+    status = monitor.status()
+    assert set(status) == {"retrieval", "total"}
+    row = status["retrieval"]
+    assert row["samples"] == 100
+    assert row["over_budget_fraction"] == 0.1
+    assert row["burn_rate"] == pytest.approx(2.0)  # 10% over against a 5% error budget
+    assert status["total"]["burn_rate"] == 0.0
+
+    breach = monitor.check()
+    assert set(breach) == {"retrieval"}
+    assert breach["retrieval"]["exceeded_by_ms"] == pytest.approx(100, rel=0.03)
+
+
+def test_a_single_outlier_is_not_a_breach(clock):
+    monitor = _monitor(clock, strict=True)
+    assert _feed(monitor, clock, [50] * 99 + [5000]) == [{}] * 100
+    assert monitor.status()["retrieval"]["burn_rate"] == pytest.approx(0.2)
+
+
+def test_min_samples_gates_the_check(clock):
+    monitor = _monitor(clock)
+    _feed(monitor, clock, [500] * 19)
+    assert monitor.status()["retrieval"]["enough_samples"] is False
+    assert monitor.check() == {}
+    _feed(monitor, clock, [500], start=1.9)
+    assert set(monitor.check()) == {"retrieval"}
+
+
+def test_old_buckets_rotate_out_of_the_window(clock):
+    monitor = _monitor(clock)
+    _feed(monitor, clock, [500] * 30, start=5)    # bucket 0
+    _feed(monitor, clock, [50] * 30, start=35)    # bucket 3
+    assert monitor.status(now=59)["retrieval"]["samples"] == 60
+    # at t=62 the window is buckets 1..6: the slow requests of bucket 0 are gone
+    status = monitor.status(now=62)
+    assert status["retrieval"]["samples"] == 30
+    assert status["retrieval"]["over_budget_fraction"] == 0.0
+    assert monitor.check(now=62) == {}
+    assert monitor.status(now=200) == {}
+
+
+def test_strict_budgets_raise_on_a_sustained_breach(clock):
+    monitor = _monitor(clock, strict=True)
+    with pytest.raises(LatencyBudgetViolation, match="retrieval"):
+        _feed(monitor, clock, [500] * 20)
+    assert clock.now == pytest.approx(1.9)  # raised at the 20th request, the first with enough samples
+
+
+def test_observe_only_checks_every_check_interval(clock):
+    monitor = _monitor(clock, check_interval_s=5, min_samples=1)
+    results = _feed(monitor, clock, [500] * 60, step=0.25)
+    checked = [i for i, r in enumerate(results) if r]
+    assert checked == [0, 20, 40]  # t = 0, 5, 10
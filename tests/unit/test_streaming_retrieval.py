@@ -0,0 +1,77 @@
+import json
+import random
+
+import pytest
+
+from evals.retrieval.engine.benchmark import make_runs
+from evals.retrieval.engine.engine import compute_retrieval_metrics
+from evals.retrieval.streaming.streaming import StreamingRetrievalMetrics, evaluate_run_file
+
+KS = (1, 3, 5, 10)
+
+
+@pytest.fixture
+def runs():
+    retrieved, _, maps = make_runs(300, corpus_size=400, seed=3)
+    # one entry per doc, as in a TREC run file
+    retrieved = [list(dict.fromkeys(docs)) for docs in retrieved]
+    qrels = {f"q{i}": m for i, m in enumerate(maps)}
+    rows = [(f"q{i}", doc, rank) for i, docs in enumerate(retrieved) for rank, doc in enumerate(docs, start=1)]
+    return retrieved, maps, qrels, rows
+
+
+def _assert_matches_engine(summary, retrieved, maps):
+    expected = compute_retrieval_metrics(retrieved, maps, KS, ("precision", "recall", "ndcg", "hit_rate"))
+    for key, value in expected.items():
+        assert summary[key] == pytest.approx(value, abs=1e-12), key
+
+
+def test_include_missing_matches_engine_over_every_qrels_query(runs):
+    retrieved, maps, qrels, rows = runs
+    assert any(not docs for docs in retrieved)  # some queries never show up in the run
+    acc = StreamingRetrievalMetrics(qrels, KS, include_missing=True).add_rows(rows)
+    summary = acc.finish()
+    assert summary["num_queries"] == len(qrels)
+    _assert_matches_engine(summary, retrieved, maps)
+
+
+def test_default_covers_only_the_run_queries(runs):
+    retrieved, maps, qrels, rows = runs
+    present = [i for i, docs in enumerate(retrieved) if docs]
+    summary = StreamingRetrievalMetrics(qrels, KS).add_rows(rows).finish()
+    assert summary["num_queries"] == len(present)
+    _assert_matches_engine(summary, [retrieved[i] for i in present], [maps[i] for i in present])
+
+
+def test_shuffled_rows_with_grouped_false(runs):
+    retrieved, maps, qrels, rows = runs
+    rows = list(rows)
+    random.Random(0).shuffle(rows)
+    with pytest.raises(ValueError, match="grouped=False"):
+        StreamingRetrievalMetrics(qrels, KS).add_rows(rows)
+    summary = StreamingRetrievalMetrics(qrels, KS, grouped=False, include_missing=True).add_rows(rows).finish()
+    _assert_matches_engine(summary, retrieved, maps)
+
+
+def test_repeated_doc_counts_once_at_its_best_rank():
+    qrels = {"q": {"a": 1, "b": 2}}
+    rows = [("q", "x", 1), ("q", "a", 4), ("q", "a", 2), ("q", "a", 3), ("q", "b", 5), ("q", "b", 5)]
+    summary = StreamingRetrievalMetrics(qrels, ks=(5,)).add_rows(rows).finish()
+    assert summary["recall@5"] == 1.0
+    assert summary["precision@5"] == pytest.approx(2 / 5)
+    assert summary["mrr"] == 0.5
+    dedup = compute_retrieval_metrics([["x", "a", "y", "z", "b"]], [qrels["q"]], (5,), ("ndcg",))
+    assert summary["ndcg@5"] == pytest.approx(dedup["ndcg@5"])
+
+
+def test_run_file_and_per_query_records(tmp_path, runs):
+    retrieved, maps, qrels, rows = runs
+    run_path, qrels_path, per_query = tmp_path / "run.txt", tmp_path / "qrels.txt", tmp_path / "pq.jsonl"
+    run_path.write_text("".join(f"{q} Q0 {d} {r} {1.0 / r} test\n" for q, d, r in rows), encoding="utf-8")
+    qrels_path.write_text(
+        "".join(f"{q} 0 {d} {g}\n" for q, m in qrels.items() for d, g in m.items()), encoding="utf-8"
+    )
+    summary = evaluate_run_file(str(run_path), str(qrels_path), KS, str(per_query))
+    records = [json.loads(line) for line in per_query.read_text(encoding="utf-8").splitlines()]
+    assert len(records) == summary["num_queries"]
+    assert sum(r["mrr"] for r in records) / len(records) == pytest.approx(summary["mrr"])
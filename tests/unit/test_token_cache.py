@@ -0,0 +1,61 @@
+import pytest
+
+rouge_scorer = pytest.importorskip("rouge_score.rouge_scorer")
+from rouge_score import tokenizers
+
+from evals.generation.bleu.benchmark import make_pairs
+from evals.generation.rouge.rouge import ROUGE_TYPES, rouge_batch
+from evals.regression.layer1_engine.coverage import batch_coverage_score
+from evals.utils.text.text import TokenCache, make_rouge_scorer
+
+TEXTS = [
+    "The models were running quickly, and retrieval latencies dropped!",
+    "Caching CACHED caches: 3 hits, 12 misses (25%).",
+    "a an the is of",
+    "",
+    "   ",
+    "naïve café résumé — unicode words",
+    "running runner runs ran",
+]
+
+
+def test_rouge_tokens_match_rouge_score_tokenizer():
+    cache = TokenCache()
+    reference = tokenizers.DefaultTokenizer(use_stemmer=True)
+    for text in TEXTS:
+        assert list(cache.rouge_tokens(text)) == reference.tokenize(text)
+        assert list(cache.rouge_tokens(text)) == reference.tokenize(text)  # cached path
+    assert cache.hits == len(TEXTS)
+
+
+def test_split_tokens_match_str_split():
+    cache = TokenCache()
+    for text in TEXTS:
+        assert list(cache.split_tokens(text)) == text.split()
+
+
+def test_cached_scorer_matches_plain_rouge_scorer():
+    references, candidates = make_pairs(300, seed=6)
+    references += TEXTS
+    candidates += list(reversed(TEXTS))
+    plain = rouge_scorer.RougeScorer(ROUGE_TYPES, use_stemmer=True)
+    cached = make_rouge_scorer(ROUGE_TYPES, TokenCache())
+
+    for ref, cand in zip(references, candidates):
+        assert cached.score(ref, cand) == plain.score(ref, cand)
+
+    result = rouge_batch(references, candidates, token_cache=TokenCache())
+    for sample, (ref, cand) in zip(result["per_sample"], zip(references, candidates)):
+        scores = plain.score(ref, cand)
+        assert sample == {t: scores[t].fmeasure for t in ROUGE_TYPES}
+
+    coverage = batch_coverage_score(references, candidates)
+    assert coverage == [plain.score(r, c)["rougeL"].recall for r, c in zip(references, candidates)]
+
+
+def test_lru_cap_bounds_entries():
+    cache = TokenCache(max_entries=2)
+    for text in ("a b", "c d", "e f", "a b"):
+        cache.split_tokens(text)
+    assert cache.stats()["split_entries"] == 2
+    assert cache.misses == 4
@@ -0,0 +1,53 @@
+import threading
+import time
+
+from src.logging.traces import Tracer
+
+
+class RecordingExporter:
+    def __init__(self):
+        self.spans = []
+        self.threads = set()
+        self.closed = False
+
+    def export(self, spans):
+        self.threads.add(threading.get_ident())
+        self.spans.extend(spans)
+
+    def close(self):
+        self.closed = True
+
+
+def test_spans_nest_and_are_exported_off_the_instrumented_thread():
+    exporter = RecordingExporter()
+    tracer = Tracer([exporter], flush_batch=4, flush_interval_s=60)
+    for i in range(10):
+        with tracer.span("request", i=i):
+            with tracer.span("retrieval"):
+                pass
+
+    deadline = time.time() + 2
+    while not exporter.spans and time.time() < deadline:
+        time.sleep(0.01)
+    assert exporter.spans, "reaching flush_batch should wake the exporter thread"
+    assert threading.get_ident() not in exporter.threads
+
+    tracer.close()
+    assert exporter.closed
+    assert len(exporter.spans) == 20
+    parents = {s.span_id: s for s in exporter.spans if s.name == "request"}
+    for child in (s for s in exporter.spans if s.name == "retrieval"):
+        assert child.parent_id in parents
+        assert child.trace_id == parents[child.parent_id].trace_id
+
+
+def test_interval_flushes_a_partial_batch():
+    exporter = RecordingExporter()
+    tracer = Tracer([exporter], flush_batch=1000, flush_interval_s=0.05)
+    with tracer.span("only"):
+        pass
+    deadline = time.time() + 2
+    while not exporter.spans and time.time() < deadline:
+        time.sleep(0.01)
+    assert [s.name for s in exporter.spans] == ["only"]
+    tracer.close()